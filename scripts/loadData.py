@@ -3,45 +3,18 @@ from pathlib import Path
 
 sys.path.append(str(Path(__file__).resolve().parent.parent / "src"))
 
-from etl_project.CSVLoader import CSVLoader
-from etl_project.config import Config
+from etl_project.config import load_settings
+from etl_project.runner import load_processed
 
 class LoadData:
     def __init__(self):
-        self.cfg = Config("config/settings.yaml")
-        self.jobs = [
-            {
-                "table": "abastecimientos",
-                "schema": "raw",
-                "file": Path(__file__).parent.parent / Path(self.cfg.DATA_PATH) / "processed/abastecimientos.csv"
-            },
-            {
-                "table": "actividades",
-                "schema": "raw",
-                "file": Path(__file__).parent.parent / Path(self.cfg.DATA_PATH) / "processed/actividades.csv"
-            },
-            {
-                "table": "insumos",
-                "schema": "raw",
-                "file": Path(__file__).parent.parent / Path(self.cfg.DATA_PATH) / "processed/insumos.csv"
-            },
-            {
-                "table": "rep_maquinaria",
-                "schema": "raw",
-                "file": Path(__file__).parent.parent / Path(self.cfg.DATA_PATH) / "processed/rep_maquinaria.csv"
-            }, 
-            # aquí agregas más datasets:
-            # {"table": "actividades", "schema": "raw", "file": Path(self.cfg.DATA_PATH) / "actividades.csv"},
-            # {"table": "insumos", "schema": "raw", "file": Path(self.cfg.DATA_PATH) / "insumos.csv"},
-        ]
+        self.cfg = load_settings("config/settings.yaml")
+        # Se cargan todos los datasets declarados en settings.yaml -> raw.<dataset>
+        self.tables = list(self.cfg["datasets"])
 
     def run(self):
-        for job in self.jobs:
-            print(f"[loadData] Cargando {job['table']}...")
-            loader = CSVLoader(table_name=job["table"], schema=job["schema"])
-            loader.load_csv(job["file"], if_exists="append")
-            print(f"[loadData] OK -> {job['table']}")
-            
+        load_processed(self.cfg, self.tables, schema="raw", if_exists="append", tag="loadData")
+
 if __name__ == "__main__":
     pipeline = LoadData()
-    pipeline.run()
\ No newline at end of file
+    pipeline.run()
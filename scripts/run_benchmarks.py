@@ -0,0 +1,9 @@
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent / "src"))
+
+from etl_project.benchmarks.suite import main
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -102,6 +102,30 @@ CREATE TABLE IF NOT EXISTS raw.rep_maquinaria (
   nro_de_la_os TEXT
 );
 
+-- Hecho equipo x día de combustible vs. producción (etl_project/facts.py).
+-- Se llena en la ETL con la unión de abastecimientos y rep_maquinaria; las
+-- columnas n_* conservan la multiplicidad del JOIN original.
+DROP VIEW IF EXISTS stage.vista_combustible_por_unidad_producida;
+DROP TABLE IF EXISTS raw.fact_combustible_produccion;
+CREATE TABLE IF NOT EXISTS raw.fact_combustible_produccion (
+  equipo TEXT NOT NULL,
+  fecha DATE NOT NULL,
+  galones NUMERIC,
+  n_abastecimientos INTEGER NOT NULL,
+  cantidad_produccion NUMERIC,
+  n_reportes INTEGER NOT NULL,
+  PRIMARY KEY (fecha, equipo)
+);
+
+-- Generaciones de carga: cada carga exitosa inserta una fila (el dashboard
+-- compara max(generation) para saber si sus caches quedaron viejos)
+CREATE TABLE IF NOT EXISTS raw.etl_load_log (
+  generation BIGSERIAL PRIMARY KEY,
+  run_id TEXT NOT NULL,
+  tables TEXT NOT NULL,
+  loaded_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
  
 
 -- Vista de productividad del trabajador
@@ -112,7 +136,8 @@ select
   a.actividad, 
   sum(a.qtd_prod) as total_producido, 
   count(*) as cantidad_registros, 
-  avg(a.qtd_prod) as promedio_produccion 
+  avg(a.qtd_prod) as promedio_produccion, 
+  count(a.qtd_prod) as registros_con_produccion 
 from 
   raw.actividades a
 where
@@ -171,35 +196,23 @@ ORDER BY
 LIMIT 
   5;
  
- drop view if exists stage.vista_combustible_por_unidad_producida;
- 
- CREATE 
+-- Vista de combustible por unidad producida: agregado mensual sobre el hecho
+-- equipo x día (antes: JOIN abastecimientos/rep_maquinaria en cada consulta)
+drop view if exists stage.vista_combustible_por_unidad_producida;
+
+CREATE 
 OR REPLACE VIEW stage.vista_combustible_por_unidad_producida AS 
 SELECT 
-  --a.equipo, 
-  to_char(
-    to_date(a.fecha, 'dd/mm/yyyy' :: text):: timestamp with time zone, 
-    'yyyy-mm' :: text
-  ) AS mes, 
-  sum(a.galones) AS total_galones, 
-  sum(rm.cantidad_produccion) AS total_produccion, 
-  CASE WHEN sum(rm.cantidad_produccion) > 0 :: numeric THEN round(
-    sum(a.galones) / sum(rm.cantidad_produccion), 
+  to_char(f.fecha, 'yyyy-mm' :: text) AS mes, 
+  sum(f.galones * f.n_reportes) AS total_galones, 
+  sum(f.cantidad_produccion * f.n_abastecimientos) AS total_produccion, 
+  CASE WHEN sum(f.cantidad_produccion * f.n_abastecimientos) > 0 :: numeric THEN round(
+    sum(f.galones * f.n_reportes) / sum(f.cantidad_produccion * f.n_abastecimientos), 
     2
   ) ELSE 0 :: numeric END AS galones_por_unidad 
 FROM 
-  raw.abastecimientos a 
-  JOIN raw.rep_maquinaria rm ON a.equipo = rm.equipo 
-  AND to_date(a.fecha, 'dd/mm/yyyy' :: text) = to_date(rm.fecha, 'dd/mm/yyyy' :: text) 
-where 
-  rm.unidad = 'H' 
+  raw.fact_combustible_produccion f 
 GROUP BY 
-  --a.equipo, 
-  (
-    to_char(
-      to_date(a.fecha, 'dd/mm/yyyy' :: text):: timestamp with time zone, 
-      'yyyy-mm' :: text
-    )
-  );
+  to_char(f.fecha, 'yyyy-mm' :: text);
 
 COMMIT;
@@ -1,7 +1,13 @@
 # csv_loader.py
+import io
+import threading
 import pandas as pd
 import unicodedata
+import uuid
+from typing import Dict, Iterable, Optional
+from sqlalchemy import text
 from .conexiondb import DatabaseConnection
+from .profiling import stage
 
 def normalize_column_name(name: str) -> str:
     """Quita tildes, pasa a minúsculas, reemplaza espacios y puntos por guiones bajos"""
@@ -15,36 +21,196 @@ def normalize_column_name(name: str) -> str:
     )
 
 class CSVLoader:
-    def __init__(self, table_name: str, schema: str = "raw"):
-        self.db = DatabaseConnection()
+    def __init__(self, table_name: str, schema: str = "raw", db: Optional[DatabaseConnection] = None):
+        # db permite inyectar otra conexión (p. ej. una base local para benchmarks)
+        self.db = db or DatabaseConnection()
         self.table_name = table_name
         self.schema = schema
+        # Tipos de la vuelta por CSV fijados por el primer bloque de load_frame
+        self.pin = DtypePin()
  
+    def delete_rows(self, csv_path: str) -> int:
+        """
+        Borra de la tabla destino las filas listadas en un CSV de tombstones
+        (columnas clave del delta). La tabla temporal copia los tipos de la tabla
+        destino (LIKE), así que se compara con el mismo tipo que se cargó
+        (NUMERIC 10 = 10.0) y NULL = NULL.
+        """
+        df = pd.read_csv(csv_path)
+        if df.empty:
+            return 0
+        with stage("delete_rows", df, dataset=self.table_name) as st:
+            with self.db.get_engine().begin() as conn:
+                deleted = self._delete(conn, df)
+            if st:
+                st.rows_out = deleted
+        self._invalidate()
+        print(f"🗑️ {deleted} filas borradas en {self.schema}.{self.table_name}")
+        return deleted
+
+    def _delete(self, conn, df: pd.DataFrame, exact: bool = False) -> int:
+        """
+        Borra las filas de la tabla iguales a alguna de 'df' (todas las copias).
+        Con exact=True borra solo tantas copias de cada fila como aparece en 'df':
+        las de un archivo reemplazado, sin tocar filas idénticas de otros archivos.
+        """
+        df.columns = [normalize_column_name(col) for col in df.columns]
+        tmp = f"_deletes_{self.table_name}_{uuid.uuid4().hex[:8]}"
+        cond = " AND ".join(f't."{c}" IS NOT DISTINCT FROM d."{c}"' for c in df.columns)
+        conn.execute(text(f'CREATE TABLE {self.schema}."{tmp}" (LIKE {self.schema}.{self.table_name})'))
+        if exact:
+            counts = df.groupby(list(df.columns), dropna=False, sort=False).size().reset_index(name="_etl_n")
+            counts["_etl_id"] = range(len(counts))
+            conn.execute(text(f'ALTER TABLE {self.schema}."{tmp}" ADD COLUMN _etl_id bigint, ADD COLUMN _etl_n bigint'))
+            counts.to_sql(tmp, conn, schema=self.schema, index=False, if_exists="append")
+            # Las copias idénticas son intercambiables: se numeran por ctid y se borran las _etl_n primeras
+            result = conn.execute(text(
+                f'DELETE FROM {self.schema}.{self.table_name} WHERE ctid IN ('
+                f'SELECT ctid FROM (SELECT t.ctid, d._etl_n, '
+                f'row_number() OVER (PARTITION BY d._etl_id ORDER BY t.ctid) AS k '
+                f'FROM {self.schema}.{self.table_name} t JOIN {self.schema}."{tmp}" d ON {cond}) m '
+                f'WHERE m.k <= m._etl_n)'
+            ))
+        else:
+            df.to_sql(tmp, conn, schema=self.schema, index=False, if_exists="append")
+            result = conn.execute(text(
+                f'DELETE FROM {self.schema}.{self.table_name} t USING {self.schema}."{tmp}" d WHERE {cond}'
+            ))
+        conn.execute(text(f'DROP TABLE {self.schema}."{tmp}"'))
+        return result.rowcount
+
+    def clear(self) -> None:
+        """Borra el contenido de la tabla destino (if_exists='replace')."""
+        with self.db.get_engine().begin() as conn:  # begin = autocommit
+            conn.execute(text(f"DELETE FROM {self.schema}.{self.table_name}"))
+        self._invalidate()
+
+    def _invalidate(self) -> None:
+        """Descarta del cache de consultas los resultados que leen esta tabla."""
+        self.db.invalidate(f"{self.schema}.{self.table_name}")
+
     def load_csv(self, csv_path: str, if_exists: str = "append"):
         """
         Carga un CSV a la tabla destino en PostgreSQL.
         """
         # Leer CSV
-        df = pd.read_csv(csv_path)
+        with stage("read_csv", dataset=self.table_name) as st:
+            df = pd.read_csv(csv_path)
+            if st:
+                st.observe(df)
+
+        # Limpiar la tabla si es necesario
+        if if_exists == "replace":
+            self.clear()
+
+        self._to_sql(df)
 
+    def load_frame(self, df: pd.DataFrame) -> None:
+        """
+        Agrega un DataFrame ya transformado (modo streaming). Pasa por un CSV en
+        memoria para que tipos y fechas ('dd/mm/YYYY') queden igual que con load_csv;
+        todos los bloques del loader se leen con los tipos del primero (self.pin).
+        """
+        self._to_sql(_as_loaded(df, self.pin))
+
+    def replace_frames(self, frames: Iterable[pd.DataFrame], deletes: Optional[pd.DataFrame] = None) -> int:
+        """
+        Borra las filas de 'deletes' (mismas columnas que los bloques) y agrega
+        los bloques, todo en una sola transacción: si algo falla no queda nada
+        a medias. `etl watch` carga así cada archivo: 'deletes' es su versión
+        anterior y se borran exactamente esas filas (cada una tantas veces como
+        aparece), no las copias idénticas de otros archivos. Devuelve filas agregadas.
+        """
+        rows = 0
+        with self.db.get_engine().begin() as conn:
+            if deletes is not None and not deletes.empty:
+                deleted = self._delete(conn, _as_loaded(deletes, self.pin), exact=True)
+                print(f"🗑️ {deleted} filas borradas en {self.schema}.{self.table_name}")
+            for df in frames:
+                self._to_sql(_as_loaded(df, self.pin), conn, invalidate=False)
+                rows += len(df)
+        self._invalidate()
+        return rows
+
+    def _to_sql(self, df: pd.DataFrame, con=None, invalidate: bool = True) -> None:
         # Normalizar nombres de columnas
         df.columns = [normalize_column_name(col) for col in df.columns]
- 
-        # Conexión a la base
-        engine = self.db.get_engine()
 
-        # Limpiar la tabla si es necesario
-        if if_exists == "replace":
-            with engine.begin() as conn:  # begin = autocommit
-                conn.execute(f"DELETE FROM {self.schema}.{self.table_name};")
+        # Conexión a la base (o la transacción en curso)
+        con = con if con is not None else self.db.get_engine()
 
         # Cargar en la tabla
-        df.to_sql(
-            self.table_name,
-            engine,
-            schema=self.schema,
-            if_exists="append",  # usamos append siempre, ya borramos si era "replace"
-            index=False
-        )
-
-        print(f"✅ {len(df)} filas cargadas en {self.schema}.{self.table_name}")
\ No newline at end of file
+        with stage("to_sql", df, dataset=self.table_name) as st:
+            df.to_sql(
+                self.table_name,
+                con,
+                schema=self.schema,
+                if_exists="append",  # usamos append siempre, ya borramos si era "replace"
+                index=False
+            )
+            if st:
+                st.observe(df)
+        if invalidate:
+            self._invalidate()
+
+        print(f"✅ {len(df)} filas cargadas en {self.schema}.{self.table_name}")
+
+
+def _pinned_dtype(s: pd.Series) -> Optional[str]:
+    """Tipo con que se fija una columna leída del CSV; None si no tiene valores (aún no define nada)."""
+    if s.isna().all():
+        return None
+    if pd.api.types.is_bool_dtype(s):
+        return "boolean"
+    if pd.api.types.is_integer_dtype(s):
+        return "Int64"  # admite NULL en bloques posteriores sin pasar a '123.0'
+    if pd.api.types.is_float_dtype(s):
+        return "float64"
+    return "str"
+
+
+class DtypePin:
+    """
+    Tipos de la vuelta por CSV de un mismo dataset. read_csv infiere cada
+    bloque por separado: una clave entera sale '123' en un bloque y '123.0'
+    en otro que trae algún NaN. El primer bloque en que una columna tiene
+    valores fija su tipo y los siguientes se leen con él; si un bloque no cabe
+    (decimales en una columna entera, texto en una numérica) el tipo se amplía
+    y se avisa, porque los bloques ya cargados quedaron con el anterior.
+    """
+
+    def __init__(self) -> None:
+        self.dtypes: Dict[str, str] = {}
+        self._lock = threading.Lock()  # el productor y los consumidores de streaming lo comparten
+
+    def read(self, buffer) -> pd.DataFrame:
+        with self._lock:
+            text = {col: "str" for col, dtype in self.dtypes.items() if dtype == "str"}
+            df = pd.read_csv(buffer, dtype=text or None)
+            casts = {}
+            for col in df.columns:
+                target = self.dtypes.get(col)
+                if target is None:
+                    target = _pinned_dtype(df[col])
+                    if target is None:
+                        continue
+                    self.dtypes[col] = target
+                try:
+                    casts[col] = df[col].astype(target)
+                except (TypeError, ValueError):
+                    wider = "float64" if target == "Int64" and pd.api.types.is_numeric_dtype(df[col]) else "str"
+                    print(f"⚠️ Columna {col}: un bloque no cabe en {target}, se amplía a {wider}")
+                    self.dtypes[col] = wider
+                    casts[col] = df[col].astype(wider)
+            return df.assign(**casts) if casts else df
+
+
+def _as_loaded(df: pd.DataFrame, pin: Optional[DtypePin] = None) -> pd.DataFrame:
+    """
+    El DataFrame como lo leería load_csv (vuelta por CSV en memoria, fechas 'dd/mm/YYYY').
+    Con pin, con los tipos fijados para el dataset en vez de inferirlos de este bloque.
+    """
+    buffer = io.StringIO()
+    df.to_csv(buffer, index=False, encoding="utf-8", date_format="%d/%m/%Y")
+    buffer.seek(0)
+    return pin.read(buffer) if pin is not None else pd.read_csv(buffer)
@@ -1,10 +1,22 @@
-from .loaders import ExcelLoader
-from .transforms import (
-    clean_column_names,
-    drop_columns,
-    filter_value,
-    delete_first_n,
-)
+from __future__ import annotations
+
+import importlib
+from typing import Any
+
+__version__ = "0.1.0"
+
+# Exportaciones diferidas (PEP 562): importar etl_project no arrastra pandas,
+# así el CLI arranca rápido y solo paga el import del subcomando que se use.
+_LAZY = {
+    "ExcelLoader": "etl_project.loaders",
+    "clean_column_names": "etl_project.transforms",
+    "drop_columns": "etl_project.transforms",
+    "filter_value": "etl_project.transforms",
+    "delete_first_n": "etl_project.transforms",
+    "concat_columns": "etl_project.transforms",
+    "adjust_date_format": "etl_project.transforms",
+    "concat_column_with_first_n": "etl_project.transforms",
+}
 
 __all__ = [
     "ExcelLoader",
@@ -16,4 +28,12 @@ __all__ = [
     "adjust_date_format",
     "concat_column_with_first_n",
     "__version__",
-]
\ No newline at end of file
+]
+
+
+def __getattr__(name: str) -> Any:
+    if name in _LAZY:
+        value = getattr(importlib.import_module(_LAZY[name]), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module 'etl_project' has no attribute {name!r}")
@@ -0,0 +1,258 @@
+"""
+Motor analítico local: calcula las vistas stage.* directamente desde los
+datasets Parquet de data/processed, sin PostgreSQL.
+
+Cada función replica la semántica de su vista en sql/1.crear_tablas.sql:
+claves de texto (como quedan en las tablas raw), SUM/AVG que ignoran NULL,
+COUNT(*), ROUND(numeric, 2) con redondeo "half away from zero" y el JOIN
+interno equipo/fecha con su multiplicidad (hash join de pandas).
+"""
+
+from __future__ import annotations
+
+import threading
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from etl_project.CSVLoader import _as_loaded
+from etl_project.writers import processed_dataset_path, read_processed
+
+# Columnas que usa cada vista (poda de columnas al leer el Parquet)
+SOURCE_COLUMNS: Dict[str, List[str]] = {
+    "actividades": ["func", "empresa", "actividad", "unidade", "qtd_prod"],
+    "insumos": ["zona", "nm_faz", "nm_actividad", "fecha", "um_prod", "valor", "area_apli"],
+    "rep_maquinaria": ["equipo", "fecha", "nombre_actividad", "unidad_produccion", "unidad",
+                       "cantidad_produccion", "duracion_horas"],
+    "abastecimientos": ["equipo", "fecha", "galones"],
+}
+
+Selection = Optional[Sequence[str]]
+
+
+# ------------------------------------------------------------------ helpers
+def _as_text(s: pd.Series) -> pd.Series:
+    """
+    Valores como quedan en una columna TEXT de raw: misma vuelta por CSV que
+    load_csv/load_frame (_as_loaded), así que una columna float -p. ej. enteros
+    con NaN- queda '123.0' y una entera '123'. NULL se conserva.
+    """
+    loaded = _as_loaded(s.to_frame(name="valor"))["valor"]
+    loaded.index = s.index
+    return _loaded_text(loaded)
+
+
+def _loaded_text(loaded: pd.Series) -> pd.Series:
+    """Texto de una columna que ya pasó por la vuelta por CSV (p. ej. con los tipos de un DtypePin)."""
+    text = loaded.astype(object).map(str, na_action="ignore").astype(object)
+    if pd.api.types.is_bool_dtype(loaded):
+        text = text.str.lower()  # boolean -> text de PostgreSQL: 'true'/'false'
+    return text.where(loaded.notna(), None)
+
+
+def _numeric(s: pd.Series) -> pd.Series:
+    return pd.to_numeric(s, errors="coerce").astype("float64")
+
+
+def _to_date(s: pd.Series, date_format: str = "%d/%m/%Y") -> pd.Series:
+    """Equivalente a to_date(col, 'dd/mm/yyyy'): acepta texto o datetime; devuelve datetime64 normalizado."""
+    if not pd.api.types.is_datetime64_any_dtype(s):
+        s = pd.to_datetime(s, format=date_format, errors="coerce")
+    return s.dt.normalize()
+
+
+def sql_round(values, decimals: int = 2) -> np.ndarray:
+    """ROUND(numeric, n) de PostgreSQL: mitad hacia afuera del cero (numpy redondea al par)."""
+    factor = 10.0 ** decimals
+    x = np.asarray(values, dtype="float64")
+    return np.sign(x) * np.floor(np.abs(x) * factor + 0.5) / factor
+
+
+def _sum(s: pd.Series) -> float:
+    return s.sum(min_count=1)
+
+
+def _ratio(num: pd.Series, den: pd.Series) -> pd.Series:
+    """CASE WHEN den > 0 THEN ROUND(num / den, 2) ELSE 0 END"""
+    out = pd.Series(0.0, index=num.index)
+    ok = den.fillna(0) > 0
+    out[ok] = sql_round(num[ok] / den[ok])
+    return out
+
+
+def _isin(df: pd.DataFrame, column: str, values: Selection) -> pd.DataFrame:
+    return df[df[column].isin(list(values))] if values else df
+
+
+# ------------------------------------------------------------------ vistas
+def vista_productividad_trabajador(actividades: pd.DataFrame) -> pd.DataFrame:
+    a = actividades[actividades["unidade"].astype("string") == "HA"]
+    keys = pd.DataFrame({
+        "trabajador": _as_text(a["func"]),
+        "empresa": _as_text(a["empresa"]),
+        "actividad": _as_text(a["actividad"]),
+        "qtd_prod": _numeric(a["qtd_prod"]),
+    })
+    g = keys.groupby(["trabajador", "empresa", "actividad"], dropna=False, sort=False)["qtd_prod"]
+    out = g.agg(
+        total_producido=_sum, cantidad_registros="size", promedio_produccion="mean", registros_con_produccion="count"
+    ).reset_index()
+    return out[[
+        "trabajador", "empresa", "actividad", "total_producido", "cantidad_registros", "promedio_produccion",
+        "registros_con_produccion",
+    ]]
+
+
+def vista_costo_insumos_por_hectarea(insumos: pd.DataFrame) -> pd.DataFrame:
+    i = insumos[insumos["um_prod"].astype("string") == "HA"]
+    frame = pd.DataFrame({
+        "zona": _as_text(i["zona"]),
+        "hacienda": _as_text(i["nm_faz"]),
+        "actividad": _as_text(i["nm_actividad"]),
+        "fecha_txt": _as_text(i["fecha"]) if not pd.api.types.is_datetime64_any_dtype(i["fecha"]) else i["fecha"],
+        "fecha": _to_date(i["fecha"]),
+        "valor": _numeric(i["valor"]),
+        "area_apli": _numeric(i["area_apli"]),
+    })
+    # La vista agrupa por el texto original de la fecha y expone to_date(fecha)
+    g = frame.groupby(["zona", "hacienda", "actividad", "fecha_txt"], dropna=False, sort=False)
+    out = g.agg(fecha=("fecha", "first"), costo_total=("valor", _sum), area_total=("area_apli", _sum)).reset_index()
+    out["costo_por_hectarea"] = _ratio(out["costo_total"], out["area_total"])
+    out["fecha"] = out["fecha"].dt.date
+    return out[["zona", "hacienda", "actividad", "fecha", "costo_total", "area_total", "costo_por_hectarea"]]
+
+
+def vista_produccion_maquinaria(rep_maquinaria: pd.DataFrame) -> pd.DataFrame:
+    rm = rep_maquinaria[rep_maquinaria["unidad_produccion"].astype("string") == "HA"]
+    frame = pd.DataFrame({
+        "nombre_actividad": _as_text(rm["nombre_actividad"]),
+        "cantidad_produccion": _numeric(rm["cantidad_produccion"]),
+        "duracion_horas": _numeric(rm["duracion_horas"]),
+    })
+    g = frame.groupby("nombre_actividad", dropna=False, sort=False)
+    out = g.agg(total_produccion=("cantidad_produccion", _sum), total_horas=("duracion_horas", _sum)).reset_index()
+    out["produccion_por_hora"] = _ratio(out["total_produccion"], out["total_horas"])
+    return out.sort_values("produccion_por_hora", ascending=False, kind="stable").head(5).reset_index(drop=True)
+
+
+def vista_combustible_por_unidad_producida(abastecimientos: pd.DataFrame, rep_maquinaria: pd.DataFrame) -> pd.DataFrame:
+    a = pd.DataFrame({
+        "equipo": _as_text(abastecimientos["equipo"]),
+        "dia": _to_date(abastecimientos["fecha"]),
+        "galones": _numeric(abastecimientos["galones"]),
+    })
+    rm = rep_maquinaria[rep_maquinaria["unidad"].astype("string") == "H"]
+    r = pd.DataFrame({
+        "equipo": _as_text(rm["equipo"]),
+        "dia": _to_date(rm["fecha"]),
+        "cantidad_produccion": _numeric(rm["cantidad_produccion"]),
+    })
+    # JOIN interno: NULL no empareja, cada par (a, rm) cuenta una vez como en SQL
+    a = a.dropna(subset=["equipo", "dia"])
+    r = r.dropna(subset=["equipo", "dia"])
+    joined = a.merge(r, on=["equipo", "dia"], how="inner")
+    joined["mes"] = joined["dia"].dt.strftime("%Y-%m")
+    out = joined.groupby("mes", sort=False).agg(
+        total_galones=("galones", _sum), total_produccion=("cantidad_produccion", _sum)
+    ).reset_index()
+    out["galones_por_unidad"] = _ratio(out["total_galones"], out["total_produccion"])
+    return out[["mes", "total_galones", "total_produccion", "galones_por_unidad"]]
+
+
+# ------------------------------------------------------------------ backend local
+class LocalAnalytics:
+    """
+    Backend local del dashboard: lee una vez los Parquet procesados (solo las
+    columnas necesarias), materializa las cuatro vistas en memoria y responde
+    las mismas consultas que views/queries.py filtrando esos resultados.
+    """
+
+    def __init__(self, cfg: Dict):
+        self.cfg = cfg
+        self._lock = threading.Lock()
+        self._views: Optional[Dict[str, pd.DataFrame]] = None
+        self._sources: Dict[str, pd.DataFrame] = {}
+
+    def _read(self, dataset: str) -> pd.DataFrame:
+        columns = SOURCE_COLUMNS[dataset]
+        if not processed_dataset_path(self.cfg, dataset).exists():
+            return pd.DataFrame({c: pd.Series(dtype=object) for c in columns})
+        return read_processed(dataset, self.cfg, columns=columns)
+
+    def generation(self) -> int:
+        """Última modificación (ns) de los Parquet procesados; cambia con cada corrida."""
+        stamps = [
+            p.stat().st_mtime_ns
+            for ds in SOURCE_COLUMNS
+            for p in processed_dataset_path(self.cfg, ds).rglob("*.parquet")
+        ]
+        return max(stamps, default=0)
+
+    def refresh(self) -> None:
+        """Vuelve a leer las fuentes y recalcula las vistas."""
+        sources = {ds: self._read(ds) for ds in SOURCE_COLUMNS}
+        views = {
+            "vista_productividad_trabajador": vista_productividad_trabajador(sources["actividades"]),
+            "vista_costo_insumos_por_hectarea": vista_costo_insumos_por_hectarea(sources["insumos"]),
+            "vista_produccion_maquinaria": vista_produccion_maquinaria(sources["rep_maquinaria"]),
+            "vista_combustible_por_unidad_producida": vista_combustible_por_unidad_producida(
+                sources["abastecimientos"], sources["rep_maquinaria"]
+            ),
+        }
+        with self._lock:
+            self._sources, self._views = sources, views
+
+    def view(self, name: str) -> pd.DataFrame:
+        if self._views is None:
+            self.refresh()
+        return self._views[name]
+
+    def options(self) -> Dict[str, List]:
+        """Mismas listas que queries.OPTION_QUERIES."""
+        if self._views is None:
+            self.refresh()
+        act = self._sources["actividades"]
+        act = act[act["unidade"].astype("string") == "HA"]
+        ins = self._sources["insumos"]
+        ins = ins[ins["um_prod"].astype("string") == "HA"]
+
+        def distinct(s: pd.Series, reverse: bool = False) -> List:
+            return sorted(_as_text(s).dropna().unique(), reverse=reverse)
+
+        return {
+            "trabajador": distinct(act["func"]),
+            "actividad_trabajador": distinct(act["actividad"]),
+            "hacienda": distinct(ins["nm_faz"]),
+            "actividad_insumo": distinct(ins["nm_actividad"]),
+            "actividad_maquinaria": distinct(self.view("vista_produccion_maquinaria")["nombre_actividad"]),
+            "mes": distinct(self.view("vista_combustible_por_unidad_producida")["mes"], reverse=True),
+        }
+
+    # Equivalentes de views/queries.py
+    def productividad(self, trabajadores: Selection = None, actividades: Selection = None) -> pd.DataFrame:
+        v = _isin(_isin(self.view("vista_productividad_trabajador"), "trabajador", trabajadores), "actividad", actividades)
+        out = v.groupby(["empresa", "actividad"], dropna=False, sort=False).agg(
+            total_producido=("total_producido", _sum),
+            cantidad_registros=("cantidad_registros", "sum"),
+            registros_con_produccion=("registros_con_produccion", "sum"),
+        ).reset_index()
+        out["promedio_produccion"] = out["total_producido"] / out["registros_con_produccion"].replace(0, np.nan)
+        out = out.drop(columns="registros_con_produccion")
+        return out.sort_values("total_producido", ascending=False, kind="stable").reset_index(drop=True)
+
+    def costo_hectarea(self, haciendas: Selection = None, actividades: Selection = None) -> pd.DataFrame:
+        v = _isin(_isin(self.view("vista_costo_insumos_por_hectarea"), "hacienda", haciendas), "actividad", actividades)
+        out = v.groupby(["actividad", "fecha"], dropna=False, sort=False).agg(
+            costo_total=("costo_total", _sum), area_total=("area_total", _sum)
+        ).reset_index()
+        out["costo_por_hectarea"] = _ratio(out["costo_total"], out["area_total"])
+        return out.sort_values("fecha", kind="stable").reset_index(drop=True)
+
+    def produccion_maquinaria(self, actividades: Selection = None) -> pd.DataFrame:
+        v = _isin(self.view("vista_produccion_maquinaria"), "nombre_actividad", actividades)
+        return v.sort_values("produccion_por_hora", ascending=False, kind="stable").reset_index(drop=True)
+
+    def combustible(self, meses: Selection = None) -> pd.DataFrame:
+        v = _isin(self.view("vista_combustible_por_unidad_producida"), "mes", meses)
+        return v.sort_values("mes").reset_index(drop=True)
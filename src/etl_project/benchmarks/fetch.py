@@ -0,0 +1,95 @@
+"""
+Benchmark de lectura de resultados: pd.read_sql contra la ruta columnar de
+DatabaseConnection (fetch_arrow / fetch_df) sobre las vistas stage.*.
+
+Requiere la base configurada en settings.yaml con las vistas creadas.
+
+Uso:
+    python -m etl_project.benchmarks.fetch --repeats 5
+    python -m etl_project.benchmarks.fetch --views vista_costo_insumos_por_hectarea --chunk-rows 50000
+"""
+
+from __future__ import annotations
+
+import argparse
+import platform
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+import pandas as pd
+
+from etl_project.benchmarks.suite import _git_commit, _print_table, _result, _timeit, save_results
+from etl_project.config import load_settings
+from etl_project.conexiondb import DatabaseConnection, _adbc_available
+
+VIEWS = (
+    "vista_productividad_trabajador",
+    "vista_costo_insumos_por_hectarea",
+    "vista_produccion_maquinaria",
+    "vista_combustible_por_unidad_producida",
+)
+
+
+def bench_view(db: DatabaseConnection, view: str, *, repeats: int = 3, chunk_rows: int = 100_000) -> List[Dict[str, Any]]:
+    """Mide las tres rutas de lectura de una vista y verifica que devuelven lo mismo."""
+    sql = f"SELECT * FROM stage.{view}"
+    engine = db.get_engine()
+
+    expected = pd.read_sql(sql, engine)
+    got = db.fetch_df(sql)
+    if len(got) != len(expected) or list(got.columns) != list(expected.columns):
+        raise AssertionError(f"{view}: fetch_df no coincide con read_sql")
+
+    rows = len(expected)
+    return [
+        _result("read_sql", view, "live", rows, _timeit(lambda: pd.read_sql(sql, engine), repeats)),
+        _result("fetch_arrow", view, "live", rows, _timeit(lambda: db.fetch_arrow(sql), repeats)),
+        _result("fetch_df", view, "live", rows, _timeit(lambda: db.fetch_df(sql), repeats)),
+        _result(
+            "iter_arrow",
+            view,
+            "live",
+            rows,
+            _timeit(lambda: sum(t.num_rows for t in db.iter_arrow(sql, chunk_rows=chunk_rows)), repeats),
+        ),
+    ]
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="etl bench fetch", description="read_sql vs lectura columnar en stage.*")
+    parser.add_argument("--config", default="config/settings.yaml")
+    parser.add_argument("--views", help="Vistas separadas por coma (por defecto las cuatro del dashboard)")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--chunk-rows", type=int, default=100_000)
+    args = parser.parse_args(argv)
+
+    cfg = load_settings(args.config)
+    db = DatabaseConnection(args.config)
+    views = args.views.split(",") if args.views else list(VIEWS)
+    results: List[Dict[str, Any]] = []
+    for view in views:
+        print(f"[bench fetch] {view}...")
+        results.extend(bench_view(db, view, repeats=args.repeats, chunk_rows=args.chunk_rows))
+
+    doc = {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "pandas": pd.__version__,
+            "machine": platform.machine(),
+            "fetch_path": "adbc" if _adbc_available() else "copy_csv",
+        },
+        "results": results,
+    }
+    _print_table(results, ["benchmark", "dataset", "rows", "best_seconds", "mean_seconds"])
+    bcfg = cfg.get("benchmarks", {}) or {}
+    base = Path(cfg.get("paths", {}).get("base", "."))
+    path = save_results(doc, base / bcfg.get("results_dir", "data/benchmarks/"))
+    print(f"[bench fetch] Resultados -> {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,269 @@
+"""
+Suite de benchmarks con datos sintéticos: ExcelLoader, cada transformación,
+cada *Pipeline.run() y CSVLoader contra una base local (SQLite) de reemplazo.
+
+Uso:
+    python scripts/run_benchmarks.py --sizes 10k,1m
+    python scripts/run_benchmarks.py --compare data/benchmarks/bench_<a>.json data/benchmarks/bench_<b>.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import pandas as pd
+
+from etl_project.benchmarks.synthetic import GENERATORS, make_frame, parse_size, write_workbooks
+from etl_project.config import load_settings
+from etl_project.loaders import ExcelLoader
+from etl_project.profiling import RunProfiler
+from etl_project.runner import get_pipeline
+
+
+class FrameLoader:
+    """Loader de reemplazo que entrega un DataFrame ya generado en lugar de leer Excel."""
+
+    def __init__(self, df: pd.DataFrame):
+        self.df = df
+
+    def read_many_recursive(self, subdir, **kwargs) -> pd.DataFrame:
+        return self.df
+
+
+class SQLiteConnection:
+    """
+    Base local que reemplaza a DatabaseConnection en los benchmarks de carga.
+    El esquema 'raw' se adjunta como una segunda base SQLite.
+    """
+
+    def __init__(self, folder: Path):
+        from sqlalchemy import create_engine, event
+
+        self.engine = create_engine(f"sqlite:///{folder / 'main.db'}")
+        raw_path = folder / "raw.db"
+
+        @event.listens_for(self.engine, "connect")
+        def _attach(dbapi_conn, _record):
+            dbapi_conn.execute(f"ATTACH DATABASE '{raw_path}' AS raw")
+
+    def get_engine(self):
+        return self.engine
+
+    def invalidate(self, table: str) -> int:
+        """Sin cache de consultas en la base de benchmarks."""
+        return 0
+
+    def drop(self, table: str, schema: str = "raw") -> None:
+        from sqlalchemy import text
+
+        with self.engine.begin() as conn:
+            conn.execute(text(f"DROP TABLE IF EXISTS {schema}.{table}"))
+
+    def close(self) -> None:
+        self.engine.dispose()
+
+
+def _timeit(fn: Callable[[], Any], repeats: int, setup: Optional[Callable[[], Any]] = None) -> List[float]:
+    times = []
+    for _ in range(repeats):
+        if setup is not None:
+            setup()
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return times
+
+
+def _result(benchmark: str, dataset: str, size: str, rows: int, times: Sequence[float]) -> Dict[str, Any]:
+    return {
+        "benchmark": benchmark,
+        "dataset": dataset,
+        "size": size,
+        "rows": rows,
+        "best_seconds": round(min(times), 6),
+        "mean_seconds": round(statistics.fmean(times), 6),
+        "repeats": len(times),
+    }
+
+
+def _git_commit() -> str:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True)
+        return out.stdout.strip()
+    except Exception:
+        return "unknown"
+
+
+def bench_dataset(
+    dataset: str,
+    size: str,
+    cfg: Dict,
+    workdir: Path,
+    *,
+    repeats: int = 3,
+    excel_max_rows: int = 100_000,
+) -> List[Dict[str, Any]]:
+    """Ejecuta todos los benchmarks de un dataset a un tamaño dado."""
+    rows = parse_size(size)
+    raw = make_frame(dataset, rows)
+    results: List[Dict[str, Any]] = []
+
+    # Pipeline.run() sin lectura de Excel; los pasos de transforms.py se miden con el profiler
+    pipeline = get_pipeline(dataset)(FrameLoader(raw), cfg)
+    step_times: Dict[str, List[float]] = {}
+    run_times = []
+    out = None
+    for _ in range(repeats):
+        profiler = RunProfiler(name="bench")
+        t0 = time.perf_counter()
+        with profiler:
+            out = pipeline.run()
+        run_times.append(time.perf_counter() - t0)
+        # Pasos repetidos en una misma corrida (p. ej. dos filtros) se suman por corrida
+        per_run: Dict[str, float] = {}
+        for rec in profiler.records:
+            if rec.parent and rec.parent.endswith("/transform"):
+                per_run[rec.stage] = per_run.get(rec.stage, 0.0) + rec.wall_seconds
+        for step, seconds in per_run.items():
+            step_times.setdefault(step, []).append(seconds)
+    results.append(_result("pipeline.run", dataset, size, rows, run_times))
+    for step, times in step_times.items():
+        results.append(_result(f"transforms.{step}", dataset, size, rows, times))
+
+    # ExcelLoader sobre workbooks sintéticos (limitado: escribir xlsx grandes toma minutos)
+    if rows <= excel_max_rows:
+        folder = workdir / "xlsx" / dataset / size
+        write_workbooks(raw, folder, stem=dataset)
+        loader = ExcelLoader(workdir)
+        times = _timeit(lambda: loader.read_many_recursive(folder.relative_to(workdir)), max(1, repeats // 2))
+        results.append(_result("ExcelLoader.read_many_recursive", dataset, size, rows, times))
+
+    # CSVLoader contra la base local
+    from etl_project.CSVLoader import CSVLoader
+
+    csv_path = workdir / f"{dataset}_{size}.csv"
+    out.to_csv(csv_path, index=False, encoding="utf-8", date_format="%d/%m/%Y")
+    db = SQLiteConnection(workdir)
+    try:
+        csv_loader = CSVLoader(table_name=dataset, schema="raw", db=db)
+        times = _timeit(lambda: csv_loader.load_csv(csv_path), repeats, setup=lambda: db.drop(dataset))
+        results.append(_result("CSVLoader.load_csv", dataset, size, len(out), times))
+    finally:
+        db.close()
+    return results
+
+
+def run_suite(
+    cfg: Dict,
+    *,
+    sizes: Sequence[str] = ("10k",),
+    datasets: Sequence[str] = tuple(GENERATORS),
+    repeats: int = 3,
+    excel_max_rows: int = 100_000,
+) -> Dict[str, Any]:
+    """Ejecuta la suite completa y devuelve el documento de resultados."""
+    results: List[Dict[str, Any]] = []
+    with tempfile.TemporaryDirectory(prefix="etl_bench_") as tmp:
+        workdir = Path(tmp)
+        for size in sizes:
+            for dataset in datasets:
+                print(f"[bench] {dataset} @ {size}...")
+                results.extend(
+                    bench_dataset(dataset, size, cfg, workdir, repeats=repeats, excel_max_rows=excel_max_rows)
+                )
+    return {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "pandas": pd.__version__,
+            "machine": platform.machine(),
+        },
+        "results": results,
+    }
+
+
+def save_results(doc: Dict[str, Any], results_dir: Path) -> Path:
+    """Guarda los resultados como bench_<timestamp>_<commit>.json para comparar entre commits."""
+    results_dir.mkdir(parents=True, exist_ok=True)
+    stamp = doc["meta"]["timestamp"].replace(":", "").replace("-", "")
+    path = results_dir / f"bench_{stamp}_{doc['meta']['commit']}.json"
+    path.write_text(json.dumps(doc, indent=2), encoding="utf-8")
+    return path
+
+
+def compare_results(old: Dict[str, Any], new: Dict[str, Any], threshold: float = 0.10) -> List[Dict[str, Any]]:
+    """
+    Compara dos corridas por (benchmark, dataset, size). Marca como regresión
+    los casos cuyo best_seconds empeora más que 'threshold'.
+    """
+    key = lambda r: (r["benchmark"], r["dataset"], r["size"])  # noqa: E731
+    base = {key(r): r for r in old["results"]}
+    rows = []
+    for r in new["results"]:
+        prev = base.get(key(r))
+        if prev is None or prev["best_seconds"] == 0:
+            continue
+        ratio = r["best_seconds"] / prev["best_seconds"]
+        rows.append({
+            "benchmark": r["benchmark"],
+            "dataset": r["dataset"],
+            "size": r["size"],
+            "old": prev["best_seconds"],
+            "new": r["best_seconds"],
+            "ratio": round(ratio, 3),
+            "regression": ratio > 1 + threshold,
+        })
+    return rows
+
+
+def _print_table(rows: List[Dict[str, Any]], columns: Sequence[str]) -> None:
+    print(pd.DataFrame(rows, columns=list(columns)).to_string(index=False))
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="etl bench", description="Benchmarks del ETL con datos sintéticos.")
+    parser.add_argument("--config", default="config/settings.yaml")
+    parser.add_argument("--sizes", help="Tamaños separados por coma: 10k,1m,10m")
+    parser.add_argument("--datasets", help="Datasets separados por coma (por defecto todos)")
+    parser.add_argument("--repeats", type=int)
+    parser.add_argument("--excel-max-rows", type=int, help="Máximo de filas para el benchmark de Excel")
+    parser.add_argument("--compare", nargs=2, metavar=("ANTERIOR", "NUEVO"), help="Compara dos archivos de resultados")
+    parser.add_argument("--threshold", type=float, default=0.10)
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        old, new = (json.loads(Path(p).read_text(encoding="utf-8")) for p in args.compare)
+        rows = compare_results(old, new, args.threshold)
+        _print_table(rows, ["benchmark", "dataset", "size", "old", "new", "ratio", "regression"])
+        return 1 if any(r["regression"] for r in rows) else 0
+
+    cfg = load_settings(args.config)
+    bcfg = cfg.get("benchmarks", {}) or {}
+    sizes = args.sizes.split(",") if args.sizes else bcfg.get("sizes", ["10k"])
+    datasets = args.datasets.split(",") if args.datasets else list(GENERATORS)
+    doc = run_suite(
+        cfg,
+        sizes=sizes,
+        datasets=datasets,
+        repeats=args.repeats or bcfg.get("repeats", 3),
+        excel_max_rows=args.excel_max_rows or bcfg.get("excel_max_rows", 100_000),
+    )
+    _print_table(doc["results"], ["benchmark", "dataset", "size", "rows", "best_seconds", "mean_seconds"])
+    base = Path(cfg.get("paths", {}).get("base", "."))
+    path = save_results(doc, base / bcfg.get("results_dir", "data/benchmarks/"))
+    print(f"[bench] Resultados -> {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,243 @@
+"""Generador de datos sintéticos con los mismos encabezados que los Excel reales."""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Callable, Dict, List, Union
+
+import numpy as np
+import pandas as pd
+
+# Límite de filas por hoja de Excel (xlsx)
+EXCEL_MAX_ROWS = 1_048_575
+
+SIZES = {"10k": 10_000, "100k": 100_000, "1m": 1_000_000, "10m": 10_000_000}
+
+_HACIENDAS = [
+    "075 - SANTA MONICA", "124 - LA CATALINA", "014 - EL PARAISO", "001 - LA ESPERANZA",
+    "032 - SAN JOSE", "058 - LA MARIA", "091 - EL ROSARIO", "110 - LA PALMA",
+]
+_ACTIVIDADES = [
+    "Cargue manual de fertilizantes", "Corte manual de caña", "Riego por gravedad",
+    "Control manual de malezas", "Resiembra", "Aplicación de madurante",
+]
+_ACT_INSUMOS = [
+    "18860 - FERTILIZACIÓN TASA VARIADA GRANULADA",
+    "18850 - FERTILIZACIÓN MECANICA - UREA-KCL-MAP-DAP-MENORES",
+    "18420 - CONTROL QUIMICO DE MALEZAS",
+    "18910 - APLICACIÓN AEREA DE MADURANTE",
+]
+_PRODUCTOS = [
+    "20810037 - MEZCLA NITROSAM SOCAS", "20810084 - CLORURO DE POTASIO (KCL) GRANULADO",
+    "20810012 - UREA GRANULADA", "20820005 - GLIFOSATO 480 SL",
+]
+_ACT_MAQUINARIA = ["Preparación de suelos", "Cultivo mecánico", "Alce de caña", "Fertilización mecánica", "Transporte"]
+_TALHOES = ["0000", "A000", "B000", "C000"]
+
+
+def parse_size(size: Union[str, int]) -> int:
+    """Convierte '10k', '1m', '10m' (o un entero) a número de filas."""
+    if isinstance(size, int):
+        return size
+    key = str(size).strip().lower()
+    if key in SIZES:
+        return SIZES[key]
+    if key.endswith("k"):
+        return int(float(key[:-1]) * 1_000)
+    if key.endswith("m"):
+        return int(float(key[:-1]) * 1_000_000)
+    return int(key)
+
+
+def _equipos(rng: np.random.Generator, n_equipos: int = 400) -> np.ndarray:
+    """Códigos de equipo tipo 'TRC1-7548', compartidos entre abastecimientos y maquinaria."""
+    prefijos = np.array(["TRC1", "CTA1", "VOL2", "MOT1", "TRA3"], dtype=object)
+    nums = rng.choice(np.arange(1000, 9999), size=n_equipos, replace=False).astype(str)
+    return prefijos[rng.integers(0, len(prefijos), n_equipos)] + "-" + nums.astype(object)
+
+
+def _fechas(rng: np.random.Generator, n: int, days: int = 365) -> pd.DatetimeIndex:
+    start = np.datetime64("2025-01-01")
+    return pd.DatetimeIndex(start + rng.integers(0, days, n).astype("timedelta64[D]"))
+
+
+def _digits(rng: np.random.Generator, n: int, width: int) -> np.ndarray:
+    """Cadenas numéricas de 'width' dígitos (para IDs largos que no caben en int64)."""
+    return rng.integers(10 ** (width - 1), 10**width, n).astype(str).astype(object)
+
+
+def _pick(rng: np.random.Generator, values: List, n: int) -> np.ndarray:
+    return np.asarray(values, dtype=object)[rng.integers(0, len(values), n)]
+
+
+def make_abastecimientos(n: int, seed: int = 0) -> pd.DataFrame:
+    """Salidas de combustible SAP (abastecimientos_sap.xlsx)."""
+    rng = np.random.default_rng(seed)
+    equipos = _equipos(np.random.default_rng(seed + 1000))
+    centro = rng.choice([1010007.0, 1010040.0, 1010042.0, 30000000.0], size=n)
+    centro[rng.random(n) < 0.05] = np.nan
+    return pd.DataFrame({
+        "Material": np.full(n, 209.0),
+        "Texto breve de material": np.full(n, "BIOACEM AL 10% (B10)", dtype=object),
+        "Almacén": np.full(n, 1225.0),
+        "Clase de movimiento": np.where(rng.random(n) < 0.92, 261, 262),
+        "Posición doc.mat.": np.ones(n, dtype=np.int64),
+        "Orden": "001" + _pick(rng, list(equipos), n),
+        "Nº reserva": np.zeros(n, dtype=np.int64),
+        "Centro de coste": centro,
+        "Fe.contabilización": _fechas(rng, n),
+        "Un.medida de entrada": np.full(n, "GLN", dtype=object),
+        "Ctd.en UM entrada": -np.round(rng.gamma(2.0, 40.0, n), 3),
+    })
+
+
+def make_actividades(n: int, seed: int = 0) -> pd.DataFrame:
+    """Apuntamiento de actividades de campo (actividades.xlsx)."""
+    rng = np.random.default_rng(seed)
+    fecha = _fechas(rng, n)
+    cantidad = np.round(rng.gamma(2.0, 3.5, n), 2)
+    a_pag = np.round(rng.uniform(5000, 15000, n), 3)
+    unidade = np.where(rng.random(n) < 0.6, "HA", "H").astype(object)
+    return pd.DataFrame({
+        "TENENCIA": np.ones(n),
+        "ID": _digits(rng, n, 11) + _digits(rng, n, 11),
+        "EMPRESA": np.full(n, 99, dtype=np.int64),
+        "Nom. Empresa": np.full(n, "MANUELITA S.A.", dtype=object),
+        "FAZENDA": rng.integers(1, 130, n),
+        "LOTE": rng.integers(1, 80, n),
+        "TALHAO": _pick(rng, _TALHOES, n),
+        "CCUSTO": np.full(n, 1010042, dtype=np.int64),
+        "CENCOS": np.full(n, "Fertilización", dtype=object),
+        "OPER": rng.integers(18000, 19000, n),
+        "ACTIVIDAD": _pick(rng, _ACTIVIDADES, n),
+        "DATA": fecha,
+        "QUANTIDADE": cantidad,
+        "A_PAG_UNI": a_pag,
+        "VALOR_TOTAL": np.round(cantidad * a_pag, 3),
+        "UNIDADE": unidade,
+        "UM_PROD": unidade,
+        "DOC_ERP1": np.full(n, np.nan),
+        "OS": rng.integers(800000, 900000, n),
+        "FUNC": rng.integers(80000, 90000, n),
+        "PARADA": np.full(n, np.nan),
+        "MOV_PARADA": np.full(n, np.nan),
+        "QTD_PROD": cantidad,
+        "AREA_REAL_SUERTE": np.round(rng.uniform(2, 40, n), 2),
+        "FCH_CORT_SIEM": _fechas(rng, n, days=720) - pd.Timedelta(days=365),
+    })
+
+
+def make_insumos(n: int, seed: int = 0) -> pd.DataFrame:
+    """Detalle de apuntamiento de insumos (detalle_apuntamiento_insumos.xlsx)."""
+    rng = np.random.default_rng(seed)
+    area_apli = np.round(rng.uniform(0.5, 12, n), 2)
+    dosis = np.round(rng.uniform(50, 500, n), 4)
+    cant = np.round(area_apli * dosis, 3)
+    return pd.DataFrame({
+        "ZONA": _pick(rng, ["Zona Norte", "Zona Sur", "Zona Centro"], n),
+        "DATA_APLI": _fechas(rng, n),
+        "TENENCIA": np.full(n, "Participación", dtype=object),
+        "NM_FAZ": _pick(rng, _HACIENDAS, n),
+        "LOTE": rng.integers(1, 80, n),
+        "TAL": _pick(rng, _TALHOES, n),
+        "OCUP": np.full(n, "COM", dtype=object),
+        "OS": rng.integers(800000, 900000, n),
+        "NM_ACTIVIDAD": _pick(rng, _ACT_INSUMOS, n),
+        "CCUSTO": np.full(n, 1010042, dtype=np.int64),
+        "CENCO_NOM": np.full(n, "Fertilización", dtype=object),
+        "EMPRESA": np.full(n, 99, dtype=np.int64),
+        "NM_EMPRESA": np.full(n, "MANUELITA S.A.", dtype=object),
+        "PRODUTO": rng.integers(20810000, 20830000, n),
+        "UM": np.full(n, "KG", dtype=object),
+        "NM_PRODUCTO": _pick(rng, _PRODUCTOS, n),
+        "NM_TP_PROD": np.full(n, "Fertilizante", dtype=object),
+        "UM_PROD": np.where(rng.random(n) < 0.9, "HA", "UN").astype(object),
+        "DOSIS": dosis,
+        "AREA_APLI": area_apli,
+        "AREA_REAL": np.round(area_apli * rng.uniform(1, 6, n), 2),
+        "AREA": np.round(area_apli / 2, 2),
+        "CANT_APLI": cant,
+        "VALOR": np.round(cant * rng.uniform(500, 3000, n), 2),
+        "Doc Erp": rng.integers(300000, 400000, n),
+    })
+
+
+def make_rep_maquinaria(n: int, seed: int = 0) -> pd.DataFrame:
+    """
+    Reporte de maquinaria. Los encabezados se derivan de settings.yaml y de
+    raw.rep_maquinaria (el Excel trae dos columnas 'Suerte Apuntamiento').
+    """
+    rng = np.random.default_rng(seed)
+    equipos = _equipos(np.random.default_rng(seed + 1000))
+    fecha = _fechas(rng, n)
+    inicio = rng.integers(5 * 60, 14 * 60, n)
+    dur = rng.integers(30, 8 * 60, n)
+    horo_ini = np.round(rng.uniform(1000, 20000, n), 1)
+    df = pd.DataFrame({
+        "Codigo Equipo": rng.integers(10000, 99999, n).astype(str).astype(object),
+        "Equip": _pick(rng, list(equipos), n),
+        "Parada": np.full(n, np.nan),
+        "Trabajador": rng.integers(80000, 90000, n),
+        "Nombre Operador": np.full(n, "OPERADOR", dtype=object),
+        "Nombre de la Empresa": np.full(n, "MANUELITA S.A.", dtype=object),
+        "Ccusto Act": np.full(n, "1010042", dtype=object),
+        "Actividad": rng.integers(18000, 19000, n).astype(str).astype(object),
+        "Nombre Actividad": _pick(rng, _ACT_MAQUINARIA, n),
+        "Fecha": pd.Series(fecha).dt.strftime("%d/%m/%Y %I:%M:%S %p").to_numpy(dtype=object),
+        "Implemento 1": _pick(rng, ["RASTRA", "SURCADOR", "CULTIVADORA", ""], n),
+        "Hora Inicial": pd.to_datetime(inicio, unit="m").strftime("%H:%M:%S").to_numpy(dtype=object),
+        "Hora Final": pd.to_datetime(np.minimum(inicio + dur, 23 * 60 + 59), unit="m").strftime("%H:%M:%S").to_numpy(dtype=object),
+        "Duracion Horas": np.round(dur / 60, 2),
+        "Duracion Medidor": np.round(dur / 60 * rng.uniform(0.9, 1.1, n), 2),
+        "Empresa de la Maquina": np.full(n, "MANUELITA S.A.", dtype=object),
+        "Unidad Produccion": np.where(rng.random(n) < 0.7, "HA", "TON").astype(object),
+        "Cantidad Produccion": np.round(rng.gamma(2.0, 4.0, n), 2),
+        "Horometro Inicial": horo_ini,
+        "Horometro Final": np.round(horo_ini + dur / 60, 1),
+        "Unidad": np.where(rng.random(n) < 0.8, "H", "KM").astype(object),
+        "Cantidad": np.round(dur / 60, 2),
+        "TipoReg": np.full(n, "P", dtype=object),
+        "NM Parada": np.full(n, "", dtype=object),
+        "Hacienda O.S.": _pick(rng, [h[:3] for h in _HACIENDAS], n),
+        "Suerte Apuntamiento": rng.integers(1, 80, n),
+        "Suerte Apuntamiento.1": _pick(rng, _TALHOES, n),
+        "Nro de la OS": rng.integers(800000, 900000, n).astype(str).astype(object),
+    })
+    return df
+
+
+GENERATORS: Dict[str, Callable[[int, int], pd.DataFrame]] = {
+    "abastecimientos": make_abastecimientos,
+    "actividades": make_actividades,
+    "insumos": make_insumos,
+    "rep_maquinaria": make_rep_maquinaria,
+}
+
+
+def make_frame(dataset: str, size: Union[str, int], seed: int = 0) -> pd.DataFrame:
+    """Genera el DataFrame crudo (encabezados originales) de un dataset."""
+    if dataset not in GENERATORS:
+        raise KeyError(f"Dataset sintético desconocido: {dataset}")
+    return GENERATORS[dataset](parse_size(size), seed)
+
+
+def write_workbooks(
+    df: pd.DataFrame,
+    folder: Union[str, Path],
+    *,
+    stem: str = "sintetico",
+    rows_per_file: int = EXCEL_MAX_ROWS,
+) -> List[Path]:
+    """
+    Escribe el DataFrame como uno o varios .xlsx en 'folder' (una hoja por archivo,
+    respetando el límite de filas de Excel). Devuelve las rutas escritas.
+    """
+    folder = Path(folder)
+    folder.mkdir(parents=True, exist_ok=True)
+    rows_per_file = min(rows_per_file, EXCEL_MAX_ROWS)
+    paths: List[Path] = []
+    for i, start in enumerate(range(0, max(len(df), 1), rows_per_file)):
+        path = folder / f"{stem}_{i:04d}.xlsx"
+        df.iloc[start:start + rows_per_file].to_excel(path, index=False, engine="openpyxl")
+        paths.append(path)
+    return paths
@@ -0,0 +1,552 @@
+"""
+Benchmark de las vistas stage.*: carga las tablas raw.* en un PostgreSQL local
+de reemplazo, corre cada vista con EXPLAIN (ANALYZE, BUFFERS) y guarda tiempos
+y forma del plan en JSON para detectar regresiones cuando cambia el DDL
+(sql/1.crear_tablas.sql) o el volumen de datos.
+
+PostgreSQL de reemplazo (--stand-in):
+- cluster: initdb + pg_ctl en un directorio temporal (binarios en el PATH o
+  --pg-bin), socket unix y puerto libre, sin fsync.
+- docker: contenedor efímero de benchmarks.views.image.
+- dsn: un servidor ya levantado (--dsn), p. ej. el servicio de CI. Se ejecuta
+  el DDL completo: nunca apuntarlo a la base de producción.
+- auto (por defecto): --dsn si se pasó, si no cluster y luego docker.
+
+Datos: sintéticos del tamaño --size pasados por cada *Pipeline (como la suite),
+o los de producción con --from-processed (data/processed/*.csv y el estado del
+hecho combustible vs. producción).
+
+Cada corrida se compara con la línea base <results_dir>/views/baseline.json: es
+regresión si una vista tarda más de (1 + threshold) veces lo esperado para el
+nuevo volumen de sus tablas fuente, o si cambió la forma del plan. Todas las
+corridas se guardan, pero solo una sin regresiones (o una aceptada con --pin)
+pasa a ser la línea base: una corrida lenta no esconde la regresión siguiente.
+
+Uso:
+    etl bench views --size 100k
+    etl bench views --from-processed --repeats 3
+    etl bench views --size 100k --pin      # acepta el plan nuevo tras cambiar el DDL
+    etl bench views --compare data/benchmarks/views/bench_<a>.json data/benchmarks/views/bench_<b>.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import platform
+import shutil
+import socket
+import subprocess
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+import pandas as pd
+
+from etl_project.benchmarks.fetch import VIEWS
+from etl_project.benchmarks.suite import FrameLoader, _git_commit, _print_table, _result, save_results
+from etl_project.config import load_settings
+
+VIEWS_DEFAULTS = {
+    "size": "100k",
+    "repeats": 5,
+    "threshold": 0.20,
+    "stand_in": "auto",
+    "image": "postgres:16",
+    "ddl": "sql/1.crear_tablas.sql",
+}
+
+# Campos del nodo que definen la forma del plan (sin costos ni filas estimadas).
+# "Sort Method" no: es un resultado de la ejecución (quicksort/external merge
+# según el volumen y work_mem), se reporta aparte en sort_methods.
+_SHAPE_KEYS = ("Relation Name", "Join Type", "Strategy", "Index Name")
+
+
+class LocalPostgres:
+    """
+    PostgreSQL desechable para el benchmark. Uso:
+
+        with LocalPostgres("auto") as pg:
+            engine = create_engine(pg.url)
+    """
+
+    def __init__(
+        self,
+        mode: str = "auto",
+        *,
+        dsn: Optional[str] = None,
+        pg_bin: Optional[str] = None,
+        image: str = "postgres:16",
+        startup_timeout: float = 60.0,
+    ):
+        self.mode = mode
+        self.dsn = dsn
+        self.pg_bin = pg_bin
+        self.image = image
+        self.startup_timeout = startup_timeout
+        self.url: Optional[str] = None
+        self.kind: Optional[str] = None
+        self._tmp: Optional[tempfile.TemporaryDirectory] = None
+        self._container: Optional[str] = None
+
+    def _tool(self, name: str) -> Optional[str]:
+        if self.pg_bin:
+            path = Path(self.pg_bin) / name
+            return str(path) if path.exists() else None
+        return shutil.which(name)
+
+    def _resolve_mode(self) -> str:
+        if self.mode != "auto":
+            return self.mode
+        if self.dsn:
+            return "dsn"
+        if self._tool("initdb") and self._tool("pg_ctl"):
+            return "cluster"
+        if shutil.which("docker"):
+            return "docker"
+        raise RuntimeError(
+            "No hay PostgreSQL de reemplazo: instale los binarios (initdb/pg_ctl), docker, o pase --dsn"
+        )
+
+    def __enter__(self) -> "LocalPostgres":
+        self.kind = self._resolve_mode()
+        if self.kind == "dsn":
+            if not self.dsn:
+                raise ValueError("--stand-in dsn requiere --dsn")
+            self.url = self.dsn
+            return self
+        if self.kind not in ("cluster", "docker"):
+            raise ValueError(f"stand-in desconocido: {self.kind}")
+        try:
+            self._start_cluster() if self.kind == "cluster" else self._start_docker()
+        except BaseException:
+            self.stop()  # __exit__ no corre si __enter__ falla
+            raise
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def _start_cluster(self) -> None:
+        if os.name == "posix" and os.geteuid() == 0:
+            raise RuntimeError("initdb no corre como root: use --stand-in docker o --dsn")
+        self._tmp = tempfile.TemporaryDirectory(prefix="etl_pg_")
+        tmp = Path(self._tmp.name)
+        port = _free_port()
+        subprocess.run(
+            [self._tool("initdb"), "-D", str(tmp / "data"), "-U", "postgres", "-A", "trust", "-E", "UTF8", "--no-sync"],
+            check=True, capture_output=True, text=True,
+        )
+        opts = f"-p {port} -k {tmp} -c listen_addresses='' -c fsync=off -c synchronous_commit=off"
+        subprocess.run(
+            [self._tool("pg_ctl"), "-D", str(tmp / "data"), "-o", opts, "-l", str(tmp / "postgres.log"), "-w", "start"],
+            check=True, capture_output=True, text=True,
+        )
+        self.url = f"postgresql+psycopg2://postgres@/postgres?host={tmp}&port={port}"
+
+    def _start_docker(self) -> None:
+        port = _free_port()
+        out = subprocess.run(
+            ["docker", "run", "-d", "--rm", "-e", "POSTGRES_HOST_AUTH_METHOD=trust",
+             "-p", f"127.0.0.1:{port}:5432", self.image, "-c", "fsync=off", "-c", "synchronous_commit=off"],
+            check=True, capture_output=True, text=True,
+        )
+        self._container = out.stdout.strip()
+        self.url = f"postgresql+psycopg2://postgres@127.0.0.1:{port}/postgres"
+        self._wait_ready()
+
+    def _wait_ready(self) -> None:
+        """El contenedor acepta conexiones unos segundos después de arrancar (y reinicia una vez)."""
+        from sqlalchemy import create_engine, text
+
+        engine = create_engine(self.url)
+        deadline = time.monotonic() + self.startup_timeout
+        try:
+            while True:
+                try:
+                    with engine.connect() as conn:
+                        conn.execute(text("SELECT 1"))
+                    return
+                except Exception:
+                    if time.monotonic() > deadline:
+                        raise
+                    time.sleep(0.5)
+        finally:
+            engine.dispose()
+
+    def stop(self) -> None:
+        if self._container:
+            subprocess.run(["docker", "stop", self._container], capture_output=True)
+            self._container = None
+        if self._tmp is not None:
+            subprocess.run(
+                [self._tool("pg_ctl"), "-D", str(Path(self._tmp.name) / "data"), "-m", "fast", "-w", "stop"],
+                capture_output=True,
+            )
+            self._tmp.cleanup()
+            self._tmp = None
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class EngineConnection:
+    """Envuelve un Engine con la interfaz que CSVLoader espera de DatabaseConnection."""
+
+    def __init__(self, engine):
+        self.engine = engine
+
+    def get_engine(self):
+        return self.engine
+
+    def invalidate(self, table: str) -> int:
+        """Sin cache de consultas en la base de benchmarks."""
+        return 0
+
+
+# ---------------------------------------------------------------- esquema y datos
+def ddl_hash(path: Path) -> str:
+    return hashlib.sha1(path.read_bytes()).hexdigest()[:12]
+
+
+def apply_ddl(engine, path: Path) -> None:
+    """Ejecuta el script de DDL completo (varias sentencias) con el cursor del driver."""
+    raw = engine.raw_connection()
+    try:
+        raw.driver_connection.autocommit = True
+        cur = raw.cursor()
+        cur.execute(path.read_text(encoding="utf-8"))
+        cur.close()
+    finally:
+        raw.driver_connection.autocommit = False
+        raw.close()
+
+
+def load_synthetic(db: EngineConnection, cfg: Dict, size: str, seed: int = 0) -> None:
+    """Datos sintéticos -> *Pipeline.run() -> raw.<dataset>, y el hecho derivado de ellos."""
+    from etl_project.benchmarks.synthetic import GENERATORS, make_frame
+    from etl_project.CSVLoader import CSVLoader
+    from etl_project.facts import FACT_TABLE, abastecimientos_daily, as_rows, build_fact, rep_maquinaria_daily
+    from etl_project.runner import get_pipeline
+
+    outputs: Dict[str, pd.DataFrame] = {}
+    for dataset in GENERATORS:
+        print(f"[bench views] {dataset} @ {size}...")
+        out = get_pipeline(dataset)(FrameLoader(make_frame(dataset, size, seed)), cfg).run()
+        CSVLoader(dataset, db=db).load_frame(out)
+        outputs[dataset] = out
+    fact = build_fact(abastecimientos_daily(outputs["abastecimientos"]), rep_maquinaria_daily(outputs["rep_maquinaria"]))
+    CSVLoader(FACT_TABLE, db=db).load_frame(as_rows(fact))
+
+
+def load_production(db: EngineConnection, cfg: Dict) -> None:
+    """processed/<dataset>.csv -> raw.<dataset> y el hecho completo desde su estado."""
+    from etl_project.CSVLoader import CSVLoader
+    from etl_project.facts import FACT_TABLE, FuelProductionFact, as_rows
+    from etl_project.runner import processed_dir
+
+    out_dir = processed_dir(cfg)
+    for dataset in cfg.get("datasets", {}):
+        path = out_dir / f"{dataset}.csv"
+        if not path.exists():
+            print(f"[bench views] {path} no existe: raw.{dataset} queda vacía")
+            continue
+        CSVLoader(dataset, db=db).load_csv(path)
+    fact = FuelProductionFact(cfg).full()
+    if not fact.empty:
+        CSVLoader(FACT_TABLE, db=db).load_frame(as_rows(fact))
+
+
+def table_rows(engine) -> Dict[str, int]:
+    """Filas por tabla de raw.* (count exacto: las estadísticas pueden ir atrasadas tras la carga)."""
+    from sqlalchemy import text
+
+    with engine.connect() as conn:
+        tables = conn.execute(text(
+            "SELECT table_name FROM information_schema.tables "
+            "WHERE table_schema = 'raw' AND table_type = 'BASE TABLE' ORDER BY 1"
+        )).scalars().all()
+        return {
+            f"raw.{t}": int(conn.execute(text(f'SELECT count(*) FROM raw."{t}"')).scalar_one())
+            for t in tables
+        }
+
+
+# ---------------------------------------------------------------- planes
+def plan_shape(node: Dict[str, Any]) -> str:
+    """
+    Forma del plan como texto, p. ej. 'Limit(Sort(Aggregate[Hashed](Seq Scan[raw.insumos])))'.
+    Solo elecciones del planificador (tipos de nodo, tablas, joins y estrategias):
+    no cambia con costos, filas ni métodos de ordenamiento.
+    """
+    label = node["Node Type"]
+    attrs = []
+    for key in _SHAPE_KEYS:
+        if key in node:
+            value = node[key]
+            if key == "Relation Name" and "Schema" in node:
+                value = f"{node['Schema']}.{value}"
+            attrs.append(str(value))
+    if attrs:
+        label += "[" + ",".join(attrs) + "]"
+    children = node.get("Plans", [])
+    if children:
+        label += "(" + ", ".join(plan_shape(child) for child in children) + ")"
+    return label
+
+
+def sort_methods(node: Dict[str, Any]) -> List[str]:
+    """Método de cada Sort del plan, en orden (p. ej. ['top-N heapsort'] o ['external merge'])."""
+    found = [node["Sort Method"]] if "Sort Method" in node else []
+    for child in node.get("Plans", []):
+        found.extend(sort_methods(child))
+    return found
+
+
+def _temp_blocks(node: Dict[str, Any]) -> int:
+    return int(node.get("Temp Read Blocks", 0)) + int(node.get("Temp Written Blocks", 0))
+
+
+def summarize_explain(explain: Any) -> Dict[str, Any]:
+    """Resume la salida de EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) de una consulta."""
+    if isinstance(explain, str):
+        explain = json.loads(explain)
+    doc = explain[0]
+    plan = doc["Plan"]
+    return {
+        "execution_ms": float(doc["Execution Time"]),
+        "planning_ms": float(doc["Planning Time"]),
+        "rows": int(plan.get("Actual Rows", 0)) * int(plan.get("Actual Loops", 1)),
+        "shared_hit": int(plan.get("Shared Hit Blocks", 0)),
+        "shared_read": int(plan.get("Shared Read Blocks", 0)),
+        "temp_blocks": _temp_blocks(plan),
+        "plan_shape": plan_shape(plan),
+        "sort_methods": sort_methods(plan),
+    }
+
+
+def explain_view(engine, view: str, repeats: int = 5) -> Dict[str, Any]:
+    """Corre la vista 'repeats' veces bajo EXPLAIN ANALYZE; buffers y plan de la última."""
+    from sqlalchemy import text
+
+    sql = f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) SELECT * FROM stage.{view}"
+    runs = []
+    with engine.connect() as conn:
+        for _ in range(repeats):
+            runs.append(summarize_explain(conn.execute(text(sql)).scalar_one()))
+    last = runs[-1]
+    return {
+        "times": [r["execution_ms"] / 1000 for r in runs],
+        "planning_ms": round(min(r["planning_ms"] for r in runs), 3),
+        **{k: last[k] for k in ("rows", "shared_hit", "shared_read", "temp_blocks", "plan_shape", "sort_methods")},
+    }
+
+
+def source_rows(view: str, rows: Dict[str, int]) -> int:
+    """Filas de las tablas raw.* que lee la vista (VIEW_SOURCES del cache de consultas)."""
+    from etl_project.query_cache import VIEW_SOURCES
+
+    return sum(rows.get(t, 0) for t in VIEW_SOURCES.get(f"stage.{view}", ()))
+
+
+def bench_views(
+    engine,
+    views: Sequence[str],
+    *,
+    size: str,
+    repeats: int,
+    rows: Dict[str, int],
+) -> List[Dict[str, Any]]:
+    results = []
+    for view in views:
+        print(f"[bench views] EXPLAIN ANALYZE stage.{view}...")
+        got = explain_view(engine, view, repeats)
+        result = _result("explain_analyze", view, size, got["rows"], got.pop("times"))
+        result.update(got, source_rows=source_rows(view, rows))
+        results.append(result)
+    return results
+
+
+# ---------------------------------------------------------------- comparación
+def compare_views(old: Dict[str, Any], new: Dict[str, Any], threshold: float = 0.20) -> List[Dict[str, Any]]:
+    """
+    Compara dos corridas vista por vista. El tiempo esperado escala con las
+    filas de las tablas fuente (lineal; si bajan se espera lo mismo): es
+    regresión si best_seconds supera (1 + threshold) veces lo esperado o si
+    cambió plan_shape. sort_changed (un Sort que pasó a disco, p. ej.) solo se
+    informa.
+    """
+    base = {r["dataset"]: r for r in old["results"]}
+    rows = []
+    for r in new["results"]:
+        prev = base.get(r["dataset"])
+        if prev is None or prev["best_seconds"] == 0:
+            continue
+        ratio = r["best_seconds"] / prev["best_seconds"]
+        volume = r["source_rows"] / prev["source_rows"] if prev.get("source_rows") else 1.0
+        plan_changed = r["plan_shape"] != prev["plan_shape"]
+        sort_changed = r.get("sort_methods", []) != prev.get("sort_methods", [])
+        rows.append({
+            "view": r["dataset"],
+            "old": prev["best_seconds"],
+            "new": r["best_seconds"],
+            "ratio": round(ratio, 3),
+            "volume": round(volume, 3),
+            "plan_changed": plan_changed,
+            "sort_changed": sort_changed,
+            "regression": ratio > (1 + threshold) * max(volume, 1.0) or plan_changed,
+        })
+    return rows
+
+
+def changes(old: Dict[str, Any], new: Dict[str, Any]) -> List[str]:
+    """Qué cambió entre dos corridas además de los tiempos: DDL y volumen por tabla."""
+    out = []
+    if old["meta"].get("ddl_sha1") != new["meta"].get("ddl_sha1"):
+        out.append(f"DDL: {old['meta'].get('ddl_sha1')} -> {new['meta'].get('ddl_sha1')}")
+    before, after = old["meta"].get("table_rows", {}), new["meta"].get("table_rows", {})
+    for table in sorted(set(before) | set(after)):
+        if before.get(table) != after.get(table):
+            out.append(f"{table}: {before.get(table, 0)} -> {after.get(table, 0)} filas")
+    return out
+
+
+def latest_result(folder: Path) -> Optional[Path]:
+    found = sorted(folder.glob("bench_*.json"))
+    return found[-1] if found else None
+
+
+def baseline_path(folder: Path) -> Path:
+    return folder / "baseline.json"
+
+
+def default_baseline(folder: Path) -> Optional[Path]:
+    """La línea base fijada; sin ella (resultados de antes), el último guardado."""
+    pinned = baseline_path(folder)
+    return pinned if pinned.exists() else latest_result(folder)
+
+
+def pin_baseline(doc: Dict[str, Any], folder: Path) -> Path:
+    """Fija 'doc' como línea base de las próximas corridas."""
+    path = baseline_path(folder)
+    folder.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(doc, indent=2), encoding="utf-8")
+    tmp.replace(path)
+    return path
+
+
+def _report(old: Dict[str, Any], new: Dict[str, Any], threshold: float) -> int:
+    for line in changes(old, new):
+        print(f"[bench views] Cambió {line}")
+    rows = compare_views(old, new, threshold)
+    _print_table(rows, ["view", "old", "new", "ratio", "volume", "plan_changed", "sort_changed", "regression"])
+    for r in rows:
+        prev = next(p for p in old["results"] if p["dataset"] == r["view"])
+        cur = next(p for p in new["results"] if p["dataset"] == r["view"])
+        if r["plan_changed"]:
+            print(f"[bench views] Plan de {r['view']}:\n  antes:   {prev['plan_shape']}\n  después: {cur['plan_shape']}")
+        if r["sort_changed"]:
+            print(
+                f"[bench views] Sort de {r['view']}: {', '.join(prev.get('sort_methods', [])) or '-'}"
+                f" -> {', '.join(cur.get('sort_methods', [])) or '-'}"
+            )
+    return 1 if any(r["regression"] for r in rows) else 0
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="etl bench views", description="EXPLAIN ANALYZE de las vistas stage.*")
+    parser.add_argument("--config", default="config/settings.yaml")
+    parser.add_argument("--views", help="Vistas separadas por coma (por defecto las cuatro del dashboard)")
+    parser.add_argument("--size", help="Filas sintéticas por dataset: 10k, 1m...")
+    parser.add_argument("--from-processed", action="store_true", help="Carga data/processed en vez de datos sintéticos")
+    parser.add_argument("--repeats", type=int)
+    parser.add_argument("--threshold", type=float)
+    parser.add_argument("--stand-in", choices=["auto", "cluster", "docker", "dsn"])
+    parser.add_argument("--dsn", help="URL SQLAlchemy de un PostgreSQL desechable")
+    parser.add_argument("--pg-bin", help="Carpeta con initdb y pg_ctl")
+    parser.add_argument("--baseline", help="Resultado contra el cual comparar (por defecto views/baseline.json)")
+    parser.add_argument("--pin", action="store_true", help="Fijar esta corrida como línea base aunque haya regresiones")
+    parser.add_argument("--compare", nargs=2, metavar=("ANTERIOR", "NUEVO"), help="Compara dos archivos de resultados")
+    args = parser.parse_args(argv)
+
+    cfg = load_settings(args.config)
+    bcfg = cfg.get("benchmarks", {}) or {}
+    opts = {**VIEWS_DEFAULTS, **(bcfg.get("views", {}) or {})}
+    threshold = args.threshold if args.threshold is not None else float(opts["threshold"])
+
+    if args.compare:
+        old, new = (json.loads(Path(p).read_text(encoding="utf-8")) for p in args.compare)
+        return _report(old, new, threshold)
+
+    from sqlalchemy import create_engine, text
+
+    base = Path(cfg.get("paths", {}).get("base", "."))
+    ddl = base / opts["ddl"]
+    size = "processed" if args.from_processed else (args.size or str(opts["size"]))
+    views = args.views.split(",") if args.views else list(VIEWS)
+    repeats = args.repeats or int(opts["repeats"])
+
+    pg = LocalPostgres(args.stand_in or opts["stand_in"], dsn=args.dsn, pg_bin=args.pg_bin, image=opts["image"])
+    try:
+        pg.mode = pg._resolve_mode()
+    except RuntimeError as exc:
+        print(f"[bench views] {exc}")
+        return 2
+    with pg:
+        print(f"[bench views] PostgreSQL de reemplazo: {pg.kind}")
+        engine = create_engine(pg.url)
+        try:
+            apply_ddl(engine, ddl)
+            db = EngineConnection(engine)
+            if args.from_processed:
+                load_production(db, cfg)
+            else:
+                load_synthetic(db, cfg, size)
+            with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+                conn.execute(text("ANALYZE"))
+                server = conn.execute(text("SHOW server_version")).scalar_one()
+            rows = table_rows(engine)
+            results = bench_views(engine, views, size=size, repeats=repeats, rows=rows)
+        finally:
+            engine.dispose()
+
+    doc = {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "postgres": server,
+            "stand_in": pg.kind,
+            "data": size,
+            "ddl_sha1": ddl_hash(ddl),
+            "table_rows": rows,
+        },
+        "results": results,
+    }
+    _print_table(results, ["dataset", "rows", "source_rows", "best_seconds", "planning_ms", "shared_hit", "temp_blocks"])
+
+    results_dir = base / bcfg.get("results_dir", "data/benchmarks/") / "views"
+    baseline = Path(args.baseline) if args.baseline else default_baseline(results_dir)
+    status = 0
+    if baseline is not None:
+        print(f"[bench views] Comparando con {baseline}")
+        status = _report(json.loads(baseline.read_text(encoding="utf-8")), doc, threshold)
+    path = save_results(doc, results_dir)
+    print(f"[bench views] Resultados -> {path}")
+    if status == 0 or args.pin:
+        print(f"[bench views] Línea base -> {pin_baseline(doc, results_dir)}")
+    else:
+        print("[bench views] Con regresiones: la línea base no cambia (--pin para aceptarlas)")
+    return status
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,215 @@
+"""
+CLI unificado `etl` (run, load, watch, preview, bench, explain).
+
+Los imports pesados (pandas, sqlalchemy, pyarrow, streamlit, plotly) se hacen
+dentro de cada subcomando: `etl --help` o `etl explain` no los cargan.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+
+def _settings(args: argparse.Namespace) -> Dict:
+    from etl_project.config import load_settings
+
+    return load_settings(args.config)
+
+
+def _cmd_run(args: argparse.Namespace) -> int:
+    from etl_project.runner import load_processed, run_pipelines
+
+    if args.stream:
+        # Carga directo a la base: no escribe data/processed ni el índice de huellas
+        flags = (("--delta", args.delta), ("--format", args.format), ("--load", args.load))
+        conflicts = [flag for flag, used in flags if used]
+        if conflicts:
+            print(f"[etl run] --stream no se combina con {', '.join(conflicts)}", file=sys.stderr)
+            return 2
+    cfg = _settings(args)
+    if args.memory_limit:
+        cfg.setdefault("run", {})["memory_limit"] = args.memory_limit
+    formats = args.format or (cfg.get("output", {}) or {}).get("formats", ["csv"])
+    if args.stream:
+        from etl_project.streaming import stream_pipelines
+
+        stream_pipelines(cfg, args.datasets or None, tag="etl run")
+        return 0
+    if args.load and "csv" not in formats:
+        print("[etl run] --load requiere el formato csv", file=sys.stderr)
+        return 2
+    run_pipelines(cfg, args.datasets or None, formats=formats, delta=args.delta or None, tag="etl run")
+    if args.load:
+        load_processed(cfg, args.datasets or None, tag="etl load")
+    return 0
+
+
+def _cmd_load(args: argparse.Namespace) -> int:
+    from etl_project.runner import load_processed
+
+    load_processed(_settings(args), args.tables or None, schema=args.schema, if_exists=args.if_exists, tag="etl load")
+    return 0
+
+
+def _cmd_watch(args: argparse.Namespace) -> int:
+    from etl_project.watch import IngestDaemon
+
+    cfg = _settings(args)
+    daemon = IngestDaemon(cfg, args.datasets or None, tag="etl watch")
+    if not daemon.state_path.exists() and args.initial == "skip":
+        count = daemon.mark_existing()
+        print(f"[etl watch] {count} archivo(s) existentes marcados como ya cargados")
+    if args.once:
+        daemon.drain()
+    else:
+        daemon.serve_forever()
+    return 0
+
+
+def _cmd_preview(args: argparse.Namespace) -> int:
+    from etl_project.preview import format_preview, preview_dataset
+
+    result = preview_dataset(
+        _settings(args),
+        args.dataset,
+        rows=args.rows,
+        sample=args.sample or bool(args.stratify),
+        stratify_by=args.stratify,
+        seed=args.seed,
+    )
+    print(format_preview(result, show=args.show))
+    return 0
+
+
+def _cmd_bench(args: argparse.Namespace) -> int:
+    if args.bench_args[:1] == ["fetch"]:
+        from etl_project.benchmarks.fetch import main as fetch_main
+
+        return fetch_main(["--config", args.config, *args.bench_args[1:]])
+    if args.bench_args[:1] == ["views"]:
+        from etl_project.benchmarks.views import main as views_main
+
+        return views_main(["--config", args.config, *args.bench_args[1:]])
+    from etl_project.benchmarks.suite import main as bench_main
+
+    return bench_main(["--config", args.config, *args.bench_args])
+
+
+def _human_size(n: int) -> str:
+    for unit in ("B", "KB", "MB", "GB"):
+        if n < 1024:
+            return f"{n:.0f} {unit}"
+        n /= 1024
+    return f"{n:.1f} TB"
+
+
+def _describe_transforms(tr: Dict) -> List[str]:
+    """Lista legible de los pasos declarados en `transforms` (orden de settings.yaml)."""
+    steps: List[str] = []
+    for key, value in tr.items():
+        if key == "clean_columns":
+            if value:
+                steps.append("clean_column_names")
+        elif key == "filters":
+            for rule in value or []:
+                steps.append(f"filter_value {rule['column']} {rule.get('op', 'equals')} {rule['value']!r}")
+        elif key == "drop_columns":
+            if value:
+                steps.append(f"drop_columns ({len(value)}): {', '.join(map(str, value))}")
+        elif key == "rename":
+            if value:
+                steps.append("rename_columns " + ", ".join(f"{k} -> {v}" for k, v in value.items()))
+        elif key == "derive":
+            for name, params in (value or {}).items():
+                steps.append(f"{name} {params}")
+        else:
+            steps.append(f"{key} {value}")
+    return steps
+
+
+def _cmd_explain(args: argparse.Namespace) -> int:
+    from etl_project.runner import PIPELINES
+
+    cfg = _settings(args)
+    base = Path(cfg["paths"]["base"])
+    for name in args.datasets or list(cfg.get("datasets", {})):
+        ds = cfg["datasets"][name]
+        source = ds["source"]
+        patterns = source.get("patterns", ["*.xlsx", "*.xlsm"])
+        print(f"{name}  ({PIPELINES.get(name, 'sin pipeline registrado')})")
+        print(f"  source: {source['folder']} {list(patterns)}")
+        root = base / source["folder"]
+        files = sorted({p for pat in patterns for p in root.rglob(pat)}) if root.exists() else []
+        if not files:
+            print("    (sin archivos)")
+        for path in files:
+            print(f"    - {path} ({_human_size(path.stat().st_size)})")
+        print("  transforms (según settings.yaml):")
+        for i, step in enumerate(_describe_transforms(ds.get("transforms", {})), start=1):
+            print(f"    {i}. {step}")
+        print()
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="etl", description="ETL agroindustria caña: pipelines, carga y benchmarks.")
+    parser.add_argument("--config", default="config/settings.yaml", help="Ruta a settings.yaml")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_run = sub.add_parser("run", help="Ejecuta los pipelines y escribe data/processed")
+    p_run.add_argument("datasets", nargs="*", help="Datasets a ejecutar (por defecto todos)")
+    p_run.add_argument("--format", choices=["csv", "parquet"], action="append",
+                       help="Formato de salida (repetible); por defecto output.formats")
+    p_run.add_argument("--load", action="store_true", help="Carga a PostgreSQL al terminar")
+    p_run.add_argument("--stream", action="store_true",
+                       help="Carga a PostgreSQL cada bloque apenas se transforma (solapa parseo y carga)")
+    p_run.add_argument("--delta", action="store_true",
+                       help="Solo filas nuevas/cambiadas y tombstones (índice de huellas en state.dir)")
+    p_run.add_argument("--memory-limit", help="Presupuesto de memoria (p. ej. 2GB); sobrescribe run.memory_limit")
+    p_run.set_defaults(func=_cmd_run)
+
+    p_load = sub.add_parser("load", help="Carga processed/*.csv a PostgreSQL")
+    p_load.add_argument("tables", nargs="*", help="Tablas a cargar (por defecto todas)")
+    p_load.add_argument("--schema", default="raw")
+    p_load.add_argument("--if-exists", choices=["append", "replace"], default="append")
+    p_load.set_defaults(func=_cmd_load)
+
+    p_watch = sub.add_parser("watch", help="Vigila data/raw y carga los archivos nuevos en micro-lotes")
+    p_watch.add_argument("datasets", nargs="*", help="Datasets a vigilar (por defecto todos)")
+    p_watch.add_argument("--once", action="store_true", help="Ingiere lo pendiente y termina")
+    p_watch.add_argument("--initial", choices=["skip", "ingest"], default="skip",
+                         help="Sin estado previo: dar por cargados los archivos actuales (skip) o ingerirlos")
+    p_watch.set_defaults(func=_cmd_watch)
+
+    p_preview = sub.add_parser("preview", help="Transforms sobre una muestra por archivo: esquema, filas por paso y ejemplo")
+    p_preview.add_argument("dataset")
+    p_preview.add_argument("--rows", type=int, help="Filas por archivo (por defecto preview.rows)")
+    p_preview.add_argument("--sample", action="store_true",
+                           help="Muestra repartida en todo el archivo en vez de las primeras filas")
+    p_preview.add_argument("--stratify", metavar="COLUMNA", help="Estratificar la muestra por esta columna del archivo")
+    p_preview.add_argument("--seed", type=int, help="Semilla de la muestra (por defecto preview.seed)")
+    p_preview.add_argument("--show", type=int, default=10, help="Filas de ejemplo a mostrar")
+    p_preview.set_defaults(func=_cmd_preview)
+
+    p_bench = sub.add_parser("bench", help="Suite de benchmarks con datos sintéticos ('bench fetch': lectura de vistas; "
+                             "'bench views': EXPLAIN ANALYZE de stage.*)",
+                             add_help=False)
+    p_bench.add_argument("bench_args", nargs=argparse.REMAINDER)
+    p_bench.set_defaults(func=_cmd_bench)
+
+    p_explain = sub.add_parser("explain", help="Muestra archivos fuente y pasos configurados por dataset")
+    p_explain.add_argument("datasets", nargs="*")
+    p_explain.set_defaults(func=_cmd_explain)
+    return parser
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,15 +1,170 @@
 # db_connection.py
-from sqlalchemy import create_engine, URL
+import io
+import os
+import re
+import threading
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Sequence, Tuple, Union
+
+from sqlalchemy import create_engine, text, URL
 from sqlalchemy.engine import Engine
-from .config import Config
+from .config import Config, get_config
+from .query_cache import QueryCache, cache_settings, get_cache, invalidate_table, tables_in
+
+# Registro de engines por DSN: un único pool por base de datos en todo el proceso
+_ENGINES: Dict[str, Engine] = {}
+_ENGINES_LOCK = threading.Lock()
+
+# Valores por defecto del pool; se sobrescriben con database.pool en settings.yaml
+POOL_DEFAULTS = {
+    "size": 5,
+    "max_overflow": 10,
+    "pre_ping": True,
+    "recycle": 1800,
+    "timeout": 30,
+}
+
+
+def pool_settings(config: Config) -> Dict[str, Any]:
+    """Opciones del pool combinando POOL_DEFAULTS con database.pool del YAML."""
+    opts = dict(POOL_DEFAULTS)
+    opts.update((config.config.get("database", {}) or {}).get("pool", {}) or {})
+    return opts
+
+
+def get_shared_engine(url: URL, **pool: Any) -> Engine:
+    """
+    Devuelve el engine compartido para la URL (lo crea la primera vez).
+    Las opciones de pool solo aplican al crear el engine.
+    """
+    key = url.render_as_string(hide_password=False)
+    engine = _ENGINES.get(key)
+    if engine is not None:
+        return engine
+    with _ENGINES_LOCK:
+        engine = _ENGINES.get(key)
+        if engine is None:
+            opts = {**POOL_DEFAULTS, **pool}
+            engine = create_engine(
+                url,
+                pool_size=opts["size"],
+                max_overflow=opts["max_overflow"],
+                pool_pre_ping=opts["pre_ping"],
+                pool_recycle=opts["recycle"],
+                pool_timeout=opts["timeout"],
+            )
+            _ENGINES[key] = engine
+    return engine
+
+
+def pool_stats() -> Dict[str, Dict[str, Any]]:
+    """Estadísticas de cada pool registrado (DSN sin contraseña -> métricas)."""
+    stats = {}
+    for engine in list(_ENGINES.values()):
+        pool = engine.pool
+        entry: Dict[str, Any] = {"status": pool.status()}
+        for name in ("size", "checkedin", "checkedout", "overflow"):
+            fn = getattr(pool, name, None)
+            if callable(fn):
+                entry[name] = fn()
+        stats[engine.url.render_as_string(hide_password=True)] = entry
+    return stats
+
+
+def dispose_engines() -> None:
+    """Cierra todos los pools registrados (fin de proceso o tests)."""
+    with _ENGINES_LOCK:
+        for engine in _ENGINES.values():
+            engine.dispose()
+        _ENGINES.clear()
+
+
+# OID de tipos PostgreSQL -> tipo Arrow para leer el CSV de COPY sin inferir
+# (la inferencia convertiría textos como '002' en enteros). numeric -> float64
+# igual que pd.read_sql (coerce_float).
+_PG_ARROW_TYPES = {
+    16: "bool",
+    20: "int64", 21: "int16", 23: "int32",
+    700: "float32", 701: "float64", 1700: "float64",
+    25: "string", 1042: "string", 1043: "string", 19: "string",
+    1082: "date32",
+    1114: "timestamp[us]", 1184: "timestamp[us, tz=UTC]",
+}
+
+SQLQuery = Union[str, Any]
+
+_IDENTIFIER = re.compile(r"[A-Za-z_]\w*")
+_MISS = object()
+
+
+def _freeze(value: Any) -> Any:
+    """Valor hasheable para la clave del cache (listas de IN expandido -> tuplas)."""
+    if isinstance(value, Mapping):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+def _sql_and_params(sql_query: SQLQuery, params: Optional[Mapping[str, Any]] = None):
+    """SQL con parámetros ':nombre' y todos los valores (los ya ligados con bindparams + params)."""
+    if isinstance(sql_query, str):
+        return sql_query, dict(params or {})
+    return _compiled(sql_query, params)
+
+
+def _compiled(sql_query: SQLQuery, params: Optional[Mapping[str, Any]] = None, dialect=None):
+    """
+    SQL compilado para 'dialect' (None = genérico, ':nombre') y sus valores. Los
+    IN expandidos (bindparam expanding) quedan como nombre_1, nombre_2... en vez
+    de __[POSTCOMPILE_nombre], que solo el driver sabe expandir.
+    """
+    stmt = text(sql_query) if isinstance(sql_query, str) else sql_query
+    if params:
+        stmt = stmt.bindparams(**params)
+    compiled = stmt.compile(dialect=dialect, compile_kwargs={"render_postcompile": True})
+    return str(compiled), dict(compiled.params)
+
+
+# Parámetros pyformat de psycopg2 (%(nombre)s) en el SQL compilado
+_PYFORMAT_PARAM = re.compile(r"%\((\w+)\)s")
+
+
+def _numbered_params(sql: str, values: Mapping[str, Any]) -> Tuple[str, List[Any]]:
+    """SQL pyformat -> $1..$n con la lista de valores, para el paramstyle de ADBC."""
+    order: List[str] = []
+
+    def _number(match):
+        if match.group(1) not in order:
+            order.append(match.group(1))
+        return f"${order.index(match.group(1)) + 1}"
+
+    return _PYFORMAT_PARAM.sub(_number, sql).replace("%%", "%"), [values[name] for name in order]
+
+
+def _arrow_type(oid: int):
+    import pyarrow as pa
+
+    name = _PG_ARROW_TYPES.get(oid, "string")
+    if name.startswith("timestamp"):
+        return pa.timestamp("us", tz="UTC") if "tz" in name else pa.timestamp("us")
+    return pa.type_for_alias(name)
+
+
+def _adbc_available() -> bool:
+    try:
+        import adbc_driver_postgresql.dbapi  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
 
 class DatabaseConnection:
-    def __init__(self):
-        self.config = Config("config/settings.yaml")
-        self.engine: Engine = None
+    def __init__(self, yaml_file: str = "config/settings.yaml"):
+        self.config = get_config(yaml_file)
+        self.engine: Optional[Engine] = None
 
     def connect(self):
-        """Crea una conexión usando SQLAlchemy"""
+        """Obtiene el engine compartido (pool) para la base configurada"""
         try:
             if self.engine is None:
                 # Construir la URL de conexión usando sqlalchemy.URL
@@ -21,7 +176,7 @@ class DatabaseConnection:
                     port=self.config.DB_PORT,
                     database=self.config.DB_NAME,
                 )
-                self.engine = create_engine(db_url)
+                self.engine = get_shared_engine(db_url, **pool_settings(self.config))
         except Exception as e:
             print(f"Error al conectar a la base de datos: {e}")
             self.engine = None
@@ -34,18 +189,295 @@ class DatabaseConnection:
         return self.engine
 
     def close(self):
-        """Cierra la conexión"""
-        if self.engine:
-            self.engine.dispose()
-            self.engine = None
-    
-    def query(self, sql_query):
-        """Ejecuta una consulta SQL y devuelve los resultados"""
-        if not self.engine:
-            self.connect()
-        with self.engine.connect() as connection:
-            result = connection.execute(sql_query)
-            return result.fetchall()
+        """
+        Suelta la referencia al engine. El pool es compartido por el proceso,
+        así que no se cierra aquí; para eso está dispose_engines().
+        """
+        self.engine = None
+
+    def pool_stats(self) -> Dict[str, Any]:
+        """Estadísticas del pool de esta conexión"""
+        engine = self.get_engine()
+        return pool_stats().get(engine.url.render_as_string(hide_password=True), {})
+
+    def query(
+        self,
+        sql_query,
+        params: Optional[Mapping[str, Any]] = None,
+        *,
+        cache: Optional[bool] = None,
+        tables: Optional[Sequence[str]] = None,
+        prepare: Optional[str] = None,
+    ):
+        """
+        Ejecuta una consulta SQL y devuelve las filas como lista. El cache guarda
+        una tupla (compartida por todos) y cada llamada recibe su propia lista.
+        params: valores de los parámetros ':nombre', enviados aparte del SQL.
+        cache: usar el cache de resultados (None = database.cache.enabled);
+        tables: tablas que lee la consulta, para invalidarlo (por defecto se
+        detectan en el SQL).
+        prepare: nombre de sentencia preparada en el servidor para consultas que
+        se repiten mucho: PREPARE una vez por conexión del pool y luego EXECUTE.
+        """
+        engine = self.get_engine()
+        use_cache = self._use_cache(cache)
+        if use_cache:
+            key = self._cache_key("rows", sql_query, params)
+            rows = self.result_cache().get(key, _MISS)
+            if rows is not _MISS:
+                return list(rows)
+        with engine.connect() as connection:
+            if prepare and engine.dialect.name == "postgresql":
+                result = self._execute_prepared(connection, prepare, sql_query, params)
+            else:
+                stmt = text(sql_query) if isinstance(sql_query, str) else sql_query
+                result = connection.execute(stmt, dict(params) if params else None)
+            rows = tuple(result.fetchall())
+        if use_cache:
+            self.result_cache().put(key, rows, self._tables(sql_query, tables))
+        return list(rows)
+
+    @staticmethod
+    def _execute_prepared(connection, name: str, sql_query: SQLQuery, params: Optional[Mapping[str, Any]]):
+        """
+        PREPARE name AS <sql con $1..$n> la primera vez en esta conexión del pool
+        (o si cambió el SQL) y EXECUTE name(...) con los parámetros ligados.
+        Las sentencias preparadas viven mientras viva la conexión DBAPI. Se
+        compila con el dialecto de la conexión (psycopg2: %(nombre)s), con los
+        IN expandidos ya desplegados.
+        """
+        if not _IDENTIFIER.fullmatch(name):
+            raise ValueError(f"Nombre de sentencia preparada inválido: {name!r}")
+        sql, values = _compiled(sql_query, params, connection.dialect)
+        order = []
+
+        def _positional(match):
+            if match.group(1) not in order:
+                order.append(match.group(1))
+            return f"${order.index(match.group(1)) + 1}"
+
+        body = _PYFORMAT_PARAM.sub(_positional, sql).replace("%%", "%")
+        prepared = connection.info.setdefault("etl_prepared", {})
+        if prepared.get(name) != body:
+            if name in prepared:
+                connection.execute(text(f"DEALLOCATE {name}"))
+            connection.execute(text(f"PREPARE {name} AS {body}"))
+            prepared[name] = body
+        args = f"({', '.join(f':{p}' for p in order)})" if order else ""
+        return connection.execute(text(f"EXECUTE {name}{args}"), {p: values[p] for p in order} or None)
+
+    # ---------------------------------------------------------- cache de resultados
+    def _dsn(self) -> str:
+        return self.get_engine().url.render_as_string(hide_password=True)
+
+    def result_cache(self) -> QueryCache:
+        """Cache de resultados compartido de esta base (database.cache en settings.yaml)."""
+        return get_cache(self._dsn(), **cache_settings(self.config.config))
+
+    def _use_cache(self, cache: Optional[bool]) -> bool:
+        return bool(cache_settings(self.config.config)["enabled"] if cache is None else cache)
+
+    def _cache_key(self, kind: str, sql_query: SQLQuery, params: Optional[Mapping[str, Any]]):
+        sql, values = _sql_and_params(sql_query, params)
+        return kind, sql, _freeze(values)
+
+    @staticmethod
+    def _tables(sql_query: SQLQuery, tables: Optional[Sequence[str]] = None):
+        if tables:
+            return [t.lower() for t in tables]
+        return tables_in(_sql_and_params(sql_query)[0])
+
+    def invalidate(self, table: str) -> int:
+        """Descarta los resultados cacheados que leen 'schema.tabla' (lo llama CSVLoader al escribir)."""
+        return invalidate_table(self._dsn(), table)
+
+    # ---------------------------------------------------------- lectura columnar
+    def _bound(self, sql_query: SQLQuery, params: Optional[Mapping[str, Any]] = None) -> Tuple[str, Dict[str, Any]]:
+        """
+        SQL en el paramstyle del driver (psycopg2: %(nombre)s) y sus valores, sin
+        incrustarlos en el texto. Los IN expandidos quedan como nombre_1, nombre_2...
+        """
+        return _compiled(sql_query, params, self.get_engine().dialect)
+
+    def _read_sql_fallback(self, sql_query: SQLQuery, params: Optional[Mapping[str, Any]] = None, **kwargs):
+        import pandas as pd
+
+        if isinstance(sql_query, str):
+            sql_query = text(sql_query)
+        return pd.read_sql(sql_query, self.get_engine(), params=dict(params) if params else None, **kwargs)
+
+    @staticmethod
+    def _copy_schema(cursor, sql: str, values: Mapping[str, Any]):
+        """Esquema Arrow del resultado a partir de una consulta LIMIT 0 (parámetros ligados)."""
+        import pyarrow as pa
+
+        cursor.execute(f"SELECT * FROM ({sql}) AS q LIMIT 0", values)
+        return pa.schema([(col.name, _arrow_type(col.type_code)) for col in cursor.description])
+
+    @staticmethod
+    def _copy_sql(cursor, sql: str, values: Mapping[str, Any]) -> bytes:
+        """
+        COPY (consulta) TO STDOUT: COPY no acepta parámetros del servidor, así que
+        psycopg2 los cita del lado del cliente (mogrify) solo para esta sentencia.
+        """
+        return b"COPY (" + cursor.mogrify(sql, values) + b") TO STDOUT WITH (FORMAT csv, HEADER true)"
+
+    @staticmethod
+    def _copy_options(schema, block_size: Optional[int] = None):
+        from pyarrow import csv
+
+        read = csv.ReadOptions(block_size=block_size) if block_size else csv.ReadOptions()
+        convert = csv.ConvertOptions(
+            column_types={f.name: f.type for f in schema},
+            strings_can_be_null=True,
+            quoted_strings_can_be_null=False,
+        )
+        return read, csv.ParseOptions(newlines_in_values=True), convert
+
+    def fetch_arrow(
+        self,
+        sql_query: SQLQuery,
+        params: Optional[Mapping[str, Any]] = None,
+        *,
+        cache: Optional[bool] = None,
+        tables: Optional[Sequence[str]] = None,
+    ):
+        """
+        Resultado completo como pyarrow.Table sin pasar por objetos Python fila a fila:
+        ADBC si está instalado, si no COPY (query) TO STDOUT en CSV parseado por pyarrow.
+        En bases que no son PostgreSQL cae a pd.read_sql. cache/tables como en query().
+        """
+        if not self._use_cache(cache):
+            return self._fetch_arrow(sql_query, params)
+        key = self._cache_key("arrow", sql_query, params)
+        table = self.result_cache().get(key, _MISS)
+        if table is _MISS:
+            table = self._fetch_arrow(sql_query, params)
+            self.result_cache().put(key, table, self._tables(sql_query, tables))
+        return table
+
+    def _fetch_arrow(self, sql_query: SQLQuery, params: Optional[Mapping[str, Any]] = None):
+        import pyarrow as pa
+        from pyarrow import csv
+
+        engine = self.get_engine()
+        if engine.dialect.name != "postgresql":
+            return pa.Table.from_pandas(self._read_sql_fallback(sql_query, params), preserve_index=False)
+
+        sql, values = self._bound(sql_query, params)
+
+        if _adbc_available():
+            import adbc_driver_postgresql.dbapi as adbc
+
+            uri = engine.url.set(drivername="postgresql").render_as_string(hide_password=False)
+            numbered, args = _numbered_params(sql, values)
+            with adbc.connect(uri) as conn, conn.cursor() as cur:
+                cur.execute(numbered, args or None)
+                return cur.fetch_arrow_table()
+
+        raw = engine.raw_connection()
+        try:
+            cursor = raw.cursor()
+            schema = self._copy_schema(cursor, sql, values)
+            buffer = io.BytesIO()
+            cursor.copy_expert(self._copy_sql(cursor, sql, values), buffer)
+            raw.commit()
+        finally:
+            raw.close()
+        buffer.seek(0)
+        read, parse, convert = self._copy_options(schema)
+        return csv.read_csv(buffer, read_options=read, parse_options=parse, convert_options=convert)
+
+    def iter_arrow(
+        self,
+        sql_query: SQLQuery,
+        params: Optional[Mapping[str, Any]] = None,
+        *,
+        chunk_rows: int = 100_000,
+    ) -> Iterator[Any]:
+        """
+        Igual que fetch_arrow pero por bloques de ~chunk_rows filas (pyarrow.Table),
+        para resultados que no conviene tener completos en memoria. El COPY escribe
+        en un pipe desde otro hilo mientras pyarrow lo lee en streaming.
+        """
+        import pyarrow as pa
+        from pyarrow import csv
+
+        engine = self.get_engine()
+        if engine.dialect.name != "postgresql":
+            for chunk in self._read_sql_fallback(sql_query, params, chunksize=chunk_rows):
+                yield pa.Table.from_pandas(chunk, preserve_index=False)
+            return
+
+        sql, values = self._bound(sql_query, params)
+        raw = engine.raw_connection()
+        errors = []
+        producer = source = None
+        try:
+            cursor = raw.cursor()
+            schema = self._copy_schema(cursor, sql, values)
+            copy_sql = self._copy_sql(cursor, sql, values)
+            read_fd, write_fd = os.pipe()
+            source = os.fdopen(read_fd, "rb")
+            sink = os.fdopen(write_fd, "wb")
+
+            def _produce():
+                with sink:
+                    try:
+                        cursor.copy_expert(copy_sql, sink)
+                    except Exception as exc:  # se relanza en el hilo que consume
+                        errors.append(exc)
+
+            producer = threading.Thread(target=_produce, name="etl-copy", daemon=True)
+            producer.start()
+            read, parse, convert = self._copy_options(schema, block_size=1 << 20)
+            reader = csv.open_csv(source, read_options=read, parse_options=parse, convert_options=convert)
+            pending, rows = [], 0
+            for batch in reader:
+                pending.append(batch)
+                rows += batch.num_rows
+                if rows >= chunk_rows:
+                    yield pa.Table.from_batches(pending, schema=reader.schema)
+                    pending, rows = [], 0
+            if pending:
+                yield pa.Table.from_batches(pending, schema=reader.schema)
+            producer.join()
+            if errors:
+                raise errors[0]
+            raw.commit()
+        finally:
+            # Corte anticipado (break, excepción, GeneratorExit): el hilo puede seguir
+            # dentro de copy_expert. Se cancela la consulta y se cierra el extremo de
+            # lectura para que termine, y solo entonces se cierra la conexión.
+            if producer is not None and producer.is_alive():
+                self._cancel(raw)
+            if source is not None:
+                source.close()
+            if producer is not None:
+                producer.join()
+            elif source is not None:
+                sink.close()
+            raw.close()
+
+    @staticmethod
+    def _cancel(raw) -> None:
+        """Cancela la consulta en curso en el backend (psycopg2: connection.cancel)."""
+        driver = getattr(raw, "driver_connection", raw)
+        try:
+            driver.cancel()
+        except Exception as exc:  # la conexión se descarta igualmente
+            print(f"No se pudo cancelar el COPY: {exc}")
+
+    def fetch_df(
+        self,
+        sql_query: SQLQuery,
+        params: Optional[Mapping[str, Any]] = None,
+        *,
+        cache: Optional[bool] = None,
+        tables: Optional[Sequence[str]] = None,
+    ):
+        """fetch_arrow convertido a pandas (reemplazo directo de pd.read_sql)."""
+        return self.fetch_arrow(sql_query, params, cache=cache, tables=tables).to_pandas()
 
 # Ejemplo de uso
 """ if __name__ == "__main__":
@@ -54,6 +486,7 @@ class DatabaseConnection:
     print("Conexión exitosa:", engine)
     tbl_abastecimientos = db.query("SELECT * FROM abastecimientos LIMIT 5;")
     print(tbl_abastecimientos)
+    print(db.pool_stats())
     db.close()
-    print("Conexión cerrada") 
-     """
\ No newline at end of file
+    print("Conexión cerrada")
+     """
@@ -3,19 +3,23 @@
 from __future__ import annotations
 
 import os
+import threading
 from pathlib import Path
-from typing import Any, Optional
+from typing import Any, Dict, Optional, Tuple
 
 import yaml
 
-try:  # Streamlit no siempre está disponible
-    import streamlit as st  # type: ignore
-except Exception:  # pragma: no cover - entornos sin streamlit
-    st = None  # type: ignore
+# Raíz del repositorio (config/settings.yaml se resuelve contra ella)
+PROJECT_ROOT = Path(__file__).parent.parent.parent
 
 
 def _get_secret(key: str, default: Optional[Any] = None) -> Optional[Any]:
     """Safely fetch a Streamlit secret without exploding outside Streamlit."""
+    # Import diferido: streamlit tarda segundos en importar y los jobs batch no lo usan.
+    # Solo se consulta si el proceso ya lo cargó (es decir, dentro del dashboard).
+    import sys
+
+    st = sys.modules.get("streamlit")
     if st is None:
         return default
     try:
@@ -24,10 +28,24 @@ def _get_secret(key: str, default: Optional[Any] = None) -> Optional[Any]:
         return default
 
 
+def resolve_settings_path(yaml_file: str = "config/settings.yaml") -> Path:
+    """Ruta al YAML: absoluta, relativa al directorio actual o a la raíz del repo."""
+    path = Path(yaml_file)
+    if path.is_absolute() or path.exists():
+        return path
+    return PROJECT_ROOT / yaml_file
+
+
+def load_settings(path: str = "config/settings.yaml") -> Dict[str, Any]:
+    """Lee settings.yaml como diccionario (lo usan los scripts y el CLI)."""
+    with open(resolve_settings_path(path), "r", encoding="utf-8") as f:
+        return yaml.safe_load(f)
+
+
 class Config:
     def __init__(self, yaml_file: str = "config/settings.yaml") -> None:
-        # Construye la ruta absoluta al archivo settings.yaml
-        self.yaml_file_path = Path(__file__).parent.parent.parent / yaml_file
+        # Misma resolución que load_settings: absoluta, relativa al cwd o a la raíz del repo
+        self.yaml_file_path = resolve_settings_path(yaml_file)
         with open(self.yaml_file_path, "r", encoding="utf-8") as f:
             self.config = yaml.safe_load(f)
 
@@ -48,3 +66,22 @@ class Config:
         return (
             f"postgresql://{self.DB_USER}:{self.DB_PASSWORD}@{self.DB_HOST}:{self.DB_PORT}/{self.DB_NAME}"
         )
+
+
+# Caché de Config por archivo (ruta resuelta): (mtime_ns, Config). Evita re-leer y
+# re-parsear el YAML en cada DatabaseConnection(); si el archivo cambia se vuelve a leer.
+_CONFIG_CACHE: Dict[str, Tuple[int, Config]] = {}
+_CONFIG_LOCK = threading.Lock()
+
+
+def get_config(yaml_file: str = "config/settings.yaml") -> Config:
+    """Devuelve un Config compartido por proceso para yaml_file."""
+    path = resolve_settings_path(yaml_file)
+    key = str(path.resolve())
+    mtime = path.stat().st_mtime_ns
+    with _CONFIG_LOCK:
+        cached = _CONFIG_CACHE.get(key)
+        if cached is None or cached[0] != mtime:
+            cached = (mtime, Config(str(path)))
+            _CONFIG_CACHE[key] = cached
+        return cached[1]
@@ -0,0 +1,300 @@
+"""
+Tabla de hechos equipo x día de combustible vs. producción.
+
+Reemplaza el JOIN de stage.vista_combustible_por_unidad_producida en tiempo de
+consulta. Cada lado se agrega por (equipo, día) con su suma y su número de
+filas, y los dos agregados se unen con un hash join. Con esas cuatro columnas
+la vista mensual reproduce exactamente el JOIN fila a fila:
+
+    SUM(a.galones) sobre los pares = galones * n_reportes
+    SUM(rm.cantidad_produccion)    = cantidad_produccion * n_abastecimientos
+
+Los agregados diarios de cada lado se guardan en data/state/facts/. Así, cuando
+llegan días nuevos de un solo dataset, solo se recalculan esos días. Como el
+índice de huellas, el estado que deja `etl run` queda pendiente
+(<lado>.pending.parquet) hasta que la carga lo confirma con promote(): las
+salidas de la corrida traen todos los días que cambiaron desde la última carga
+confirmada, aunque entre medio haya habido otras corridas sin cargar.
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from etl_project.analytics import _as_text, _loaded_text, _numeric, _ratio, _to_date
+
+FACT_TABLE = "fact_combustible_produccion"
+FACT_COLUMNS = ["equipo", "fecha", "galones", "n_abastecimientos", "cantidad_produccion", "n_reportes"]
+
+# Columnas de cada salida de pipeline que usa el hecho
+FACT_SOURCES: Dict[str, List[str]] = {
+    "abastecimientos": ["equipo", "fecha", "galones"],
+    "rep_maquinaria": ["equipo", "fecha", "unidad", "cantidad_produccion"],
+}
+
+
+def facts_enabled(cfg: Dict) -> bool:
+    """facts.combustible_produccion de settings.yaml (activo por defecto)."""
+    return bool((cfg.get("facts", {}) or {}).get("combustible_produccion", True))
+
+
+def as_rows(fact: pd.DataFrame) -> pd.DataFrame:
+    """Fechas en ISO, como las recibe la columna DATE de raw.fact_combustible_produccion."""
+    return fact.assign(fecha=pd.to_datetime(fact["fecha"]).dt.strftime("%Y-%m-%d"))
+
+
+def abastecimientos_daily(df: pd.DataFrame, loaded: bool = False) -> pd.DataFrame:
+    """
+    Galones y cantidad de abastecimientos por (equipo, día). loaded: df ya pasó
+    por la vuelta por CSV de la carga (streaming), el equipo se toma tal cual.
+    """
+    side = pd.DataFrame({
+        "equipo": _loaded_text(df["equipo"]) if loaded else _as_text(df["equipo"]),
+        "dia": _to_date(df["fecha"]).astype("datetime64[ns]"),
+        "galones": _numeric(df["galones"]),
+    }).dropna(subset=["equipo", "dia"])
+    g = side.groupby(["equipo", "dia"], sort=False)["galones"]
+    return g.agg(galones=lambda s: s.sum(min_count=1), n_abastecimientos="size").reset_index()
+
+
+def rep_maquinaria_daily(df: pd.DataFrame, loaded: bool = False) -> pd.DataFrame:
+    """Producción y cantidad de reportes por (equipo, día), solo unidad = 'H' como la vista."""
+    rm = df[df["unidad"].astype("string") == "H"]
+    side = pd.DataFrame({
+        "equipo": _loaded_text(rm["equipo"]) if loaded else _as_text(rm["equipo"]),
+        "dia": _to_date(rm["fecha"]).astype("datetime64[ns]"),
+        "cantidad_produccion": _numeric(rm["cantidad_produccion"]),
+    }).dropna(subset=["equipo", "dia"])
+    g = side.groupby(["equipo", "dia"], sort=False)["cantidad_produccion"]
+    return g.agg(cantidad_produccion=lambda s: s.sum(min_count=1), n_reportes="size").reset_index()
+
+
+def build_fact(abast_daily: pd.DataFrame, rep_daily: pd.DataFrame) -> pd.DataFrame:
+    """Hash join de los dos agregados diarios (JOIN interno: solo equipo/día presentes en ambos)."""
+    right = rep_daily.set_index(["equipo", "dia"])
+    # reset_index: con lados vacíos pandas deja las claves del join como índice
+    fact = abast_daily.join(right, on=["equipo", "dia"], how="inner").reset_index(drop=True)
+    fact = fact.rename(columns={"dia": "fecha"}).sort_values(["fecha", "equipo"], kind="stable")
+    fact["n_abastecimientos"] = fact["n_abastecimientos"].astype("int64")
+    fact["n_reportes"] = fact["n_reportes"].astype("int64")
+    return fact[FACT_COLUMNS].reset_index(drop=True)
+
+
+def monthly_from_fact(fact: pd.DataFrame) -> pd.DataFrame:
+    """Lo mismo que la vista mensual redefinida sobre la tabla de hechos."""
+    f = pd.DataFrame({
+        "mes": pd.to_datetime(fact["fecha"]).dt.strftime("%Y-%m"),
+        "total_galones": fact["galones"] * fact["n_reportes"],
+        "total_produccion": fact["cantidad_produccion"] * fact["n_abastecimientos"],
+    })
+    out = f.groupby("mes", sort=False).agg(
+        total_galones=("total_galones", lambda s: s.sum(min_count=1)),
+        total_produccion=("total_produccion", lambda s: s.sum(min_count=1)),
+    ).reset_index()
+    out["galones_por_unidad"] = _ratio(out["total_galones"], out["total_produccion"])
+    return out
+
+
+_SIDES: Dict[str, List[str]] = {
+    "abastecimientos": ["equipo", "dia", "galones", "n_abastecimientos"],
+    "rep_maquinaria": ["equipo", "dia", "cantidad_produccion", "n_reportes"],
+}
+_DAILY = {"abastecimientos": abastecimientos_daily, "rep_maquinaria": rep_maquinaria_daily}
+
+
+def daily_side(side: str, df: pd.DataFrame, loaded: bool = False) -> pd.DataFrame:
+    """Agregado diario de una salida del pipeline 'side' (abastecimientos o rep_maquinaria)."""
+    return _DAILY[side](df, loaded)
+
+
+def fold_daily(side: str, frames: List[pd.DataFrame]) -> pd.DataFrame:
+    """
+    Suma agregados diarios de un mismo lado: sumas (NULL si no hay valores) y
+    conteos por (equipo, día). Streaming pliega así cada bloque al llegar.
+    """
+    value, count = _SIDES[side][2], _SIDES[side][3]
+    both = pd.concat(frames, ignore_index=True)
+    return both.groupby(["equipo", "dia"], sort=False).agg(
+        **{value: (value, lambda s: s.sum(min_count=1)), count: (count, "sum")}
+    ).reset_index()
+
+
+def _empty_side(columns: List[str]) -> pd.DataFrame:
+    value, count = columns[2], columns[3]
+    return pd.DataFrame({
+        "equipo": pd.Series(dtype="str"),
+        "dia": pd.Series(dtype="datetime64[ns]"),
+        value: pd.Series(dtype="float64"),
+        count: pd.Series(dtype="int64"),
+    })
+
+
+def _changed_days(before: pd.DataFrame, after: pd.DataFrame, columns: List[str]) -> pd.Series:
+    """Días con algún (equipo, día) agregado, quitado o con otra suma/conteo entre dos estados."""
+    m = before.merge(after, on=["equipo", "dia"], how="outer", suffixes=("_antes", "_despues"), indicator=True)
+    diff = m["_merge"] != "both"
+    for col in columns[2:]:
+        a, b = m[f"{col}_antes"], m[f"{col}_despues"]
+        diff |= ~((a == b) | (a.isna() & b.isna()))
+    return pd.Series(m.loc[diff, "dia"].unique(), dtype="datetime64[ns]")
+
+
+class FuelProductionFact:
+    """
+    Mantiene la tabla de hechos de forma incremental. Por defecto cada
+    actualización reemplaza, en el agregado diario de su lado, los días
+    presentes en el lote (la exportación trae completos los días que cubre).
+    Con additive=True (micro-lotes de `etl watch`, que pueden traer parte de un
+    día ya cargado) las sumas y conteos del lote se suman a los existentes.
+    """
+
+    def __init__(self, cfg: Dict):
+        self.cfg = cfg
+        base = Path(cfg["paths"]["base"])
+        self.state_dir = base / (cfg.get("state", {}) or {}).get("dir", "data/state/") / "facts"
+        self.processed_dir = base / cfg["paths"]["data_processed"]
+
+    def _side_path(self, side: str, pending: bool = False) -> Path:
+        suffix = ".pending.parquet" if pending else ".parquet"
+        return self.state_dir / f"{FACT_TABLE}.{side}{suffix}"
+
+    def _load_side(self, side: str, pending: bool = True) -> pd.DataFrame:
+        """Estado del lado: el pendiente si existe (pending=True), si no el confirmado."""
+        for path in ([self._side_path(side, True)] if pending else []) + [self._side_path(side)]:
+            if path.exists():
+                return pd.read_parquet(path)
+        return _empty_side(_SIDES[side])
+
+    def _merge_side(
+        self, side: str, fresh: pd.DataFrame, additive: bool = False, retract: Optional[pd.DataFrame] = None
+    ) -> pd.DataFrame:
+        current = self._load_side(side)
+        if additive:
+            value, count = _SIDES[side][2], _SIDES[side][3]
+            frames = [current, fresh]
+            if retract is not None:
+                frames.append(retract.assign(**{value: -retract[value], count: -retract[count]}))
+            merged = fold_daily(side, frames)
+            merged = merged[merged[count] > 0].reset_index(drop=True)
+        else:
+            keep = current[~current["dia"].isin(fresh["dia"].unique())]
+            merged = pd.concat([keep, fresh], ignore_index=True)
+        self.state_dir.mkdir(parents=True, exist_ok=True)
+        merged.to_parquet(self._side_path(side, pending=True), index=False)
+        return merged
+
+    def update(
+        self,
+        abastecimientos: Optional[pd.DataFrame] = None,
+        rep_maquinaria: Optional[pd.DataFrame] = None,
+        *,
+        additive: bool = False,
+        retract: Optional[Dict[str, pd.DataFrame]] = None,
+        daily: bool = False,
+    ) -> Tuple[pd.DataFrame, pd.Series]:
+        """
+        Incorpora las salidas nuevas de uno o ambos pipelines al estado pendiente.
+        Devuelve las filas del hecho y los días a reemplazar en la base: los que
+        cambiaron desde la última carga confirmada y que ambos lados ya vieron
+        (un día sin el otro lado no tiene filas, ni antes ni ahora).
+        retract (solo con additive): filas ya sumadas antes que salen, p. ej. la
+        versión anterior de un archivo reemplazado; sus sumas y conteos se restan.
+        daily: los lados ya vienen agregados por (equipo, día) (fold_daily).
+        """
+        fresh = {"abastecimientos": abastecimientos, "rep_maquinaria": rep_maquinaria}
+        retract = retract or {}
+        state: Dict[str, pd.DataFrame] = {}
+        changed = []
+        for side, columns in _SIDES.items():
+            if fresh[side] is not None:
+                old = retract.get(side)
+                old = _DAILY[side](old) if old is not None and additive else None
+                side_daily = fresh[side] if daily else _DAILY[side](fresh[side])
+                state[side] = self._merge_side(side, side_daily, additive, old)
+            else:
+                state[side] = self._load_side(side)
+            changed.append(_changed_days(self._load_side(side, pending=False), state[side], columns))
+
+        abast, rep = state["abastecimientos"], state["rep_maquinaria"]
+        seen = set(abast["dia"].unique()) & set(rep["dia"].unique())
+        days = pd.concat(changed).drop_duplicates()
+        affected = days[days.isin(seen)].sort_values().reset_index(drop=True)
+        fact = build_fact(abast[abast["dia"].isin(affected)], rep[rep["dia"].isin(affected)])
+        return fact, affected
+
+    def has_pending(self) -> bool:
+        return any(self._side_path(side, True).exists() for side in _SIDES)
+
+    def promote(self) -> bool:
+        """Confirma el estado pendiente tras cargar el hecho en la base."""
+        promoted = False
+        for side in _SIDES:
+            pending = self._side_path(side, True)
+            if pending.exists():
+                pending.replace(self._side_path(side))
+                promoted = True
+        return promoted
+
+    def discard(self) -> bool:
+        """Descarta el estado pendiente (una carga inmediata que falló) para recalcular desde lo confirmado."""
+        discarded = False
+        for side in _SIDES:
+            pending = self._side_path(side, True)
+            if pending.exists():
+                pending.unlink()
+                discarded = True
+        return discarded
+
+    def full(self) -> pd.DataFrame:
+        """Tabla de hechos completa a partir de los agregados diarios (incluye lo pendiente)."""
+        return build_fact(self._load_side("abastecimientos"), self._load_side("rep_maquinaria"))
+
+    def write_outputs(self, fact: pd.DataFrame, affected: pd.Series) -> Dict[str, Path]:
+        """
+        processed/<fact>.csv con las filas de los días afectados y
+        processed/<fact>.deletes.csv con esos días (la carga los borra antes
+        de agregar), más la foto completa en processed/<fact>.parquet.
+        Las fechas van en ISO (columna DATE en PostgreSQL).
+        """
+        self.processed_dir.mkdir(parents=True, exist_ok=True)
+        csv_path = self.processed_dir / f"{FACT_TABLE}.csv"
+        deletes_path = self.processed_dir / f"{FACT_TABLE}.deletes.csv"
+        parquet_path = self.processed_dir / f"{FACT_TABLE}.parquet"
+
+        as_rows(fact).to_csv(csv_path, index=False, encoding="utf-8")
+        pd.DataFrame({"fecha": pd.to_datetime(affected).dt.strftime("%Y-%m-%d")}).to_csv(
+            deletes_path, index=False, encoding="utf-8"
+        )
+        self.full().to_parquet(parquet_path, index=False)
+        return {"csv": csv_path, "deletes": deletes_path, "parquet": parquet_path}
+
+
+def load_fact_update(
+    cfg: Dict,
+    loader,
+    *,
+    additive: bool = False,
+    retract: Optional[Dict[str, pd.DataFrame]] = None,
+    rebase: bool = False,
+    daily: bool = False,
+    **sides: pd.DataFrame,
+) -> Tuple[int, int]:
+    """
+    update() + write_outputs() y carga inmediata con 'loader' (delete_rows de los
+    días afectados y luego load_csv); confirma el estado al terminar. Lo usan los
+    modos que cargan sin pasar por `etl load` (streaming y `etl watch`).
+    rebase descarta antes el estado pendiente de un intento anterior que falló.
+    Devuelve (filas, días recalculados).
+    """
+    fact = FuelProductionFact(cfg)
+    if rebase:
+        fact.discard()
+    rows, days = fact.update(additive=additive, retract=retract, daily=daily, **sides)
+    written = fact.write_outputs(rows, days)
+    loader.delete_rows(written["deletes"])
+    loader.load_csv(written["csv"])
+    fact.promote()
+    return len(rows), len(days)
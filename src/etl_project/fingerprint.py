@@ -0,0 +1,174 @@
+"""Huellas por fila para cargar solo el delta de exportaciones que se solapan."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+KEY_HASH = "_key_hash"
+ROW_HASH = "_row_hash"
+SCOPE = "_scope"
+
+
+def _normalize(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Representación estable para hashear: números -> float64, fechas -> int64,
+    el resto -> texto. Así int/float o object/str del mismo valor dan la misma huella.
+    """
+    out = {}
+    for col in df.columns:
+        s = df[col]
+        if pd.api.types.is_datetime64_any_dtype(s):
+            out[col] = s.astype("datetime64[ns]").astype("int64")
+        elif pd.api.types.is_bool_dtype(s) or pd.api.types.is_numeric_dtype(s):
+            out[col] = s.astype("float64")
+        else:
+            out[col] = s.astype(str)
+    return pd.DataFrame(out, index=df.index)
+
+
+def hash_rows(df: pd.DataFrame, columns: Optional[Sequence[str]] = None) -> np.ndarray:
+    """Hash vectorizado (uint64) de cada fila sobre 'columns' (todas por defecto)."""
+    cols = list(columns) if columns else list(df.columns)
+    return pd.util.hash_pandas_object(_normalize(df[cols]), index=False).to_numpy(dtype="uint64")
+
+
+def _with_occurrence(key_hash: np.ndarray) -> np.ndarray:
+    """Combina la huella con el número de ocurrencia para distinguir filas idénticas."""
+    occ = pd.Series(key_hash).groupby(key_hash).cumcount().to_numpy(dtype="uint64")
+    return pd.util.hash_array(key_hash ^ (occ * np.uint64(0x9E3779B97F4A7C15)))
+
+
+@dataclass
+class Delta:
+    """Resultado de comparar un lote contra el índice de huellas."""
+
+    upserts: pd.DataFrame
+    deletes: pd.DataFrame
+    stats: Dict[str, int] = field(default_factory=dict)
+    state: Optional[pd.DataFrame] = None
+
+
+class FingerprintIndex:
+    """
+    Índice persistido (Parquet) de lo ya cargado para un dataset: huella de clave,
+    huella de fila, ámbito (p. ej. la fecha) y los valores de las columnas clave,
+    que se usan como tombstones para borrar en la base.
+
+    Sin 'keys' la fila completa es su propia clave: un cambio aparece como una
+    fila nueva más un tombstone de la anterior.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        keys: Optional[Sequence[str]] = None,
+        scope_column: Optional[str] = None,
+    ):
+        self.path = Path(path)
+        self.keys = list(keys or [])
+        self.scope_column = scope_column
+
+    @property
+    def pending_path(self) -> Path:
+        return self.path.with_name(self.path.stem + ".pending.parquet")
+
+    def load(self) -> Optional[pd.DataFrame]:
+        """Estado persistido; None si el dataset todavía no tiene índice."""
+        return pd.read_parquet(self.path) if self.path.exists() else None
+
+    def _fingerprints(self, df: pd.DataFrame) -> pd.DataFrame:
+        key_cols = self.keys or list(df.columns)
+        missing = [c for c in key_cols if c not in df.columns]
+        if missing:
+            raise KeyError(f"Columnas clave no encontradas: {missing}")
+        row_hash = hash_rows(df)
+        key_hash = hash_rows(df, key_cols) if self.keys else row_hash
+        fp = df[key_cols].reset_index(drop=True).copy()
+        fp[KEY_HASH] = _with_occurrence(key_hash)
+        fp[ROW_HASH] = row_hash
+        fp[SCOPE] = df[self.scope_column].astype(str).to_numpy() if self.scope_column else ""
+        return fp
+
+    def diff(self, df: pd.DataFrame) -> Delta:
+        """
+        Compara el lote con el índice:
+        - upserts: filas nuevas o cambiadas (a cargar)
+        - deletes: columnas clave de filas cambiadas o ausentes dentro del ámbito del lote
+        El índice no se modifica hasta save()/promote().
+        """
+        cur = self._fingerprints(df)
+        prev = self.load()
+        if prev is None:
+            prev = cur.iloc[:0]
+
+        # Posición de cada clave del lote en el índice (-1 = nueva); las claves
+        # son únicas porque incluyen el número de ocurrencia
+        pos = pd.Index(prev[KEY_HASH]).get_indexer(cur[KEY_HASH])
+        known = pos >= 0
+        prev_row = np.zeros(len(cur), dtype="uint64")
+        prev_row[known] = prev[ROW_HASH].to_numpy(dtype="uint64")[pos[known]]
+        same = known & (prev_row == cur[ROW_HASH].to_numpy(dtype="uint64"))
+        changed = known & ~same
+
+        # Ausentes: claves del índice que no vinieron en el lote, solo dentro de su ámbito
+        in_scope = prev[SCOPE].isin(set(cur[SCOPE])) if self.scope_column else pd.Series(True, index=prev.index)
+        removed = in_scope & ~prev[KEY_HASH].isin(cur[KEY_HASH])
+
+        key_cols = [c for c in cur.columns if c not in (KEY_HASH, ROW_HASH, SCOPE)]
+        deletes = pd.concat(
+            [prev.loc[removed, key_cols + [KEY_HASH]], cur.loc[changed, key_cols + [KEY_HASH]]]
+            if self.keys else [prev.loc[removed, key_cols + [KEY_HASH]]],
+            ignore_index=True,
+        ).drop_duplicates(subset=key_cols)
+        load = ~same
+        if not self.keys:
+            # En la base el borrado por fila completa elimina todas las copias idénticas:
+            # las que siguen vigentes se vuelven a cargar
+            load |= cur[ROW_HASH].isin(prev.loc[removed, ROW_HASH]).to_numpy()
+        upserts = df.reset_index(drop=True).loc[load]
+        state = pd.concat([prev.loc[~removed & ~prev[KEY_HASH].isin(cur[KEY_HASH])], cur], ignore_index=True)
+        stats = {
+            "rows": len(cur),
+            "new": int((~known).sum()),
+            "changed": int(changed.sum()),
+            "unchanged": int(same.sum()),
+            "removed": int(removed.sum()),
+        }
+        return Delta(upserts=upserts, deletes=deletes, stats=stats, state=state)
+
+    def save(self, delta: Delta, *, pending: bool = False) -> Path:
+        """Persiste el estado posterior al delta (en .pending si la carga aún no se hizo)."""
+        target = self.pending_path if pending else self.path
+        target.parent.mkdir(parents=True, exist_ok=True)
+        delta.state.to_parquet(target, index=False)
+        return target
+
+    def promote(self) -> bool:
+        """Confirma el estado pendiente tras una carga exitosa."""
+        if not self.pending_path.exists():
+            return False
+        self.pending_path.replace(self.path)
+        return True
+
+
+def index_for(dataset: str, cfg: Dict) -> Optional[FingerprintIndex]:
+    """FingerprintIndex configurado en datasets.<ds>.delta; None si el dataset no usa delta."""
+    dcfg = cfg["datasets"][dataset].get("delta")
+    if not dcfg:
+        return None
+    state_dir = Path(cfg["paths"]["base"]) / (cfg.get("state", {}) or {}).get("dir", "data/state/")
+    return FingerprintIndex(
+        state_dir / "fingerprints" / f"{dataset}.parquet",
+        keys=dcfg.get("keys"),
+        scope_column=dcfg.get("scope_column"),
+    )
+
+
+def delete_columns_for(delta: Delta) -> List[str]:
+    """Columnas de los tombstones que identifican filas en la tabla destino."""
+    return [c for c in delta.deletes.columns if c != KEY_HASH]
@@ -0,0 +1,43 @@
+"""Generación de carga: registro de cada carga exitosa en raw.etl_load_log."""
+
+from __future__ import annotations
+
+from typing import Sequence
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import ProgrammingError
+
+LOAD_LOG_TABLE = "raw.etl_load_log"
+
+_CREATE = f"""
+CREATE TABLE IF NOT EXISTS {LOAD_LOG_TABLE} (
+  generation BIGSERIAL PRIMARY KEY,
+  run_id TEXT NOT NULL,
+  tables TEXT NOT NULL,
+  loaded_at TIMESTAMPTZ NOT NULL DEFAULT now()
+)
+"""
+
+
+def record_load(engine: Engine, run_id: str, tables: Sequence[str]) -> int:
+    """Registra una carga terminada y devuelve su número de generación."""
+    with engine.begin() as conn:
+        conn.execute(text(_CREATE))
+        return conn.execute(
+            text(f"INSERT INTO {LOAD_LOG_TABLE} (run_id, tables) VALUES (:run_id, :tables) RETURNING generation"),
+            {"run_id": run_id, "tables": ",".join(tables)},
+        ).scalar_one()
+
+
+def current_generation(engine: Engine) -> int:
+    """
+    Última generación cargada (lectura del máximo de la PK, barata).
+    0 si todavía no existe la tabla o no hubo cargas.
+    """
+    try:
+        with engine.connect() as conn:
+            value = conn.execute(text(f"SELECT max(generation) FROM {LOAD_LOG_TABLE}")).scalar()
+    except ProgrammingError:
+        return 0
+    return int(value or 0)
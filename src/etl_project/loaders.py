@@ -1,8 +1,16 @@
 from __future__ import annotations
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+from fnmatch import fnmatchcase
 from pathlib import Path
-from typing import List, Optional, Sequence, Union, Dict
+from typing import Dict, Iterator, List, Optional, Sequence, Union
+import numpy as np
 import pandas as pd
 
+# Patrón (glob) o lista de patrones de nombres de hoja, p. ej. "2025-*" o ["Ene*", "Feb*"]
+SheetPattern = Union[str, Sequence[str], None]
+
 class ExcelLoader:
     """
     Loader de archivos Excel con descubrimiento recursivo y lectura parametrizable.
@@ -37,11 +45,7 @@ class ExcelLoader:
         )
         
         if isinstance(df, dict):
-            parts = []
-            for sh, dfi in df.items():
-                dfi["sheet"] = sh
-                parts.append(dfi)
-            return pd.concat(parts, ignore_index=True)
+            return _concat_sheets(df)
         return df
     
     def read_all_sheets(
@@ -50,11 +54,66 @@ class ExcelLoader:
         *,
         header: int = 0,
         engine: str = "openpyxl",
+        sheets: SheetPattern = None,
+        max_workers: Optional[int] = None,
+    ) -> pd.DataFrame:
+        """
+        Lee todas las hojas de un Excel (o las que coinciden con 'sheets') y
+        concatena con columna 'sheet'. Las hojas se parsean en paralelo (read_sheets).
+        """
+        return self.read_sheets(path, sheets=sheets, header=header, engine=engine, max_workers=max_workers)
+
+    def sheet_names(self, path: Union[str, Path], *, engine: str = "openpyxl") -> List[str]:
+        """
+        Nombres de las hojas en el orden del libro. Con openpyxl se abre en modo
+        read_only, que solo lee el índice del libro y no el contenido de las hojas.
+        """
+        path = Path(path)
+        if engine == "openpyxl":
+            from openpyxl import load_workbook
+
+            wb = load_workbook(path, read_only=True)
+            try:
+                return list(wb.sheetnames)
+            finally:
+                wb.close()
+        with pd.ExcelFile(path, engine=engine) as book:
+            return [str(name) for name in book.sheet_names]
+
+    def read_sheets(
+        self,
+        path: Union[str, Path],
+        *,
+        sheets: SheetPattern = None,
+        header: int = 0,
+        engine: str = "openpyxl",
+        dtype: Optional[Union[str, Dict[str, str]]] = None,
+        usecols: Optional[Union[str, List[str]]] = None,
+        skiprows: Optional[Union[int, List[int]]] = None,
+        max_workers: Optional[int] = None,
     ) -> pd.DataFrame:
         """
-        Lee todas las hojas de un Excel (sheet_name=None) y concatena con columna 'sheet'.
+        Lee las hojas de un libro en paralelo: lista las hojas una vez, filtra por
+        'sheets' (patrones glob sobre el nombre) y parsea cada hoja en un proceso
+        aparte (el parseo de openpyxl es CPU y no libera el GIL). El resultado
+        lleva la columna categórica 'sheet' con las hojas en el orden del libro.
+        max_workers=1 (o una sola hoja) lee en el proceso actual, con una sola apertura del libro.
         """
-        return self.read_one(path, header=header, engine=engine, sheet_name=None)
+        path = Path(path)
+        names = select_sheets(self.sheet_names(path, engine=engine), sheets)
+        if not names:
+            raise ValueError(f"Ninguna hoja de {path.name} coincide con {sheets!r}")
+
+        options = dict(header=header, engine=engine, dtype=dtype, usecols=usecols, skiprows=skiprows)
+        workers = min(len(names), max_workers or os.cpu_count() or 1)
+        if workers <= 1:
+            # Sin paralelismo: un solo read_excel abre el libro una vez para todas las hojas
+            frames = pd.read_excel(path, sheet_name=names, **options)
+            frames = [frames[name] for name in names]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                frames = list(pool.map(_read_sheet, [path] * len(names), names, [options] * len(names)))
+        return _concat_sheets(dict(zip(names, frames)))
     
     
     def read_many(
@@ -100,12 +159,7 @@ class ExcelLoader:
         """
         Busca recursivamente archivos que coincidan con 'patterns' y los lee en un solo DataFrame.
         """
-        root = self.base / subdir
-        files: List[Path] = []
-        for pat in patterns:
-            files.extend(root.rglob(pat))
-        if not files:
-            raise FileNotFoundError(f"No se encontraron archivos en {root} con {patterns}")
+        files = self.find_files(subdir, patterns=patterns)
         return self.read_many(
             files,
             header=header,
@@ -114,4 +168,248 @@ class ExcelLoader:
             dtype=dtype,
             usecols=usecols,
             skiprows=skiprows,
-        )
\ No newline at end of file
+        )
+
+    def find_files(
+        self,
+        subdir: Union[str, Path],
+        *,
+        patterns: Sequence[str] = ("*.xlsx", "*.xlsm"),
+    ) -> List[Path]:
+        """
+        Lista (ordenada) de archivos bajo base/subdir que coinciden con 'patterns'.
+        """
+        root = self.base / subdir
+        files: List[Path] = []
+        for pat in patterns:
+            files.extend(root.rglob(pat))
+        if not files:
+            raise FileNotFoundError(f"No se encontraron archivos en {root} con {patterns}")
+        return sorted(set(files))
+
+    def iter_many(
+        self,
+        paths: Sequence[Union[str, Path]],
+        *,
+        header: int = 0,
+        engine: str = "openpyxl",
+        sheet_name: Union[str, int, List[Union[str, int]], None] = 0,
+        chunk_rows: Optional[int] = None,
+        sheets: SheetPattern = None,
+        max_workers: Optional[int] = None,
+    ) -> Iterator[pd.DataFrame]:
+        """
+        Lee archivo por archivo sin concatenar. Con 'chunk_rows' cada archivo se
+        entrega además en bloques de ese tamaño (lectura en streaming con openpyxl).
+        Con 'sheets' se leen las hojas que coinciden (read_sheets); si además hay
+        chunk_rows, hoja por hoja en bloques, cada uno con su columna 'sheet'.
+        """
+        for p in paths:
+            if sheets is not None:
+                if not chunk_rows:
+                    yield self.read_sheets(p, sheets=sheets, header=header, engine=engine, max_workers=max_workers)
+                    continue
+                names = select_sheets(self.sheet_names(p, engine=engine), sheets)
+                for name in names:
+                    for chunk in self.iter_chunks(p, chunk_rows=chunk_rows, header=header, sheet_name=name):
+                        chunk["sheet"] = pd.Categorical([name] * len(chunk), categories=names)
+                        yield chunk
+            elif chunk_rows and isinstance(sheet_name, (int, str)):
+                yield from self.iter_chunks(p, chunk_rows=chunk_rows, header=header, sheet_name=sheet_name)
+            else:
+                yield self.read_one(p, header=header, engine=engine, sheet_name=sheet_name)
+
+    def iter_chunks(
+        self,
+        path: Union[str, Path],
+        *,
+        chunk_rows: int,
+        header: int = 0,
+        sheet_name: Union[str, int] = 0,
+    ) -> Iterator[pd.DataFrame]:
+        """
+        Lee una hoja en bloques de 'chunk_rows' filas con openpyxl en modo read_only,
+        sin cargar el libro completo. Cada bloque pasa por el mismo TextParser que usa
+        pandas.read_excel, así tipos y encabezados ('col', 'col.1', ...) coinciden.
+        Los tipos de los bloques anteriores se mantienen (SchemaPin): un bloque con
+        una columna vacía no la vuelve float64 si antes era texto.
+        """
+        from pandas.io.parsers import TextParser
+
+        from etl_project.memory import SchemaPin
+
+        rows = _sheet_rows(path, header=header, sheet_name=sheet_name)
+        pin = SchemaPin()
+
+        def parse(block: List[list]) -> pd.DataFrame:
+            df = TextParser([header_row, *block], header=0).read()
+            pin.observe(df)
+            return pin.apply(df)
+
+        try:
+            header_row = next(rows, [])
+            block: List[list] = []
+            for row in rows:
+                block.append(row)
+                if len(block) >= chunk_rows:
+                    yield parse(block)
+                    block = []
+            if block:
+                yield parse(block)
+        finally:
+            rows.close()
+
+    def read_head(
+        self,
+        path: Union[str, Path],
+        nrows: int,
+        *,
+        header: int = 0,
+        engine: str = "openpyxl",
+        sheet_name: Union[str, int] = 0,
+    ) -> pd.DataFrame:
+        """
+        Primeras nrows filas de una hoja. Con openpyxl (read_only) se deja de
+        leer el libro al llegar a nrows, así que el costo no depende del tamaño.
+        """
+        if engine != "openpyxl":
+            return pd.read_excel(Path(path), header=header, engine=engine, sheet_name=sheet_name, nrows=nrows)
+        chunks = self.iter_chunks(path, chunk_rows=nrows, header=header, sheet_name=sheet_name)
+        try:
+            df = next(chunks, None)
+        finally:
+            chunks.close()
+        return df if df is not None else pd.DataFrame()
+
+    def read_sample(
+        self,
+        path: Union[str, Path],
+        n: int,
+        *,
+        header: int = 0,
+        engine: str = "openpyxl",
+        sheet_name: Union[str, int] = 0,
+        stratify_by: Optional[str] = None,
+        seed: int = 0,
+    ) -> pd.DataFrame:
+        """
+        Muestra de a lo sumo n filas repartida en todo el archivo, en el orden del
+        archivo. Recorre la hoja una vez en modo read_only con reservoir sampling,
+        sin tener el libro completo en memoria. Con stratify_by (columna del
+        archivo) cada valor aparece en proporción a su frecuencia y, mientras haya
+        menos valores que n, al menos una vez: se guarda además una fila de reserva
+        por valor, que reemplaza una del valor más sobrerrepresentado si el valor
+        no salió. Así los filtros ven todos los casos. Memoria: n + una fila por valor.
+        """
+        from pandas.io.parsers import TextParser
+
+        rng = random.Random(seed)
+        if engine != "openpyxl":
+            df = pd.read_excel(Path(path), header=header, engine=engine, sheet_name=sheet_name)
+            rows = iter([list(df.columns), *df.itertuples(index=False, name=None)])
+        else:
+            rows = _sheet_rows(path, header=header, sheet_name=sheet_name)
+        try:
+            header_row = next(rows, None)
+            if header_row is None:
+                return pd.DataFrame()
+            key_idx = None
+            if stratify_by is not None:
+                names = [_column_key(h) for h in header_row]
+                if _column_key(stratify_by) not in names:
+                    raise KeyError(f"{Path(path).name} no tiene la columna {stratify_by!r}")
+                key_idx = names.index(_column_key(stratify_by))
+
+            sample: List[tuple] = []
+            spare: Dict[object, tuple] = {}
+            counts: Dict[object, int] = {}
+            for i, row in enumerate(rows):
+                key = row[key_idx] if key_idx is not None else None
+                k = counts.get(key, 0)
+                counts[key] = k + 1
+                if key_idx is not None and rng.randint(0, k) == 0:
+                    spare[key] = (i, row)  # una fila uniforme por valor
+                if i < n:
+                    sample.append((i, row))
+                else:
+                    j = rng.randint(0, i)
+                    if j < n:
+                        sample[j] = (i, row)
+        finally:
+            close = getattr(rows, "close", None)
+            if close is not None:
+                close()
+
+        picked = sample
+        if key_idx is not None and len(counts) <= n:
+            total = sum(counts.values())
+            drawn: Dict[object, List[tuple]] = {}
+            for item in picked:
+                drawn.setdefault(item[1][key_idx], []).append(item)
+            for key in [k for k in counts if k not in drawn]:
+                # Sale el valor con más filas por encima de su parte proporcional
+                over = max((k for k in drawn if len(drawn[k]) > 1), key=lambda k: len(drawn[k]) - n * counts[k] / total)
+                drawn[over].pop(rng.randrange(len(drawn[over])))
+                drawn[key] = [spare[key]]
+            picked = [item for items in drawn.values() for item in items]
+        picked.sort(key=lambda item: item[0])
+        return TextParser([list(header_row), *[list(row) for _, row in picked]], header=0).read()
+
+
+def _sheet_rows(path: Union[str, Path], *, header: int = 0, sheet_name: Union[str, int] = 0) -> Iterator[list]:
+    """
+    Filas de una hoja con openpyxl read_only, ya convertidas como las convierte
+    pandas: primero el encabezado y luego los datos, sin las filas vacías.
+    Cerrar el generador cierra el libro.
+    """
+    from openpyxl import load_workbook
+
+    wb = load_workbook(Path(path), read_only=True, data_only=True)
+    try:
+        ws = wb.worksheets[sheet_name] if isinstance(sheet_name, int) else wb[sheet_name]
+        rows = ws.iter_rows(values_only=True)
+        for _ in range(header):
+            next(rows, None)
+        yield [_convert_cell(v) for v in next(rows, ())]
+        for row in rows:
+            if all(v is None for v in row):
+                continue
+            yield [_convert_cell(v) for v in row]
+    finally:
+        wb.close()
+
+
+def _column_key(name) -> str:
+    """Nombre de columna comparable antes o después de clean_column_names."""
+    return str(name).strip().lower().replace(" ", "_")
+
+
+def select_sheets(names: Sequence[str], sheets: SheetPattern = None) -> List[str]:
+    """Hojas (en el orden del libro) cuyo nombre coincide con algún patrón; None = todas."""
+    if sheets is None:
+        return list(names)
+    patterns = [sheets] if isinstance(sheets, str) else list(sheets)
+    return [n for n in names if any(fnmatchcase(n, pat) for pat in patterns)]
+
+
+def _read_sheet(path: Path, name: str, options: Dict) -> pd.DataFrame:
+    """Lee una hoja; a nivel de módulo para poder enviarla a un ProcessPoolExecutor."""
+    return pd.read_excel(path, sheet_name=name, **options)
+
+
+def _concat_sheets(frames: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+    """Concatena las hojas y agrega 'sheet' como categórica (una categoría por hoja)."""
+    names = [str(n) for n in frames]
+    lengths = [len(part) for part in frames.values()]
+    df = pd.concat(list(frames.values()), ignore_index=True)
+    df["sheet"] = pd.Categorical.from_codes(np.repeat(np.arange(len(names)), lengths), categories=names)
+    return df
+
+
+def _convert_cell(value):
+    """Conversión de celdas equivalente a la de pandas para openpyxl."""
+    if value is None:
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
@@ -0,0 +1,155 @@
+"""Presupuesto de memoria por corrida y derrame (spill) a Parquet temporal."""
+
+from __future__ import annotations
+
+import re
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+# Bytes en memoria estimados por byte de .xlsx en disco (XML comprimido -> DataFrame + openpyxl)
+XLSX_EXPANSION = 12.0
+# Copias simultáneas del DataFrame durante transform (las funciones devuelven copias)
+TRANSFORM_COPIES = 3.0
+
+_UNITS = {"": 1, "B": 1, "K": 1024, "KB": 1024, "M": 1024**2, "MB": 1024**2, "G": 1024**3, "GB": 1024**3}
+
+
+def parse_bytes(value: Union[str, int, float, None]) -> Optional[int]:
+    """Convierte '512MB', '2GB', '1.5G' o un número de bytes a entero; None = sin límite."""
+    if value is None or value == "":
+        return None
+    if isinstance(value, (int, float)):
+        return int(value)
+    m = re.fullmatch(r"\s*([\d.]+)\s*([KMG]?B?)\s*", str(value).upper())
+    if not m:
+        raise ValueError(f"Tamaño de memoria inválido: {value!r}")
+    return int(float(m.group(1)) * _UNITS[m.group(2)])
+
+
+def run_options(cfg: Dict) -> Dict:
+    """Sección `run` de settings.yaml con valores por defecto."""
+    opts = {"memory_limit": None, "chunk_rows": 200_000, "xlsx_expansion": XLSX_EXPANSION, "spill_dir": None, "delta": False}
+    opts.update(cfg.get("run", {}) or {})
+    return opts
+
+
+def estimate_file_bytes(path: Union[str, Path], expansion: float = XLSX_EXPANSION) -> int:
+    """Memoria estimada para leer y transformar un archivo Excel completo."""
+    return int(Path(path).stat().st_size * expansion * TRANSFORM_COPIES)
+
+
+def estimate_working_set(paths: Sequence[Union[str, Path]], expansion: float = XLSX_EXPANSION) -> int:
+    """
+    Memoria estimada de la ruta normal (read_many concatena todo y luego transforma):
+    todos los archivos leídos más las copias del concat y de las transformaciones.
+    """
+    return sum(estimate_file_bytes(p, expansion) for p in paths)
+
+
+def _common_dtype(a, b):
+    """Tipo que tendría la columna leída de una vez: int + float -> float64; texto + otro tipo -> object."""
+    if a == b:
+        return a
+    numeric = pd.api.types.is_numeric_dtype
+    bool_ = pd.api.types.is_bool_dtype
+    if numeric(a) and numeric(b) and not bool_(a) and not bool_(b):
+        return np.dtype("float64")
+    return np.dtype(object)
+
+
+class SchemaPin:
+    """
+    Tipos por columna de una secuencia de bloques. TextParser infiere cada
+    bloque por separado: una columna vacía en un bloque sale float64 y en otro
+    object, o int64 en uno y float64 (con NaN) en otro. Solo los bloques en los
+    que la columna tiene valores definen su tipo; apply() lleva un bloque a esos
+    tipos (lo que no se puede convertir sin perder datos queda igual).
+    """
+
+    def __init__(self) -> None:
+        self.dtypes: Dict[str, object] = {}
+
+    def observe(self, df: pd.DataFrame) -> None:
+        for col in df.columns:
+            if df[col].isna().all():
+                continue
+            seen = self.dtypes.get(col)
+            self.dtypes[col] = df[col].dtype if seen is None else _common_dtype(seen, df[col].dtype)
+
+    def apply(self, df: pd.DataFrame) -> pd.DataFrame:
+        casts = {}
+        for col in df.columns:
+            target = self.dtypes.get(col)
+            current = df[col].dtype
+            if target is None or current == target:
+                continue
+            if df[col].isna().all():
+                casts[col] = pd.Series(index=df.index, dtype=target)
+            elif target == object or _common_dtype(current, target) == target:
+                casts[col] = df[col].astype(target)
+        return df.assign(**casts) if casts else df
+
+
+class SpillBuffer:
+    """
+    Acumula DataFrames parciales como Parquet en un directorio temporal para
+    armar la salida final sin tener todo en memoria a la vez.
+    """
+
+    def __init__(self, prefix: str = "etl_spill_", dir: Optional[Union[str, Path]] = None):
+        if dir is not None:
+            Path(dir).mkdir(parents=True, exist_ok=True)
+        self.path = Path(tempfile.mkdtemp(prefix=prefix, dir=dir))
+        self.parts: List[Path] = []
+        self.rows = 0
+        self.schema = SchemaPin()
+
+    def __enter__(self) -> "SpillBuffer":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.cleanup()
+
+    def append(self, df: pd.DataFrame) -> None:
+        """
+        Escribe un bloque como part-NNNNN.parquet (se ignoran bloques vacíos),
+        con los tipos de los bloques anteriores (ver SchemaPin).
+        """
+        if df.empty:
+            return
+        part = self.path / f"part-{len(self.parts):05d}.parquet"
+        self.schema.observe(df)
+        self.schema.apply(df).to_parquet(part, index=False)
+        self.parts.append(part)
+        self.rows += len(df)
+
+    def iter_frames(self) -> Iterator[pd.DataFrame]:
+        """
+        Recorre los bloques en el orden en que se escribieron, todos con los
+        mismos tipos: los de las columnas ya vistas con valores en cualquier bloque.
+        """
+        for part in self.parts:
+            yield self.schema.apply(pd.read_parquet(part))
+
+    def to_frame(self) -> pd.DataFrame:
+        """Concatena todos los bloques (solo si el resultado cabe en memoria)."""
+        frames = list(self.iter_frames())
+        return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+    def write_csv(self, path: Union[str, Path], **kwargs) -> Path:
+        """Escribe un CSV único agregando bloque por bloque (encabezado solo en el primero)."""
+        path = Path(path)
+        for i, frame in enumerate(self.iter_frames()):
+            frame.to_csv(path, mode="w" if i == 0 else "a", header=i == 0, index=False, **kwargs)
+        if not self.parts:
+            path.write_text("", encoding="utf-8")
+        return path
+
+    def cleanup(self) -> None:
+        shutil.rmtree(self.path, ignore_errors=True)
+        self.parts = []
@@ -1,45 +1,23 @@
 from __future__ import annotations
 
-from typing import Dict
 import pandas as pd
 
-from etl_project.loaders import ExcelLoader
+from etl_project.pipelines.base import BasePipeline
 from etl_project.transforms import (
     clean_column_names,
+    rename_columns,
     delete_columns,
     filter_value,
     delete_first_n,
 )
 
-class AbastecimientosPipeline:
+class AbastecimientosPipeline(BasePipeline):
     """
     Orquesta la carga y transformación del dataset 'abastecimientos'
     según reglas definidas en settings.yaml (source, transforms, validate).
     """
 
-    def __init__(self, loader: ExcelLoader, cfg: Dict):
-        self.loader = loader
-        self.cfg = cfg
-        self.ds = cfg["datasets"]["abastecimientos"]
-
-    def extract(self) -> pd.DataFrame:
-        """
-        Descubre archivos recursivamente y concatena en un único DataFrame.
-        """
-        source = self.ds["source"]
-        subdir = source["folder"]
-        patterns = tuple(source.get("patterns", ["*.xlsx", "*.xlsm"]))
-        header = source.get("header", self.cfg["excel"].get("header", 0))
-        engine_name = source.get("engine", self.cfg["excel"].get("engine", "openpyxl"))
-
-        #Sirve para leer multiples excels en una carpeta
-        df = self.loader.read_many_recursive(
-            subdir,
-            patterns=patterns,
-            header=header,
-            engine=engine_name,
-        )
-        return df
+    dataset = "abastecimientos"
 
     def transform(self, df: pd.DataFrame) -> pd.DataFrame:
         """
@@ -63,7 +41,7 @@ class AbastecimientosPipeline:
         # 4. Renombrar columnas
         rename_map = tr.get("rename", {})
         if rename_map:
-            df = df.rename(columns=rename_map)
+            df = rename_columns(df, rename_map)
 
         # 5. Se llama a delete_first_n que elimina los primeros n caracteres de los valores de una columna
         derive = tr.get("derive", {})
@@ -75,11 +53,3 @@ class AbastecimientosPipeline:
             )
 
         return df
-
-    def run(self) -> pd.DataFrame:
-        """
-        Ejecuta Extract -> transform y retorna el DataFrame final.
-        """
-        df = self.extract()
-        df = self.transform(df)
-        return df
\ No newline at end of file
@@ -1,11 +1,11 @@
 from __future__ import annotations
 
-from typing import Dict
 import pandas as pd
 
-from etl_project.loaders import ExcelLoader
+from etl_project.pipelines.base import BasePipeline
 from etl_project.transforms import (
     clean_column_names,
+    rename_columns,
     delete_columns,
     filter_value,
     concat_columns,
@@ -13,35 +13,13 @@ from etl_project.transforms import (
 )
 
 
-class ActividadesPipeline:
+class ActividadesPipeline(BasePipeline):
     """
     Orquesta la carga y transformación del dataset 'actividades'
     según reglas declaradas en settings.yaml.
     """
 
-    def __init__(self, loader: ExcelLoader, cfg: Dict):
-        self.loader = loader
-        self.cfg = cfg
-        self.ds = cfg["datasets"]["actividades"]
-        
-    def extract(self) -> pd.DataFrame:
-        """
-        Descubre archivos recursivamente y concatena en un único DataFrame.
-        """
-        source = self.ds["source"]
-        subdir = source["folder"]
-        patterns = tuple(source.get("patterns", ["*.xlsx", "*.xlsm"]))
-        header = source.get("header", self.cfg["excel"].get("header", 0))
-        engine_name = source.get("engine", self.cfg["excel"].get("engine", "openpyxl"))
-        
-        #Sirve para leer multiples excels en una carpeta
-        df = self.loader.read_many_recursive(
-            subdir,
-            patterns=patterns,
-            header=header,
-            engine=engine_name,
-        )
-        return df
+    dataset = "actividades"
 
     def transform(self, df: pd.DataFrame) -> pd.DataFrame:
         """
@@ -65,7 +43,7 @@ class ActividadesPipeline:
         # 4) Renombrar columnas
         rename_map = tr.get("rename", {})
         if rename_map:
-            df = df.rename(columns=rename_map)
+            df = rename_columns(df, rename_map)
             
         # 5. Ajustar formato de fecha
         adf = tr.get("adjust_date_format", {})
@@ -89,11 +67,3 @@ class ActividadesPipeline:
             )
 
         return df
-
-    def run(self) -> pd.DataFrame:
-        """
-        Ejecuta Extract -> transform y retorna el DataFrame final.
-        """
-        df = self.extract()
-        df = self.transform(df)
-        return df
\ No newline at end of file
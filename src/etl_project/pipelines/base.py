@@ -0,0 +1,220 @@
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+import pandas as pd
+
+from etl_project.fingerprint import Delta, index_for
+from etl_project.loaders import ExcelLoader, select_sheets
+from etl_project.memory import SpillBuffer, estimate_file_bytes, estimate_working_set, parse_bytes, run_options
+from etl_project.profiling import stage
+
+
+class BasePipeline(ABC):
+    """
+    Comportamiento común de los pipelines por dataset: lectura de la sección
+    'source' de settings.yaml y ejecución Extract -> transform instrumentada.
+    Cada subclase define `dataset` y su propio `transform`.
+    """
+
+    dataset: str = ""
+
+    def __init__(self, loader: ExcelLoader, cfg: Dict):
+        self.loader = loader
+        self.cfg = cfg
+        self.ds = cfg["datasets"][self.dataset]
+
+    def _source_options(self) -> Tuple[str, Tuple[str, ...], int, str]:
+        source = self.ds["source"]
+        subdir = source["folder"]
+        patterns = tuple(source.get("patterns", ["*.xlsx", "*.xlsm"]))
+        header = source.get("header", self.cfg["excel"].get("header", 0))
+        engine_name = source.get("engine", self.cfg["excel"].get("engine", "openpyxl"))
+        return subdir, patterns, header, engine_name
+
+    def _sheet_options(self) -> Tuple[Optional[object], Optional[int]]:
+        """source.sheets (patrón o lista de patrones de hoja) y excel.sheet_workers."""
+        sheets = self.ds["source"].get("sheets")
+        workers = self.ds["source"].get("sheet_workers", self.cfg["excel"].get("sheet_workers"))
+        return sheets, workers
+
+    def extract(self) -> pd.DataFrame:
+        """
+        Descubre archivos recursivamente y concatena en un único DataFrame.
+        Con source.sheets cada libro se lee hoja por hoja en paralelo, con columna 'sheet'.
+        """
+        subdir, patterns, header, engine_name = self._source_options()
+        sheets, workers = self._sheet_options()
+        if sheets is not None:
+            parts = [
+                self.loader.read_sheets(p, sheets=sheets, header=header, engine=engine_name, max_workers=workers)
+                for p in self._require_files(self.source_files())
+            ]
+            df = pd.concat(parts, ignore_index=True)
+            df["sheet"] = df["sheet"].astype("category")  # categorías distintas por libro
+            return df
+
+        #Sirve para leer multiples excels en una carpeta
+        df = self.loader.read_many_recursive(
+            subdir,
+            patterns=patterns,
+            header=header,
+            engine=engine_name,
+        )
+        return df
+
+    def source_files(self) -> List[Path]:
+        """Archivos fuente del dataset según source.folder y source.patterns."""
+        subdir, patterns, _, _ = self._source_options()
+        return self.loader.find_files(subdir, patterns=patterns)
+
+    def _require_files(self, files: Sequence[Path]) -> List[Path]:
+        """Los archivos a leer; sin ninguno, el FileNotFoundError de find_files en vez del de pd.concat([])."""
+        files = list(files)
+        if not files:
+            subdir, patterns, _, _ = self._source_options()
+            raise FileNotFoundError(f"No se encontraron archivos en {self.loader.base / subdir} con {patterns}")
+        return files
+
+    # --------------------------------------------------- presupuesto de memoria
+    def memory_limit(self) -> Optional[int]:
+        """Límite en bytes de run.memory_limit (o datasets.<ds>.memory_limit); None = sin límite."""
+        return parse_bytes(self.ds.get("memory_limit", run_options(self.cfg)["memory_limit"]))
+
+    def exceeds_memory_limit(self) -> bool:
+        """True si el working set estimado de extract+transform supera el límite."""
+        limit = self.memory_limit()
+        if limit is None:
+            return False
+        expansion = float(run_options(self.cfg)["xlsx_expansion"])
+        return estimate_working_set(self.source_files(), expansion) > limit
+
+    def iter_transformed(
+        self,
+        chunk_rows: Optional[int] = None,
+        files: Optional[Sequence[Path]] = None,
+    ) -> Iterator[pd.DataFrame]:
+        """
+        Extract -> transform archivo por archivo. Los archivos que por sí solos
+        superan el límite se leen en bloques de run.chunk_rows filas; con
+        chunk_rows todos los archivos se leen en bloques de ese tamaño.
+        Las transformaciones son por fila, así que el resultado equivale a run().
+        files limita la corrida a esos archivos (p. ej. los nuevos de `etl watch`).
+        """
+        _, _, header, engine_name = self._source_options()
+        sheets, workers = self._sheet_options()
+        opts = run_options(self.cfg)
+        limit = self.memory_limit()
+        expansion = float(opts["xlsx_expansion"])
+        for path in (self.source_files() if files is None else files):
+            too_big = limit is not None and estimate_file_bytes(path, expansion) > limit
+            if chunk_rows is None and too_big:
+                chunk_rows_file = int(opts["chunk_rows"])
+            else:
+                chunk_rows_file = chunk_rows
+            chunks = self.loader.iter_many(
+                [path],
+                header=header,
+                engine=engine_name,
+                chunk_rows=chunk_rows_file,
+                sheets=sheets,
+                max_workers=workers,
+            )
+            for chunk in chunks:
+                yield self.transform(chunk)
+
+    def run_spilled(self, spill: SpillBuffer) -> SpillBuffer:
+        """
+        Ejecuta el pipeline por partes derramando cada resultado a Parquet temporal;
+        la salida final se arma después desde el SpillBuffer.
+        """
+        with stage("extract_transform_spill", dataset=self.dataset) as st:
+            for part in self.iter_transformed():
+                spill.append(part)
+            if st:
+                st.rows_out = spill.rows
+        return spill
+
+    def preview(
+        self,
+        rows: int = 200,
+        *,
+        sample: bool = False,
+        stratify_by: Optional[str] = None,
+        seed: int = 0,
+        files: Optional[Sequence[Path]] = None,
+    ) -> pd.DataFrame:
+        """
+        Extract -> transform sobre una muestra de cada archivo, para probar un
+        bloque `transforms` sin leer los libros completos: las primeras `rows`
+        filas (read_only, corta la lectura ahí) o, con sample=True, `rows` filas
+        repartidas en todo el archivo (estratificadas por stratify_by). Con un
+        RunProfiler activo cada paso queda registrado como en run().
+        """
+        _, _, header, engine_name = self._source_options()
+        sheets, _ = self._sheet_options()
+        parts = []
+        with stage("extract_preview", dataset=self.dataset) as st:
+            for path in self._require_files(self.source_files() if files is None else files):
+                names = (
+                    select_sheets(self.loader.sheet_names(path, engine=engine_name), sheets)
+                    if sheets is not None else [0]
+                )
+                if not names:
+                    raise ValueError(f"Ninguna hoja de {path.name} coincide con {sheets!r}")
+                for name in names:
+                    if sample:
+                        part = self.loader.read_sample(
+                            path, rows, header=header, engine=engine_name, sheet_name=name,
+                            stratify_by=stratify_by, seed=seed,
+                        )
+                    else:
+                        part = self.loader.read_head(path, rows, header=header, engine=engine_name, sheet_name=name)
+                    if sheets is not None:
+                        part["sheet"] = name
+                    parts.append(part)
+            df = pd.concat(parts, ignore_index=True)
+            if sheets is not None:
+                df["sheet"] = df["sheet"].astype("category")
+            if st:
+                st.observe(df)
+        with stage("transform", df, dataset=self.dataset) as st:
+            df = self.transform(df)
+            if st:
+                st.observe(df)
+        return df
+
+    @abstractmethod
+    def transform(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Transformaciones propias del dataset (settings.yaml: datasets.<ds>.transforms)."""
+
+    def fingerprint(self, df: pd.DataFrame) -> Optional[Delta]:
+        """
+        Compara la salida de transform con el índice de huellas del dataset
+        (datasets.<ds>.delta) y devuelve solo filas nuevas/cambiadas y tombstones.
+        None si el dataset no tiene sección delta.
+        """
+        index = index_for(self.dataset, self.cfg)
+        if index is None:
+            return None
+        with stage("fingerprint", df, dataset=self.dataset) as st:
+            delta = index.diff(df)
+            if st:
+                st.observe(delta.upserts)
+        return delta
+
+    def run(self) -> pd.DataFrame:
+        """
+        Ejecuta Extract -> transform y retorna el DataFrame final.
+        Si hay un RunProfiler activo, cada etapa queda registrada.
+        """
+        with stage("extract", dataset=self.dataset) as st:
+            df = self.extract()
+            if st:
+                st.observe(df)
+        with stage("transform", df, dataset=self.dataset) as st:
+            df = self.transform(df)
+            if st:
+                st.observe(df)
+        return df
@@ -1,46 +1,24 @@
 from __future__ import annotations
 
-from typing import Dict
 import pandas as pd
 
-from etl_project.loaders import ExcelLoader
+from etl_project.pipelines.base import BasePipeline
 from etl_project.transforms import (
     clean_column_names,
+    rename_columns,
     delete_columns,
     concat_columns,
     adjust_date_format,
     concat_column_with_first_n,
 )
 
-class InsumosPipeline:
+class InsumosPipeline(BasePipeline):
     """
     Orquesta la carga y transformación del dataset 'insumos'
     según reglas declaradas en settings.yaml.
     """
 
-    def __init__(self, loader: ExcelLoader, cfg: Dict):
-        self.loader = loader
-        self.cfg = cfg
-        self.ds = cfg["datasets"]["insumos"]
-        
-    def extract(self) -> pd.DataFrame:
-        """
-        Descubre archivos recursivamente y concatena en un único DataFrame.
-        """
-        source = self.ds["source"]
-        subdir = source["folder"]
-        patterns = tuple(source.get("patterns", ["*.xlsx", "*.xlsm"]))
-        header = source.get("header", self.cfg["excel"].get("header", 0))
-        engine_name = source.get("engine", self.cfg["excel"].get("engine", "openpyxl"))
-        
-        # Sirve para leer multiples excels en una carpeta
-        df = self.loader.read_many_recursive(
-            subdir,
-            patterns=patterns,
-            header=header,
-            engine=engine_name,
-        )
-        return df
+    dataset = "insumos"
 
     def transform(self, df: pd.DataFrame) -> pd.DataFrame:
         """
@@ -60,7 +38,7 @@ class InsumosPipeline:
         # 3) Renombrar columnas
         rename_map = tr.get("rename", {})
         if rename_map:
-            df = df.rename(columns=rename_map)
+            df = rename_columns(df, rename_map)
 
         # 4. Ajustar formato de fechas según YAML
         date_adjust = tr.get("derive", {}).get("adjust_date_format")
@@ -95,11 +73,3 @@ class InsumosPipeline:
             )
 
         return df
-
-    def run(self) -> pd.DataFrame:
-        """
-        Ejecuta Extract -> transform y retorna el DataFrame final.
-        """
-        df = self.extract()
-        df = self.transform(df)
-        return df
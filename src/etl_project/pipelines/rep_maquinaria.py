@@ -1,45 +1,23 @@
 from __future__ import annotations
 
-from typing import Dict
 import pandas as pd
 
-from etl_project.loaders import ExcelLoader
+from etl_project.pipelines.base import BasePipeline
 from etl_project.transforms import (
     clean_column_names,
+    rename_columns,
     delete_columns,
     adjust_date_format,
     concat_columns,
 )
 
-class RepMaquinariaPipeline:
+class RepMaquinariaPipeline(BasePipeline):
     """
     Orquesta la carga y transformación del dataset 'rep_maquinaria'
     según reglas declaradas en settings.yaml.
     """
 
-    def __init__(self, loader: ExcelLoader, cfg: Dict):
-        self.loader = loader
-        self.cfg = cfg
-        self.ds = cfg["datasets"]["rep_maquinaria"]
-        
-    def extract(self) -> pd.DataFrame:
-        """
-        Descubre archivos recursivamente y concatena en un único DataFrame.
-        """
-        source = self.ds["source"]
-        subdir = source["folder"]
-        patterns = tuple(source.get("patterns", ["*.xlsx", "*.xlsm"]))
-        header = source.get("header", self.cfg["excel"].get("header", 0))
-        engine_name = source.get("engine", self.cfg["excel"].get("engine", "openpyxl"))
-        
-        #Sirve para leer multiples excels en una carpeta
-        df = self.loader.read_many_recursive(
-            subdir,
-            patterns=patterns,
-            header=header,
-            engine=engine_name,
-        )
-        return df
+    dataset = "rep_maquinaria"
 
     def transform(self, df: pd.DataFrame) -> pd.DataFrame:
         """
@@ -59,7 +37,7 @@ class RepMaquinariaPipeline:
         # 3. Renombrar columnas
         ren = tr.get("rename", {})
         if ren:
-            df = df.rename(columns=ren)
+            df = rename_columns(df, ren)
 
         # 4) Ajuste de formato de fechas
         adf = tr.get("derive", {}).get("adjust_date_format")
@@ -83,11 +61,3 @@ class RepMaquinariaPipeline:
             )  # Concatena columnas como texto con separador y ubica la nueva en la posición indicada [web:439].
 
         return df
-
-    def run(self) -> pd.DataFrame:
-        """
-        Ejecuta Extract -> transform y retorna el DataFrame final.
-        """
-        df = self.extract()
-        df = self.transform(df)
-        return df
\ No newline at end of file
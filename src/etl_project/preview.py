@@ -0,0 +1,100 @@
+"""
+Vista previa de un dataset (`etl preview`): corre los transforms de
+settings.yaml sobre una muestra de cada archivo y muestra el esquema
+resultante, las filas por paso (registros del RunProfiler) y filas de ejemplo.
+Sirve para iterar sobre un bloque `transforms` sin la corrida completa.
+"""
+
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+from etl_project.profiling import RunProfiler, StageMetrics
+
+PREVIEW_DEFAULTS = {"rows": 200, "seed": 0}
+
+
+@dataclass
+class PreviewResult:
+    dataset: str
+    files: List[Path]
+    output: pd.DataFrame
+    seconds: float
+    steps: List[StageMetrics] = field(default_factory=list)
+
+
+def preview_dataset(
+    cfg: Dict,
+    dataset: str,
+    *,
+    rows: Optional[int] = None,
+    sample: bool = False,
+    stratify_by: Optional[str] = None,
+    seed: Optional[int] = None,
+) -> PreviewResult:
+    """Ejecuta BasePipeline.preview con un profiler local (sin exportar métricas)."""
+    from etl_project.loaders import ExcelLoader
+    from etl_project.runner import get_pipeline
+
+    opts = {**PREVIEW_DEFAULTS, **((cfg.get("preview", {}) or {}))}
+    pipeline = get_pipeline(dataset)(ExcelLoader(cfg["paths"]["base"]), cfg)
+    files = pipeline.source_files()
+    profiler = RunProfiler(name="preview")
+    started = time.perf_counter()
+    with profiler:
+        out = pipeline.preview(
+            int(rows or opts["rows"]),
+            sample=sample,
+            stratify_by=stratify_by,
+            seed=int(opts["seed"] if seed is None else seed),
+            files=files,
+        )
+    seconds = time.perf_counter() - started
+    # Extract, los pasos directos de transform en el orden en que empezaron y el total de transform
+    steps = [
+        rec for rec in profiler.records
+        if rec.parent is None or rec.parent == f"{dataset}/transform"
+    ]
+    steps.sort(key=lambda rec: (rec.stage == "transform", rec.started_at))
+    return PreviewResult(dataset=dataset, files=files, output=out, seconds=seconds, steps=steps)
+
+
+def schema_table(df: pd.DataFrame) -> pd.DataFrame:
+    """Columna, tipo, no nulos y un valor de ejemplo por columna."""
+    return pd.DataFrame({
+        "columna": [str(c) for c in df.columns],
+        "tipo": [str(t) for t in df.dtypes],
+        "no_nulos": [int(df[c].notna().sum()) for c in df.columns],
+        "ejemplo": [
+            str(df[c].dropna().iloc[0])[:40] if df[c].notna().any() else ""
+            for c in df.columns
+        ],
+    })
+
+
+def format_preview(result: PreviewResult, show: int = 10) -> str:
+    """Reporte de texto: resumen, filas por paso, esquema y muestra."""
+    out = result.output
+    extract = next((r for r in result.steps if r.stage == "extract_preview"), None)
+    read = extract.rows_out if extract else None
+    lines = [
+        f"{result.dataset}: {len(result.files)} archivo(s), {read} filas leídas -> "
+        f"{len(out)} filas, {out.shape[1]} columnas en {result.seconds:.2f}s",
+        "",
+        "Pasos (filas entrada -> salida):",
+    ]
+    for rec in result.steps:
+        rows_in = "-" if rec.rows_in is None else str(rec.rows_in)
+        rows_out = "-" if rec.rows_out is None else str(rec.rows_out)
+        lines.append(f"  {rec.stage:<32} {rows_in:>8} -> {rows_out:<8} {rec.wall_seconds * 1000:8.1f} ms")
+    lines += ["", f"Esquema ({out.shape[1]} columnas):"]
+    lines += ["  " + line for line in schema_table(out).to_string(index=False).splitlines()]
+    lines += ["", f"Muestra ({min(show, len(out))} de {len(out)} filas):"]
+    with pd.option_context("display.width", 200, "display.max_columns", None):
+        lines += ["  " + line for line in out.head(show).to_string(index=False).splitlines()]
+    return "\n".join(lines)
@@ -0,0 +1,305 @@
+"""Instrumentación de etapas del ETL: tiempos, filas y memoria por paso."""
+
+from __future__ import annotations
+
+import contextvars
+import functools
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Union
+
+try:  # resource solo existe en sistemas POSIX
+    import resource
+except ImportError:  # pragma: no cover - Windows
+    resource = None  # type: ignore
+
+# Profiler activo del contexto actual; None = instrumentación desactivada
+_ACTIVE: contextvars.ContextVar[Optional["RunProfiler"]] = contextvars.ContextVar(
+    "etl_active_profiler", default=None
+)
+
+
+def _peak_rss_bytes() -> Optional[int]:
+    """
+    Pico de memoria residente del proceso (bytes) desde que arrancó, si la
+    plataforma lo expone. Solo crece: no sirve para atribuir memoria a una etapa.
+    """
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux reporta KiB, macOS reporta bytes
+        return int(peak) if sys.platform == "darwin" else int(peak) * 1024
+    try:
+        import psutil  # type: ignore
+    except ImportError:
+        return None
+    info = psutil.Process().memory_info()
+    return int(getattr(info, "peak_wset", info.rss))
+
+
+def _current_rss_bytes() -> Optional[int]:
+    """Memoria residente actual del proceso (bytes), si la plataforma lo expone."""
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError, IndexError):
+        pass
+    try:
+        import psutil  # type: ignore
+    except ImportError:
+        return None
+    return int(psutil.Process().memory_info().rss)
+
+
+def _shape(obj: Any) -> Optional[tuple]:
+    """Devuelve (filas, columnas) de objetos tipo DataFrame sin importar pandas."""
+    shape = getattr(obj, "shape", None)
+    if isinstance(shape, tuple) and len(shape) == 2:
+        return shape
+    return None
+
+
+@dataclass
+class StageMetrics:
+    """Métricas de una etapa (extract, paso de transformación, escritura o carga)."""
+
+    stage: str
+    path: str
+    dataset: Optional[str] = None
+    parent: Optional[str] = None
+    wall_seconds: float = 0.0
+    cpu_seconds: float = 0.0
+    self_seconds: float = 0.0
+    rows_in: Optional[int] = None
+    rows_out: Optional[int] = None
+    columns_out: Optional[int] = None
+    rss_delta_bytes: Optional[int] = None  # RSS al terminar la etapa menos RSS al empezar
+    process_peak_rss_bytes: Optional[int] = None  # pico del proceso hasta el fin de la etapa
+    status: str = "ok"
+    started_at: str = field(default_factory=lambda: datetime.now(timezone.utc).isoformat())
+
+    def observe_input(self, obj: Any) -> None:
+        """Registra las filas de entrada a partir de un DataFrame."""
+        shape = _shape(obj)
+        if shape is not None:
+            self.rows_in = int(shape[0])
+
+    def observe(self, obj: Any) -> None:
+        """Registra filas y columnas de salida a partir de un DataFrame."""
+        shape = _shape(obj)
+        if shape is not None:
+            self.rows_out = int(shape[0])
+            self.columns_out = int(shape[1])
+
+
+class RunProfiler:
+    """
+    Acumula métricas por etapa durante una ejecución y las exporta como
+    reporte JSON y como textfile de Prometheus.
+
+    Se activa con `with profiler:`; mientras está activo, `stage()` y las
+    funciones decoradas con `@profiled` registran sus métricas aquí.
+    """
+
+    def __init__(self, run_id: Optional[str] = None, name: str = "etl"):
+        self.run_id = run_id or datetime.now().strftime("%Y%m%dT%H%M%S-") + uuid.uuid4().hex[:6]
+        self.name = name
+        self.records: List[StageMetrics] = []
+        self._local = threading.local()  # pila de etapas por hilo (modo streaming)
+        self._child_wall: Dict[int, float] = {}
+        self._token: Optional[contextvars.Token] = None
+        self._started = time.perf_counter()
+        self._started_at = datetime.now(timezone.utc)
+
+    @property
+    def _stack(self) -> List[StageMetrics]:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def __enter__(self) -> "RunProfiler":
+        self._token = _ACTIVE.set(self)
+        return self
+
+    def __exit__(self, *exc) -> None:
+        if self._token is not None:
+            _ACTIVE.reset(self._token)
+            self._token = None
+
+    @contextmanager
+    def stage(self, name: str, df: Any = None, dataset: Optional[str] = None) -> Iterator[StageMetrics]:
+        """
+        Mide una etapa. Las etapas anidadas heredan el dataset y forman una ruta
+        'dataset/extract', 'dataset/transform/filter_value', etc.
+        """
+        parent = self._stack[-1] if self._stack else None
+        if dataset is None and parent is not None:
+            dataset = parent.dataset
+        if parent is not None:
+            path = f"{parent.path}/{name}"
+        else:
+            path = f"{dataset}/{name}" if dataset else name
+
+        rec = StageMetrics(stage=name, path=path, dataset=dataset, parent=parent.path if parent else None)
+        rec.observe_input(df)
+        self._stack.append(rec)
+        wall0, cpu0, rss0 = time.perf_counter(), time.process_time(), _current_rss_bytes()
+        try:
+            yield rec
+        except BaseException:
+            rec.status = "error"
+            raise
+        finally:
+            rec.wall_seconds = time.perf_counter() - wall0
+            rec.cpu_seconds = time.process_time() - cpu0
+            rss1 = _current_rss_bytes()
+            rec.rss_delta_bytes = rss1 - rss0 if rss0 is not None and rss1 is not None else None
+            rec.process_peak_rss_bytes = _peak_rss_bytes()
+            # Tiempo propio = wall menos el de las etapas hijas directas
+            rec.self_seconds = max(rec.wall_seconds - self._child_wall.pop(id(rec), 0.0), 0.0)
+            if parent is not None:
+                self._child_wall[id(parent)] = self._child_wall.get(id(parent), 0.0) + rec.wall_seconds
+            self._stack.pop()
+            self.records.append(rec)
+
+    def call(self, name: str, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Ejecuta fn(*args, **kwargs) como una etapa y registra la forma del resultado."""
+        with self.stage(name, df=args[0] if args else None) as rec:
+            out = fn(*args, **kwargs)
+            rec.observe(out)
+        return out
+
+    # ----------------------------------------------------------------- reporte
+    def report(self) -> Dict[str, Any]:
+        """Construye el reporte de la ejecución, incluyendo la etapa más costosa por dataset."""
+        stages = []
+        hot: Dict[str, Dict[str, Any]] = {}
+        for rec in self.records:
+            stages.append(asdict(rec))
+            key = rec.dataset or "-"
+            if key not in hot or rec.self_seconds > hot[key]["self_seconds"]:
+                hot[key] = {"path": rec.path, "self_seconds": round(rec.self_seconds, 6)}
+        return {
+            "run_id": self.run_id,
+            "name": self.name,
+            "started_at": self._started_at.isoformat(),
+            "wall_seconds": round(time.perf_counter() - self._started, 6),
+            "process_peak_rss_bytes": _peak_rss_bytes(),
+            "hot_stages": hot,
+            "stages": stages,
+        }
+
+    def write_json(self, path: Union[str, Path]) -> Path:
+        """Escribe el reporte JSON de la ejecución."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.report(), indent=2, ensure_ascii=False), encoding="utf-8")
+        return path
+
+    def write_prometheus(self, path: Union[str, Path]) -> Path:
+        """
+        Escribe las métricas en formato textfile de Prometheus (node_exporter).
+        Las etapas repetidas con la misma ruta se suman; la escritura es atómica.
+        """
+        agg: Dict[tuple, Dict[str, float]] = {}
+        for rec in self.records:
+            key = (rec.dataset or "", rec.path)
+            acc = agg.setdefault(key, {"wall": 0.0, "cpu": 0.0, "rows": 0.0, "rss_delta": 0.0})
+            acc["wall"] += rec.wall_seconds
+            acc["cpu"] += rec.cpu_seconds
+            acc["rows"] += rec.rows_out or 0
+            acc["rss_delta"] = max(acc["rss_delta"], float(rec.rss_delta_bytes or 0))
+
+        metrics = [
+            ("etl_stage_wall_seconds", "Tiempo de reloj por etapa.", "wall"),
+            ("etl_stage_cpu_seconds", "Tiempo de CPU por etapa.", "cpu"),
+            ("etl_stage_rows_out", "Filas de salida por etapa.", "rows"),
+            ("etl_stage_rss_delta_bytes", "Crecimiento de RSS durante la etapa (máximo entre repeticiones).", "rss_delta"),
+        ]
+        lines: List[str] = []
+        for metric, help_text, field_name in metrics:
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} gauge")
+            for (dataset, stage_path), acc in sorted(agg.items()):
+                labels = f'pipeline="{self.name}",dataset="{dataset}",stage="{stage_path}"'
+                lines.append(f"{metric}{{{labels}}} {acc[field_name]:.6f}")
+        peak = _peak_rss_bytes()
+        if peak is not None:
+            lines.append("# HELP etl_run_process_peak_rss_bytes Pico de RSS del proceso (toda su vida).")
+            lines.append("# TYPE etl_run_process_peak_rss_bytes gauge")
+            lines.append(f'etl_run_process_peak_rss_bytes{{pipeline="{self.name}"}} {peak}')
+        lines.append("# HELP etl_run_last_timestamp_seconds Fin de la última ejecución.")
+        lines.append("# TYPE etl_run_last_timestamp_seconds gauge")
+        lines.append(f'etl_run_last_timestamp_seconds{{pipeline="{self.name}"}} {time.time():.0f}')
+
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        tmp.write_text("\n".join(lines) + "\n", encoding="utf-8")
+        os.replace(tmp, path)
+        return path
+
+    def export(self, cfg: Dict) -> Dict[str, Path]:
+        """Exporta según la sección `metrics` de settings.yaml."""
+        mcfg = cfg.get("metrics", {}) or {}
+        if not mcfg.get("enabled", True):
+            return {}
+        base = Path(cfg.get("paths", {}).get("base", "."))
+        out_dir = base / mcfg.get("dir", "data/metrics/")
+        written = {"json": self.write_json(out_dir / f"run_{self.run_id}.json")}
+        prom = mcfg.get("prometheus_textfile")
+        if prom:
+            written["prometheus"] = self.write_prometheus(base / prom)
+        return written
+
+
+def active_profiler() -> Optional[RunProfiler]:
+    """Devuelve el profiler activo, o None si no hay instrumentación en curso."""
+    return _ACTIVE.get()
+
+
+@contextmanager
+def stage(name: str, df: Any = None, dataset: Optional[str] = None) -> Iterator[Optional[StageMetrics]]:
+    """
+    Context manager de etapa sobre el profiler activo. Sin profiler activo no
+    mide nada y entrega None, por lo que se puede dejar siempre en el código.
+    """
+    profiler = _ACTIVE.get()
+    if profiler is None:
+        yield None
+        return
+    with profiler.stage(name, df=df, dataset=dataset) as rec:
+        yield rec
+
+
+def profiled(name: Optional[str] = None) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """
+    Decorador para funciones DataFrame -> DataFrame. Registra una etapa con el
+    nombre de la función cuando hay un profiler activo.
+    """
+
+    def decorator(fn: Callable[..., Any]) -> Callable[..., Any]:
+        stage_name = name or fn.__name__
+
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            profiler = _ACTIVE.get()
+            if profiler is None:
+                return fn(*args, **kwargs)
+            df = args[0] if args else kwargs.get("df")
+            with profiler.stage(stage_name, df=df) as rec:
+                out = fn(*args, **kwargs)
+                rec.observe(out)
+            return out
+
+        return wrapper
+
+    return decorator
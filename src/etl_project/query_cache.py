@@ -0,0 +1,223 @@
+"""
+Cache de resultados de consultas para DatabaseConnection.
+
+LRU con límite de entradas y de tamaño (estimado) y TTL por entrada. Cada
+entrada recuerda las tablas que lee; cuando CSVLoader escribe en una tabla se
+invalidan solo las entradas que dependen de ella. Las vistas stage.* se
+resuelven a sus tablas raw con VIEW_SOURCES; una vista desconocida depende de
+todo ('*') y se invalida con cualquier escritura.
+
+Hay un cache por base de datos (DSN) en el proceso, igual que los engines. Las
+cargas hechas desde otro proceso no lo invalidan: para eso está el TTL.
+"""
+
+from __future__ import annotations
+
+import re
+import sys
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, FrozenSet, Hashable, Iterable, Iterator, Optional, Tuple
+
+ANY_TABLE = "*"
+
+# Vistas -> tablas que leen (sql/1.crear_tablas.sql)
+VIEW_SOURCES: Dict[str, Tuple[str, ...]] = {
+    "stage.vista_productividad_trabajador": ("raw.actividades",),
+    "stage.vista_costo_insumos_por_hectarea": ("raw.insumos",),
+    "stage.vista_produccion_maquinaria": ("raw.rep_maquinaria",),
+    "stage.vista_combustible_por_unidad_producida": ("raw.fact_combustible_produccion",),
+}
+VIEW_SCHEMAS = ("stage", "analytics")
+
+CACHE_DEFAULTS = {
+    "enabled": False,
+    "max_entries": 256,
+    "max_mb": 64,
+    "ttl_seconds": 300,
+}
+
+_NAME = r'((?:"?\w+"?\s*\.\s*)?"?\w+"?)'
+_RELATION = re.compile(r"\b(?:from|join)\s+" + _NAME, re.IGNORECASE)
+# ', otra' tras una relación (con alias opcional): FROM a x, b y
+_NEXT_RELATION = re.compile(r'\s*(?:(?:as\s+)?"?\w+"?\s*)?,\s*' + _NAME, re.IGNORECASE)
+
+
+def _relations(sql: str) -> Iterator[str]:
+    for match in _RELATION.finditer(sql):
+        yield match.group(1)
+        pos = match.end()
+        while True:
+            more = _NEXT_RELATION.match(sql, pos)
+            if more is None:
+                break
+            yield more.group(1)
+            pos = more.end()
+
+
+def tables_in(sql: str) -> FrozenSet[str]:
+    """Relaciones que aparecen después de FROM/JOIN (y en la lista 'FROM a, b'), en minúsculas y sin comillas."""
+    found = set()
+    for relation in _relations(sql):
+        name = re.sub(r'["\s]', "", relation).lower()
+        schema = name.split(".")[0] if "." in name else ""
+        if name in VIEW_SOURCES:
+            found.update(VIEW_SOURCES[name])
+        elif schema in VIEW_SCHEMAS:
+            found.add(ANY_TABLE)
+        else:
+            found.add(name)
+    return frozenset(found)
+
+
+def _depends_on(tables: FrozenSet[str], written: str) -> bool:
+    """written es 'schema.tabla'; una dependencia sin esquema coincide por nombre."""
+    bare = written.split(".")[-1]
+    return ANY_TABLE in tables or written in tables or bare in tables
+
+
+def estimate_bytes(value: Any) -> int:
+    """Tamaño aproximado: nbytes (Arrow/pandas) o muestreo de filas para listas de Row."""
+    nbytes = getattr(value, "nbytes", None)
+    if isinstance(nbytes, int):
+        return nbytes
+    if isinstance(value, (list, tuple)):
+        if not value:
+            return sys.getsizeof(value)
+        sample = value[:100]
+        per_row = sum(sys.getsizeof(row) + sum(sys.getsizeof(v) for v in row) for row in sample) / len(sample)
+        return int(sys.getsizeof(value) + per_row * len(value))
+    return sys.getsizeof(value)
+
+
+@dataclass
+class _Entry:
+    value: Any
+    size: int
+    expires: float
+    tables: FrozenSet[str]
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    invalidations: int = 0
+    bytes: int = 0
+    entries: int = 0
+
+
+class QueryCache:
+    """
+    LRU de resultados con TTL. get/put/invalidate son seguros entre hilos
+    (el dashboard consulta en paralelo con views/fetch.py).
+    """
+
+    def __init__(self, max_entries: int = 256, max_bytes: int = 64 << 20, ttl: float = 300.0, clock=time.monotonic):
+        self.max_entries = int(max_entries)
+        self.max_bytes = int(max_bytes)
+        self.ttl = float(ttl)
+        self._clock = clock
+        self._entries: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = CacheStats()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.stats.misses += 1
+                return default
+            if entry.expires <= self._clock():
+                self._drop(key)
+                self.stats.expirations += 1
+                self.stats.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.stats.hits += 1
+            return entry.value
+
+    def put(self, key: Hashable, value: Any, tables: Iterable[str] = (ANY_TABLE,), ttl: Optional[float] = None) -> bool:
+        """Guarda un resultado; False si por sí solo supera max_bytes (no se cachea)."""
+        size = estimate_bytes(value)
+        if size > self.max_bytes or self.max_entries <= 0:
+            return False
+        expires = self._clock() + (self.ttl if ttl is None else float(ttl))
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = _Entry(value, size, expires, frozenset(tables))
+            self.stats.bytes += size
+            while len(self._entries) > self.max_entries or self.stats.bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._drop(oldest)
+                self.stats.evictions += 1
+            self.stats.entries = len(self._entries)
+        return True
+
+    def invalidate(self, table: str) -> int:
+        """Borra las entradas que leen 'schema.tabla'. Devuelve cuántas."""
+        written = table.lower()
+        with self._lock:
+            stale = [k for k, e in self._entries.items() if _depends_on(e.tables, written)]
+            for key in stale:
+                self._drop(key)
+            self.stats.invalidations += len(stale)
+            self.stats.entries = len(self._entries)
+        return len(stale)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.stats.bytes = self.stats.entries = 0
+
+    def _drop(self, key: Hashable) -> None:
+        entry = self._entries.pop(key)
+        self.stats.bytes -= entry.size
+        self.stats.entries = len(self._entries)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# Un cache por DSN, como los engines de conexiondb
+_CACHES: Dict[str, QueryCache] = {}
+_CACHES_LOCK = threading.Lock()
+
+
+def cache_settings(cfg: Dict) -> Dict[str, Any]:
+    """CACHE_DEFAULTS combinado con database.cache de settings.yaml."""
+    opts = dict(CACHE_DEFAULTS)
+    opts.update((cfg.get("database", {}) or {}).get("cache", {}) or {})
+    return opts
+
+
+def get_cache(dsn: str, **opts: Any) -> QueryCache:
+    """Cache compartido de una base (lo crea la primera vez con opts)."""
+    cache = _CACHES.get(dsn)
+    if cache is not None:
+        return cache
+    with _CACHES_LOCK:
+        cache = _CACHES.get(dsn)
+        if cache is None:
+            o = {**CACHE_DEFAULTS, **opts}
+            cache = QueryCache(o["max_entries"], int(float(o["max_mb"]) * (1 << 20)), o["ttl_seconds"])
+            _CACHES[dsn] = cache
+    return cache
+
+
+def invalidate_table(dsn: str, table: str) -> int:
+    """Invalida 'schema.tabla' en el cache de esa base, si existe."""
+    cache = _CACHES.get(dsn)
+    return cache.invalidate(table) if cache is not None else 0
+
+
+def clear_caches() -> None:
+    with _CACHES_LOCK:
+        for cache in _CACHES.values():
+            cache.clear()
+        _CACHES.clear()
@@ -0,0 +1,256 @@
+"""Orquestación de las corridas completas: pipelines -> processed y processed -> PostgreSQL."""
+
+from __future__ import annotations
+
+import importlib
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+# Registro de pipelines por dataset ("modulo:Clase"); se importan solo al usarse
+PIPELINES: Dict[str, str] = {
+    "abastecimientos": "etl_project.pipelines.abastecimientos:AbastecimientosPipeline",
+    "actividades": "etl_project.pipelines.actividades:ActividadesPipeline",
+    "insumos": "etl_project.pipelines.insumos:InsumosPipeline",
+    "rep_maquinaria": "etl_project.pipelines.rep_maquinaria:RepMaquinariaPipeline",
+}
+
+
+def get_pipeline(dataset: str):
+    """Devuelve la clase *Pipeline registrada para un dataset."""
+    if dataset not in PIPELINES:
+        raise KeyError(f"Dataset sin pipeline registrado: {dataset}")
+    module_name, cls_name = PIPELINES[dataset].split(":")
+    return getattr(importlib.import_module(module_name), cls_name)
+
+
+def processed_dir(cfg: Dict) -> Path:
+    """Carpeta de salidas procesadas según paths.base + paths.data_processed."""
+    return Path(cfg["paths"]["base"]) / cfg["paths"]["data_processed"]
+
+
+def write_outputs(df, dataset: str, cfg: Dict, formats: Sequence[str]) -> List[Path]:
+    """
+    Escribe en processed/ en cada formato pedido ('csv', 'parquet').
+    df puede ser un DataFrame o un SpillBuffer (modo con presupuesto de memoria).
+    """
+    from etl_project.memory import SpillBuffer
+    from etl_project.profiling import stage
+    from etl_project.writers import write_processed, write_processed_chunks
+
+    out_dir = processed_dir(cfg)
+    spilled = isinstance(df, SpillBuffer)
+    written: List[Path] = []
+    for fmt in formats:
+        with stage(f"write_{fmt}", None if spilled else df, dataset=dataset) as st:
+            if fmt == "parquet":
+                if spilled:
+                    written.append(write_processed_chunks(df.iter_frames(), dataset, cfg))
+                else:
+                    written.append(write_processed(df, dataset, cfg))
+            elif fmt == "csv":
+                out_path = out_dir / f"{dataset}.csv"
+                if spilled:
+                    df.write_csv(out_path, encoding="utf-8", date_format="%d/%m/%Y")
+                else:
+                    df.to_csv(out_path, index=False, encoding="utf-8", date_format="%d/%m/%Y")
+                written.append(out_path)
+            else:
+                raise ValueError(f"Formato de salida no soportado: {fmt}")
+            if st:
+                if spilled:
+                    st.rows_out = df.rows
+                else:
+                    st.observe(df)
+    return written
+
+
+def deletes_path(cfg: Dict, dataset: str) -> Path:
+    """Tombstones pendientes de aplicar en la carga: processed/<ds>.deletes.csv"""
+    return processed_dir(cfg) / f"{dataset}.deletes.csv"
+
+
+def write_delta_outputs(df, changes, dataset: str, cfg: Dict, formats: Sequence[str]) -> List[Path]:
+    """
+    Salidas en modo delta: CSV con filas nuevas/cambiadas, tombstones en
+    <ds>.deletes.csv y el estado del índice de huellas como pendiente
+    (load_processed lo confirma después de cargar).
+    """
+    from etl_project.fingerprint import delete_columns_for, index_for
+
+    written = write_outputs(changes.upserts, dataset, cfg, [f for f in formats if f == "csv"])
+    written += write_outputs(df, dataset, cfg, [f for f in formats if f != "csv"])
+    if "csv" in formats:
+        deletes = deletes_path(cfg, dataset)
+        changes.deletes[delete_columns_for(changes)].to_csv(
+            deletes, index=False, encoding="utf-8", date_format="%d/%m/%Y"
+        )
+        written.append(deletes)
+    index_for(dataset, cfg).save(changes, pending=True)
+    return written
+
+
+def write_fact_outputs(inputs: Dict, cfg: Dict, tag: str = "run_all") -> List[Path]:
+    """
+    Actualiza el hecho equipo x día (facts.py) con las salidas de abastecimientos
+    y/o rep_maquinaria de esta corrida. El estado queda pendiente hasta que
+    load_processed carga el hecho.
+    """
+    from etl_project.facts import FuelProductionFact
+    from etl_project.profiling import stage
+
+    fact = FuelProductionFact(cfg)
+    with stage("fact", dataset="fact_combustible_produccion") as st:
+        rows, days = fact.update(**inputs)
+        written = fact.write_outputs(rows, days)
+        if st:
+            st.observe(rows)
+    print(f"[{tag}] fact_combustible_produccion: {len(rows)} filas en {len(days)} días recalculados")
+    return [written["csv"], written["deletes"], written["parquet"]]
+
+
+def run_pipelines(
+    cfg: Dict,
+    datasets: Optional[Sequence[str]] = None,
+    *,
+    formats: Optional[Sequence[str]] = None,
+    delta: Optional[bool] = None,
+    tag: str = "run_all",
+) -> Dict[str, List[Path]]:
+    """
+    Ejecuta Extract -> transform de cada dataset y escribe la salida en processed/.
+    formats: 'csv' (lo que consume la carga a PostgreSQL) y/o 'parquet'
+    (dataset particionado); por defecto output.formats de settings.yaml.
+    delta: si es True (por defecto run.delta), en los datasets con sección `delta`
+    el CSV solo lleva filas nuevas/cambiadas y los tombstones van a <ds>.deletes.csv;
+    el Parquet sigue siendo la foto completa.
+    """
+    import pandas as pd
+
+    from etl_project.facts import FACT_SOURCES, FACT_TABLE, facts_enabled
+    from etl_project.fingerprint import index_for
+    from etl_project.loaders import ExcelLoader
+    from etl_project.memory import SpillBuffer, run_options
+    from etl_project.profiling import RunProfiler
+
+    out_dir = processed_dir(cfg)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    loader = ExcelLoader(cfg["paths"]["base"])
+    formats = list(formats or (cfg.get("output", {}) or {}).get("formats", ["csv"]))
+    use_delta = run_options(cfg)["delta"] if delta is None else delta
+    outputs: Dict[str, List[Path]] = {}
+    # Salidas (solo columnas necesarias) para el hecho combustible vs. producción
+    fact_inputs: Dict[str, pd.DataFrame] = {}
+    with_facts = facts_enabled(cfg)
+
+    profiler = RunProfiler(name=tag)
+    with profiler:
+        for ds_name in datasets or list(PIPELINES):
+            print(f"[{tag}] Ejecutando {ds_name}...")
+            pipeline = get_pipeline(ds_name)(loader, cfg)
+            deletes_path(cfg, ds_name).unlink(missing_ok=True)  # tombstones de una corrida anterior
+            if pipeline.exceeds_memory_limit():
+                # Working set estimado > run.memory_limit: archivo por archivo con spill a disco
+                print(f"[{tag}] {ds_name}: supera memory_limit, procesando por partes")
+                if use_delta and index_for(ds_name, cfg) is not None:
+                    # La salida completa se agregaría sobre lo ya cargado y duplicaría cada fila
+                    raise ValueError(
+                        f"{ds_name}: el modo delta no está disponible por partes (supera run.memory_limit); "
+                        "suba memory_limit o corra sin --delta con la carga en modo replace"
+                    )
+                with SpillBuffer(prefix=f"etl_{ds_name}_", dir=run_options(cfg)["spill_dir"]) as spill:
+                    pipeline.run_spilled(spill)
+                    outputs[ds_name] = write_outputs(spill, ds_name, cfg, formats)
+                    if with_facts and ds_name in FACT_SOURCES:
+                        cols = FACT_SOURCES[ds_name]
+                        fact_inputs[ds_name] = pd.concat([f[cols] for f in spill.iter_frames()], ignore_index=True)
+            else:
+                df = pipeline.run()
+                changes = pipeline.fingerprint(df) if use_delta else None
+                if changes is None:
+                    outputs[ds_name] = write_outputs(df, ds_name, cfg, formats)
+                else:
+                    print(f"[{tag}] {ds_name}: delta {changes.stats}")
+                    outputs[ds_name] = write_delta_outputs(df, changes, ds_name, cfg, formats)
+                if with_facts and ds_name in FACT_SOURCES:
+                    fact_inputs[ds_name] = df[FACT_SOURCES[ds_name]]
+            print(f"[{tag}] OK -> {', '.join(p.name for p in outputs[ds_name])} ")
+
+        if fact_inputs:
+            outputs[FACT_TABLE] = write_fact_outputs(fact_inputs, cfg, tag)
+
+    for kind, path in profiler.export(cfg).items():
+        print(f"[{tag}] Métricas ({kind}) -> {path}")
+    return outputs
+
+
+def load_processed(
+    cfg: Dict,
+    tables: Optional[Sequence[str]] = None,
+    *,
+    schema: str = "raw",
+    if_exists: str = "append",
+    tag: str = "loadData",
+) -> List[str]:
+    """
+    Carga processed/<tabla>.csv a <schema>.<tabla> en PostgreSQL.
+    Si existe processed/<tabla>.deletes.csv (modo delta) primero borra esas filas
+    y, tras cargar, confirma el índice de huellas pendiente. Al final registra la
+    generación de carga en raw.etl_load_log.
+    Si run_pipelines escribió el hecho fact_combustible_produccion también lo
+    carga, aunque 'tables' sea una lista explícita: la vista de combustible lee
+    solo esa tabla. Su CSV trae los días cambiados desde la última carga
+    confirmada y sus deletes no se descartan (recargar es idempotente); con
+    if_exists='replace' se recarga completo. Después confirma su estado pendiente.
+    """
+    from etl_project.CSVLoader import CSVLoader
+    from etl_project.facts import FACT_TABLE, FuelProductionFact, as_rows
+    from etl_project.fingerprint import index_for
+    from etl_project.load_log import record_load
+    from etl_project.profiling import RunProfiler
+
+    out_dir = processed_dir(cfg)
+    loaded: List[str] = []
+    tables = [t for t in (cfg.get("datasets", {}) if tables is None else tables) if t != FACT_TABLE]
+    if (out_dir / f"{FACT_TABLE}.csv").exists():
+        tables.append(FACT_TABLE)
+    profiler = RunProfiler(name=tag)
+    with profiler:
+        for table in tables:
+            print(f"[{tag}] Cargando {table}...")
+            loader = CSVLoader(table_name=table, schema=schema)
+            deletes = deletes_path(cfg, table)
+            if table == FACT_TABLE:
+                fact = FuelProductionFact(cfg)
+                if if_exists == "replace":
+                    # El CSV del hecho solo trae los días recalculados: se recarga completo
+                    loader.clear()
+                    loader.load_frame(as_rows(fact.full()))
+                else:
+                    if deletes.exists():
+                        loader.delete_rows(deletes)
+                    loader.load_csv(out_dir / f"{table}.csv")
+                if fact.promote():
+                    print(f"[{tag}] Estado del hecho confirmado -> {fact.state_dir}")
+                loaded.append(table)
+                print(f"[{tag}] OK -> {table}")
+                continue
+            if deletes.exists():
+                if if_exists == "replace":
+                    raise ValueError(f"{table}.csv es un delta ({deletes.name}); cárguelo con if_exists='append'")
+                loader.delete_rows(deletes)
+            loader.load_csv(out_dir / f"{table}.csv", if_exists=if_exists)
+            deletes.unlink(missing_ok=True)
+            index = index_for(table, cfg) if table in PIPELINES else None
+            if index is not None and index.promote():
+                print(f"[{tag}] Índice de huellas actualizado -> {index.path}")
+            loaded.append(table)
+            print(f"[{tag}] OK -> {table}")
+
+        if loaded:
+            # Nueva generación: el dashboard la detecta y recalienta sus caches
+            generation = record_load(loader.db.get_engine(), profiler.run_id, loaded)
+            print(f"[{tag}] Generación de carga {generation} (run {profiler.run_id})")
+
+    for kind, path in profiler.export(cfg).items():
+        print(f"[{tag}] Métricas ({kind}) -> {path}")
+    return loaded
@@ -0,0 +1,195 @@
+"""
+Modo streaming: Extract -> transform y carga a PostgreSQL solapados.
+
+Un hilo productor recorre los datasets archivo por archivo, en bloques de
+streaming.chunk_rows filas (bloques chicos = más solapamiento), y deja cada
+bloque transformado en una cola acotada; uno o más hilos consumidores lo
+cargan mientras el productor ya parsea el siguiente. Con la cola llena el
+productor espera (backpressure): en memoria hay a lo sumo
+queue_size + productor + consumidores bloques a la vez.
+
+El parseo de Excel es CPU y la carga es I/O de red (psycopg2 libera el GIL),
+así que el tiempo total tiende al de la etapa más lenta.
+"""
+
+from __future__ import annotations
+
+import contextvars
+import queue
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Sequence
+
+import pandas as pd
+
+from etl_project.profiling import RunProfiler, stage
+
+_END = object()
+
+
+class _Aborted(Exception):
+    """El otro lado del pipeline falló; se deja de producir/consumir."""
+
+
+def _put(q: "queue.Queue", item, stop: threading.Event, timeout: float = 0.5) -> None:
+    """put bloqueante que se interrumpe si el pipeline se aborta."""
+    while True:
+        if stop.is_set():
+            raise _Aborted()
+        try:
+            q.put(item, timeout=timeout)
+            return
+        except queue.Full:
+            continue
+
+
+def stream_pipelines(
+    cfg: Dict,
+    datasets: Optional[Sequence[str]] = None,
+    *,
+    schema: str = "raw",
+    if_exists: str = "append",
+    queue_size: Optional[int] = None,
+    load_workers: Optional[int] = None,
+    loader_factory: Optional[Callable[[str], object]] = None,
+    tag: str = "stream",
+) -> Dict[str, int]:
+    """
+    Ejecuta los pipelines y carga cada bloque transformado apenas está listo.
+    Devuelve filas cargadas por dataset. Los archivos de data/processed no se
+    escriben en este modo (para eso está `etl run`), salvo los del hecho
+    fact_combustible_produccion: con facts.combustible_produccion activo cada
+    bloque se pliega a los agregados diarios de su lado (equipo x día, con los
+    tipos fijados de la carga) y se suelta; si todo cargó bien, el hecho se
+    actualiza y carga al final.
+
+    loader_factory(dataset) crea el loader con load_frame()/clear() (y
+    delete_rows()/load_csv() para el hecho); por defecto CSVLoader contra la
+    base de settings.yaml.
+
+    Cada bloque se confirma por separado: con if_exists="replace" las tablas se
+    vacían antes del primer bloque, así que si la corrida falla a mitad quedan
+    vacías o cargadas a medias (no se restaura el contenido anterior) y hay que
+    repetirla. Con "append" lo ya cargado queda y repetirla lo duplica.
+    """
+    from etl_project.CSVLoader import CSVLoader, DtypePin, _as_loaded
+    from etl_project.facts import FACT_SOURCES, FACT_TABLE, daily_side, facts_enabled, fold_daily, load_fact_update
+    from etl_project.loaders import ExcelLoader
+    from etl_project.load_log import record_load
+    from etl_project.runner import PIPELINES, get_pipeline
+
+    opts = {"queue_size": 2, "load_workers": 1, "chunk_rows": 50_000, **((cfg.get("streaming", {}) or {}))}
+    chunk_rows = int(opts["chunk_rows"]) if opts["chunk_rows"] else None
+    queue_size = int(queue_size or opts["queue_size"])
+    load_workers = int(load_workers or opts["load_workers"])
+    names = list(datasets or PIPELINES)
+    factory = loader_factory or (lambda ds: CSVLoader(table_name=ds, schema=schema))
+    loaders = {ds: factory(ds) for ds in names}
+
+    if if_exists == "replace":
+        # Antes de cargar cualquier bloque: con varios consumidores no hay "primer bloque"
+        for ds in names:
+            loaders[ds].clear()
+
+    chunks: "queue.Queue" = queue.Queue(maxsize=queue_size)
+    stop = threading.Event()
+    errors: List[BaseException] = []
+    rows: Dict[str, int] = {ds: 0 for ds in names}
+    busy = {"extract_transform": 0.0, "load": 0.0}
+    rows_lock = threading.Lock()
+    with_facts = facts_enabled(cfg)
+    fact_daily: Dict[str, pd.DataFrame] = {}
+    # Mismos tipos que la carga: la clave equipo queda igual en el hecho y en raw
+    pins = {ds: getattr(loaders[ds], "pin", None) or DtypePin() for ds in names}
+
+    def produce() -> None:
+        excel = ExcelLoader(cfg["paths"]["base"])
+        try:
+            for ds in names:
+                print(f"[{tag}] Ejecutando {ds}...")
+                pipeline = get_pipeline(ds)(excel, cfg)
+                parts = iter(pipeline.iter_transformed(chunk_rows))
+                while True:
+                    t0 = time.perf_counter()
+                    with stage("extract_transform", dataset=ds) as st:
+                        part = next(parts, None)
+                        if st and part is not None:
+                            st.observe(part)
+                    busy["extract_transform"] += time.perf_counter() - t0
+                    if part is None:
+                        break
+                    if with_facts and ds in FACT_SOURCES:
+                        daily = daily_side(ds, _as_loaded(part[FACT_SOURCES[ds]], pins[ds]), loaded=True)
+                        fact_daily[ds] = fold_daily(ds, [fact_daily[ds], daily]) if ds in fact_daily else daily
+                    _put(chunks, (ds, part), stop)
+        except _Aborted:
+            pass
+        except BaseException as exc:
+            errors.append(exc)
+            stop.set()
+        finally:
+            for _ in range(load_workers):
+                try:
+                    _put(chunks, _END, stop)
+                except _Aborted:
+                    break
+
+    def consume() -> None:
+        while not stop.is_set():
+            try:
+                item = chunks.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            if item is _END:
+                return
+            ds, part = item
+            try:
+                t0 = time.perf_counter()
+                with stage("load", part, dataset=ds):
+                    loaders[ds].load_frame(part)
+                elapsed = time.perf_counter() - t0
+                with rows_lock:
+                    rows[ds] += len(part)
+                    busy["load"] += elapsed
+            except BaseException as exc:
+                errors.append(exc)
+                stop.set()
+                return
+
+    profiler = RunProfiler(name=tag)
+    started = time.perf_counter()
+    with profiler:
+        # Cada hilo corre en una copia del contexto para ver el profiler activo
+        threads = [threading.Thread(target=contextvars.copy_context().run, args=(produce,), name="etl-produce")]
+        threads += [
+            threading.Thread(target=contextvars.copy_context().run, args=(consume,), name=f"etl-load-{i}")
+            for i in range(load_workers)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        fact_days = None
+        if not errors and fact_daily:
+            with stage("fact", dataset=FACT_TABLE):
+                fact_rows, fact_days = load_fact_update(cfg, factory(FACT_TABLE), daily=True, **fact_daily)
+    if errors:
+        raise errors[0]
+
+    wall = time.perf_counter() - started
+    loaded = [ds for ds in names if rows[ds]]
+    for ds in names:
+        print(f"[{tag}] OK -> {schema}.{ds}: {rows[ds]} filas")
+    if fact_days is not None:
+        loaded.append(FACT_TABLE)
+        print(f"[{tag}] OK -> {schema}.{FACT_TABLE}: {fact_rows} filas en {fact_days} días recalculados")
+    print(
+        f"[{tag}] {wall:.1f}s total | extract+transform {busy['extract_transform']:.1f}s"
+        f" | carga {busy['load']:.1f}s (suma secuencial {sum(busy.values()):.1f}s)"
+    )
+    if loaded and loader_factory is None:
+        generation = record_load(loaders[loaded[0]].db.get_engine(), profiler.run_id, loaded)
+        print(f"[{tag}] Generación de carga {generation} (run {profiler.run_id})")
+    for kind, path in profiler.export(cfg).items():
+        print(f"[{tag}] Métricas ({kind}) -> {path}")
+    return rows
@@ -1,7 +1,10 @@
 from __future__ import annotations
-from typing import Optional, Sequence
+from typing import Dict, Optional, Sequence
 import pandas as pd
 
+from .profiling import profiled
+
+@profiled()
 def clean_column_names(df: pd.DataFrame) -> pd.DataFrame:
     """
     Limpia nombres de columnas: quita espacios extremos, pasa a minúsculas,
@@ -18,12 +21,14 @@ def clean_column_names(df: pd.DataFrame) -> pd.DataFrame:
     )
     return out
 
+@profiled()
 def drop_columns(df: pd.DataFrame, columns_to_delete: Sequence[str]) -> pd.DataFrame:
     """
     Elimina columnas si existen; ignora las que no están presentes.
     """
     return df.drop(columns=list(columns_to_delete), errors="ignore")
 
+@profiled()
 def filter_value(df: pd.DataFrame, column_name: str, value, cmp: str = "equals",) -> pd.DataFrame:
     """
     Filtra filas según una comparación sobre una columna.
@@ -55,6 +60,7 @@ def filter_value(df: pd.DataFrame, column_name: str, value, cmp: str = "equals",
         )
     return df[mask]
 
+@profiled()
 def delete_first_n(df: pd.DataFrame, column_name: str, n: int) -> pd.DataFrame:
     """
     Elimina los primeros n caracteres de una columna, convirtiéndola a str si es necesario.
@@ -65,6 +71,7 @@ def delete_first_n(df: pd.DataFrame, column_name: str, n: int) -> pd.DataFrame:
     out[column_name] = out[column_name].astype(str).str.slice(start=n)
     return out
 
+@profiled()
 def concat_columns(
     df: pd.DataFrame,
     new_column: str,
@@ -92,6 +99,7 @@ def concat_columns(
         out.insert(position, new_column, s)  # inserta en posición específica
     return out
 
+@profiled()
 def adjust_date_format(
     df: pd.DataFrame,
     column_name: str,
@@ -109,6 +117,7 @@ def adjust_date_format(
     out[column_name] = out[column_name].dt.strftime(desired_format)
     return out
 
+@profiled()
 def concat_column_with_first_n(
     df: pd.DataFrame,
     new_column: str,
@@ -132,6 +141,13 @@ def concat_column_with_first_n(
 
     return out
 
+@profiled()
+def rename_columns(df: pd.DataFrame, mapping: Dict[str, str]) -> pd.DataFrame:
+    """
+    Renombra columnas según el mapeo {actual: nuevo}; ignora las que no existen.
+    """
+    return df.rename(columns=mapping)
+
 # Aliases para las anteriores funciones con nombres más descriptivos
 def delete_columns(df: pd.DataFrame, columns_to_delete: Sequence[str]) -> pd.DataFrame:
     return drop_columns(df, columns_to_delete)
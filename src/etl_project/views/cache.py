@@ -0,0 +1,70 @@
+"""
+Invalidación de caches del dashboard por generación de carga.
+
+Un hilo por proceso consulta cada `interval` segundos la generación actual
+(raw.etl_load_log). Cuando cambia, primero calienta las consultas de la nueva
+generación y recién después la publica: los reruns leen `current()` sin tocar
+la base y nunca esperan una consulta en frío.
+"""
+
+from __future__ import annotations
+
+import threading
+from typing import Callable, Optional
+
+
+class GenerationWatcher:
+    def __init__(
+        self,
+        fetch_generation: Callable[[], int],
+        warm: Callable[[int], None],
+        interval: float = 15.0,
+    ):
+        self.fetch_generation = fetch_generation
+        self.warm = warm
+        self.interval = interval
+        self._current: Optional[int] = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.last_error: Optional[BaseException] = None
+
+    def current(self) -> int:
+        """
+        Generación publicada. La primera vez (arranque del proceso) la
+        resuelve y calienta en línea; después es solo una lectura en memoria.
+        """
+        if self._current is None:
+            self.refresh()
+        return self._current if self._current is not None else 0
+
+    def refresh(self) -> bool:
+        """Consulta la generación y, si cambió, calienta y publica. True si cambió."""
+        with self._lock:
+            try:
+                generation = self.fetch_generation()
+                if generation == self._current:
+                    return False
+                self.warm(generation)
+            except Exception as exc:  # la base puede no estar disponible; se reintenta
+                self.last_error = exc
+                return False
+            self._current = generation
+            self.last_error = None
+            return True
+
+    def _loop(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.refresh()
+
+    def start(self) -> "GenerationWatcher":
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._loop, name="etl-generation-watcher", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval)
+            self._thread = None
@@ -0,0 +1,115 @@
+"""
+Reducción de puntos para las series de tiempo del dashboard.
+
+Antes de enviar una figura al navegador: se agrupa por día/semana/mes según
+el rango visible (re-agregando numerador y denominador, no promediando
+cocientes) y luego cada serie se reduce con LTTB (Largest-Triangle-Three-Buckets)
+a un máximo de puntos, conservando la forma visual de la curva.
+"""
+
+from __future__ import annotations
+
+from typing import Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from etl_project.analytics import sql_round
+
+# Frecuencia de pandas (Period) por nombre de agrupación; semanas de lunes a domingo
+BUCKETS = {"day": "D", "week": "W", "month": "M"}
+
+
+def choose_bucket(start, end, max_points: int = 500) -> str:
+    """La agrupación más fina que deja el rango [start, end] en <= max_points buckets."""
+    days = max((pd.Timestamp(end) - pd.Timestamp(start)).days + 1, 1)
+    if days <= max_points:
+        return "day"
+    if days / 7 <= max_points:
+        return "week"
+    return "month"
+
+
+def bucket_ratio(
+    df: pd.DataFrame,
+    date_col: str,
+    by: Sequence[str],
+    numerator: str,
+    denominator: str,
+    ratio: str,
+    bucket: str = "auto",
+    max_points: int = 500,
+) -> pd.DataFrame:
+    """
+    Agrupa por (by, bucket de date_col) sumando numerador y denominador y
+    recalcula ratio = ROUND(num / den, 2) (0 si den <= 0), como en las vistas.
+    date_col queda como el inicio del bucket.
+    """
+    if df.empty:
+        return df
+    fechas = pd.to_datetime(df[date_col])
+    if bucket == "auto":
+        bucket = choose_bucket(fechas.min(), fechas.max(), max_points)
+    periods = fechas.dt.to_period(BUCKETS[bucket]).dt.start_time
+    out = (
+        df.assign(**{date_col: periods})
+        .groupby([*by, date_col], sort=True, dropna=False)[[numerator, denominator]]
+        .sum(min_count=1)
+        .reset_index()
+    )
+    den = out[denominator].fillna(0)
+    out[ratio] = np.where(den > 0, sql_round(out[numerator] / den.where(den > 0)), 0.0)
+    out.attrs["bucket"] = bucket
+    return out
+
+
+def lttb(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """
+    Índices de los puntos elegidos por LTTB (x creciente). Siempre conserva el
+    primero y el último; devuelve todos si la serie ya tiene <= threshold puntos.
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype="float64")
+    y = np.asarray(y, dtype="float64")
+    # Límites de los threshold-2 buckets interiores
+    edges = np.linspace(1, n - 1, threshold - 1).astype(int)
+    selected = np.empty(threshold, dtype=int)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(threshold - 2):
+        start, stop = edges[i], edges[i + 1]
+        # Promedio del bucket siguiente (o el último punto)
+        nstart, nstop = stop, edges[i + 2] if i + 2 < len(edges) else n
+        avg_x, avg_y = x[nstart:nstop].mean(), y[nstart:nstop].mean()
+        cand_x, cand_y = x[start:stop], y[start:stop]
+        area = np.abs((x[a] - avg_x) * (cand_y - y[a]) - (x[a] - cand_x) * (avg_y - y[a]))
+        a = start + int(np.nanargmax(area)) if np.isfinite(area).any() else start
+        selected[i + 1] = a
+    return selected
+
+
+def downsample(
+    df: pd.DataFrame,
+    x: str,
+    y: str,
+    by: Optional[Sequence[str]] = None,
+    max_points: int = 500,
+) -> pd.DataFrame:
+    """Aplica LTTB a cada serie (grupo de 'by') para dejar a lo sumo max_points por serie."""
+    if df.empty:
+        return df
+
+    def _one(part: pd.DataFrame) -> pd.DataFrame:
+        part = part.sort_values(x, kind="stable")
+        if len(part) <= max_points:
+            return part
+        xs = pd.to_datetime(part[x]).astype("int64").to_numpy() if not pd.api.types.is_numeric_dtype(part[x]) \
+            else part[x].to_numpy()
+        return part.iloc[lttb(xs, part[y].fillna(0).to_numpy(), max_points)]
+
+    if not by:
+        return _one(df).reset_index(drop=True)
+    parts = [_one(part) for _, part in df.groupby(list(by), sort=False, dropna=False)]
+    return pd.concat(parts, ignore_index=True)
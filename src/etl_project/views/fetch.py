@@ -0,0 +1,36 @@
+"""Ejecución concurrente de las consultas del dashboard con tiempos por consulta."""
+
+from __future__ import annotations
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Tuple
+
+
+def _timed(fn: Callable[[], Any]) -> Tuple[Any, float]:
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def fetch_all(
+    tasks: Dict[str, Callable[[], Any]],
+    *,
+    max_workers: Optional[int] = None,
+    initializer: Optional[Callable[[], None]] = None,
+) -> Tuple[Dict[str, Any], Dict[str, float]]:
+    """
+    Ejecuta cada tarea (nombre -> función sin argumentos) en un hilo y devuelve
+    (resultados, segundos por tarea). Las consultas son independientes y cada
+    hilo toma su propia conexión del pool, así el tiempo total es el de la más lenta.
+    max_workers no debería superar pool size + max_overflow del engine.
+    initializer corre al iniciar cada hilo (p. ej. para adjuntar el contexto de Streamlit).
+    """
+    workers = max(1, min(len(tasks), max_workers or len(tasks)))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="etl-fetch", initializer=initializer) as pool:
+        futures = {name: pool.submit(_timed, fn) for name, fn in tasks.items()}
+        results: Dict[str, Any] = {}
+        timings: Dict[str, float] = {}
+        for name, future in futures.items():
+            results[name], timings[name] = future.result()
+    return results, timings
@@ -1,64 +1,142 @@
 # app.py
 import os
+import threading
+import time
 import pandas as pd
 import streamlit as st
 import plotly.express as px
-from sqlalchemy import create_engine
-from etl_project.config import Config
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+from etl_project.analytics import LocalAnalytics
+from etl_project.config import load_settings
 from etl_project.conexiondb import DatabaseConnection
+from etl_project.load_log import current_generation
+from etl_project.views import queries
+from etl_project.views.cache import GenerationWatcher
+from etl_project.views.downsample import bucket_ratio, downsample
+from etl_project.views.fetch import fetch_all
 
 st.set_page_config(page_title="Dashboard Caña", layout="wide")
 
-config = Config("config/settings.yaml")
-
-# Conexión (usar variables de entorno o reemplazar por credenciales)
-PGUSER = config.DB_USER,
-PGPASSWORD = config.DB_PASSWORD,
-PGHOST = config.DB_HOST,
-PGPORT = config.DB_PORT,
-PGDATABASE = config.DB_NAME,
-
+# Conexión: Config cacheado y engine compartido por proceso, así cada rerun
+# de Streamlit y cada sesión reutilizan el mismo pool en lugar de crear otro.
 db = DatabaseConnection()
 engine = db.get_engine()
 
-#engine = create_engine(f"postgresql+psycopg2://{PGUSER}:{PGPASSWORD}@{PGHOST}:{PGPORT}/{PGDATABASE}")
-
-# Cargar vistas
-@st.cache_data(show_spinner=False)
-def load_data():
-    df_prod_trab = pd.read_sql("select * from stage.vista_productividad_trabajador", con=engine)
-    df_costo_ha  = pd.read_sql("select * from stage.vista_costo_insumos_por_hectarea", con=engine)
-    df_prod_maq  = pd.read_sql("select * from stage.vista_produccion_maquinaria", con=engine)
-    df_comb_unit = pd.read_sql("select * from stage.vista_combustible_por_unidad_producida", con=engine)
-    return df_prod_trab, df_costo_ha, df_prod_maq, df_comb_unit
-
-df_prod_trab, df_costo_ha, df_prod_maq, df_comb_unit = load_data()
+# Backend: 'postgres' (vistas stage.*) o 'local' (analytics.py sobre data/processed)
+dashboard_cfg = db.config.config.get("dashboard", {}) or {}
+BACKEND = os.environ.get("DASHBOARD_BACKEND", dashboard_cfg.get("backend", "postgres"))
+# Máximo de puntos por serie que se envían al navegador en los gráficos de líneas
+MAX_POINTS = int(dashboard_cfg.get("max_points", 500))
+
+@st.cache_resource(show_spinner=False)
+def local_backend():
+    return LocalAnalytics(load_settings())
+
+# Filtros que acepta cada consulta (nombre -> parámetros de queries.*_sql)
+VIEW_QUERIES = {
+    "productividad": (queries.productividad_sql, ("trabajadores", "actividades")),
+    "costo_hectarea": (queries.costo_hectarea_sql, ("haciendas", "actividades")),
+    "produccion_maquinaria": (queries.produccion_maquinaria_sql, ("actividades",)),
+    "combustible": (queries.combustible_sql, ("meses",)),
+}
+
+# Opciones de los filtros: solo DISTINCT; la generación de carga es parte de la llave
+@st.cache_data(max_entries=8, show_spinner=False)
+def load_options(generation: int):
+    if BACKEND == "local":
+        return local_backend().options()
+    return {
+        name: db.fetch_df(stmt)["valor"].tolist()
+        for name, stmt in queries.option_queries().items()
+    }
+
+# Agregados filtrados en la base: llave = generación + selección del sidebar
+@st.cache_data(max_entries=512, show_spinner=False)
+def load_view(name: str, generation: int, **selection):
+    if BACKEND == "local":
+        return getattr(local_backend(), name)(**selection)
+    build, _ = VIEW_QUERIES[name]
+    return db.fetch_df(build(**selection))
+
+def fetch_view(name: str, generation: int, **selection):
+    """Normaliza la selección (tuplas, todos los parámetros) para que la llave de cache coincida."""
+    _, params = VIEW_QUERIES[name]
+    return load_view(name, generation, **{p: tuple(selection.get(p) or ()) for p in params})
+
+def fetch_views(generation: int, selections: dict, initializer=None):
+    """Las cuatro vistas en paralelo sobre el pool; devuelve (DataFrames, segundos por vista)."""
+    pool = db.pool_stats()
+    return fetch_all(
+        {name: (lambda name=name: fetch_view(name, generation, **selections.get(name, {}))) for name in VIEW_QUERIES},
+        max_workers=pool.get("size", len(VIEW_QUERIES)),
+        initializer=initializer,
+    )
+
+def warm_generation(generation: int):
+    """Precalcula opciones y vistas sin filtros (lo que ve cada sesión al entrar)."""
+    if BACKEND == "local":
+        local_backend().refresh()
+    load_options(generation)
+    fetch_views(generation, {})
+
+# Un watcher por proceso: detecta cargas nuevas y calienta en segundo plano
+@st.cache_resource(show_spinner=False)
+def generation_watcher():
+    interval = dashboard_cfg.get("refresh_seconds", 15)
+    if BACKEND == "local":
+        fetch_generation = lambda: local_backend().generation()  # noqa: E731
+    else:
+        fetch_generation = lambda: current_generation(engine)  # noqa: E731
+    return GenerationWatcher(fetch_generation, warm_generation, interval=interval).start()
+
+generation = generation_watcher().current()
+options = load_options(generation)
 
 st.title("Dashboard Agroindustria Caña")
 
 # Filtros
 with st.sidebar:
     st.header("Filtros")
-    trabajador_sel = st.multiselect("Trabajador", sorted(df_prod_trab["trabajador"].unique()))
-    actividad_trab_sel = st.multiselect("Actividad (trabajador)", sorted(df_prod_trab["actividad"].unique()))
-    hacienda_sel = st.multiselect("Hacienda", sorted(df_costo_ha["hacienda"].unique()))
-    actividad_insumo_sel = st.multiselect("Actividad (insumos)", sorted(df_costo_ha["actividad"].unique()))
-    actividad_maquina_sel = st.multiselect("Actividad maquinaria", sorted(df_prod_maq["nombre_actividad"].unique()))
-    mes_sel = st.multiselect("Mes", sorted(df_comb_unit["mes"].unique(), reverse=True))
-
-# Aplicar filtros simples
-if trabajador_sel:
-    df_prod_trab = df_prod_trab[df_prod_trab["trabajador"].isin(trabajador_sel)]
-if actividad_trab_sel:
-    df_prod_trab = df_prod_trab[df_prod_trab["actividad"].isin(actividad_trab_sel)]
-if hacienda_sel:
-    df_costo_ha = df_costo_ha[df_costo_ha["hacienda"].isin(hacienda_sel)]
-if actividad_insumo_sel:
-    df_costo_ha = df_costo_ha[df_costo_ha["actividad"].isin(actividad_insumo_sel)]
-if actividad_maquina_sel:
-    df_prod_maq = df_prod_maq[df_prod_maq["nombre_actividad"].isin(actividad_maquina_sel)]
-if mes_sel:
-    df_comb_unit = df_comb_unit[df_comb_unit["mes"].isin(mes_sel)]
+    trabajador_sel = st.multiselect("Trabajador", options["trabajador"])
+    actividad_trab_sel = st.multiselect("Actividad (trabajador)", options["actividad_trabajador"])
+    hacienda_sel = st.multiselect("Hacienda", options["hacienda"])
+    actividad_insumo_sel = st.multiselect("Actividad (insumos)", options["actividad_insumo"])
+    actividad_maquina_sel = st.multiselect("Actividad maquinaria", options["actividad_maquinaria"])
+    mes_sel = st.multiselect("Mes", options["mes"])
+    bucket_sel = st.selectbox(
+        "Agrupación temporal",
+        ["auto", "day", "week", "month"],
+        format_func={"auto": "Automática", "day": "Día", "week": "Semana", "month": "Mes"}.get,
+    )
+
+# Adjuntar el contexto del script a los hilos del pool para que usen st.cache_data
+ctx = get_script_run_ctx()
+fetch_start = time.perf_counter()
+frames, timings = fetch_views(
+    generation,
+    {
+        "productividad": {"trabajadores": trabajador_sel, "actividades": actividad_trab_sel},
+        "costo_hectarea": {"haciendas": hacienda_sel, "actividades": actividad_insumo_sel},
+        "produccion_maquinaria": {"actividades": actividad_maquina_sel},
+        "combustible": {"meses": mes_sel},
+    },
+    initializer=lambda: add_script_run_ctx(threading.current_thread(), ctx),
+)
+fetch_seconds = time.perf_counter() - fetch_start
+df_prod_trab = frames["productividad"]
+df_costo_ha = frames["costo_hectarea"]
+df_prod_maq = frames["produccion_maquinaria"]
+df_comb_unit = frames["combustible"]
+
+with st.sidebar.expander("Debug: tiempos de consulta"):
+    st.caption(f"Generación de carga: {generation}")
+    st.dataframe(
+        pd.DataFrame(
+            {"vista": list(timings), "segundos": [round(t, 3) for t in timings.values()], "filas": [len(frames[n]) for n in timings]}
+        ),
+        hide_index=True,
+    )
+    st.caption(f"Total (paralelo): {fetch_seconds:.3f} s · suma secuencial: {sum(timings.values()):.3f} s")
 
 st.subheader("Productividad por actividad")
 df_prod_trab_plot = df_prod_trab.sort_values("total_producido", ascending=False)
@@ -78,7 +156,12 @@ st.plotly_chart(fig1, use_container_width=True)
 st.divider()
 
 st.subheader("Costo de insumos por hectárea")
-df_costo_ha_plot = df_costo_ha.sort_values("fecha")
+# Puntos acotados por serie: buckets según el rango visible + LTTB
+df_costo_ha_plot = downsample(
+    bucket_ratio(df_costo_ha, "fecha", ["actividad"], "costo_total", "area_total", "costo_por_hectarea",
+                 bucket=bucket_sel, max_points=MAX_POINTS),
+    "fecha", "costo_por_hectarea", by=["actividad"], max_points=MAX_POINTS,
+)
 fig2 = px.line(
     df_costo_ha_plot,
     x="fecha",
@@ -108,7 +191,7 @@ st.plotly_chart(fig3, use_container_width=True)
 st.divider()
 
 st.subheader("Combustible por unidad producida (mensual)")
-df_comb_unit_plot = df_comb_unit.sort_values("mes").copy()
+df_comb_unit_plot = downsample(df_comb_unit, "mes", "galones_por_unidad", max_points=MAX_POINTS).copy()
 df_comb_unit_plot["galones_por_unidad"] = df_comb_unit_plot["galones_por_unidad"].abs()
 fig4 = px.line(
     df_comb_unit_plot,
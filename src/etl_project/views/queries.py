@@ -0,0 +1,111 @@
+"""
+Consultas parametrizadas del dashboard.
+
+Los filtros del sidebar se envían como parámetros (`IN :param` expandido por
+SQLAlchemy) y cada consulta agrega al grano que grafica la figura, así solo
+viajan las filas que se dibujan. Una lista de selección vacía = sin filtro.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import bindparam, text
+from sqlalchemy.sql.elements import TextClause
+
+Selection = Optional[Sequence[str]]
+
+# Listas de opciones del sidebar (DISTINCT sobre las tablas raw con el mismo
+# filtro de unidad que la vista, para no agregar la vista completa)
+OPTION_QUERIES: Dict[str, str] = {
+    "trabajador": "SELECT DISTINCT func AS valor FROM raw.actividades WHERE unidade = 'HA' ORDER BY 1",
+    "actividad_trabajador": "SELECT DISTINCT actividad AS valor FROM raw.actividades WHERE unidade = 'HA' ORDER BY 1",
+    "hacienda": "SELECT DISTINCT nm_faz AS valor FROM raw.insumos WHERE um_prod = 'HA' ORDER BY 1",
+    "actividad_insumo": "SELECT DISTINCT nm_actividad AS valor FROM raw.insumos WHERE um_prod = 'HA' ORDER BY 1",
+    "actividad_maquinaria": "SELECT DISTINCT nombre_actividad AS valor FROM stage.vista_produccion_maquinaria ORDER BY 1",
+    "mes": "SELECT DISTINCT mes AS valor FROM stage.vista_combustible_por_unidad_producida ORDER BY 1 DESC",
+}
+
+
+def option_queries() -> Dict[str, TextClause]:
+    """Consultas de opciones por nombre de filtro."""
+    return {name: text(sql) for name, sql in OPTION_QUERIES.items()}
+
+
+def _where(filters: Sequence[Tuple[str, str, Selection]]) -> Tuple[str, List]:
+    """
+    Arma 'WHERE col IN :param AND ...' con parámetros expandibles.
+    filters: (columna, nombre_parametro, valores); se omiten las listas vacías.
+    """
+    clauses: List[str] = []
+    params = []
+    for column, name, values in filters:
+        if values:
+            clauses.append(f"{column} IN :{name}")
+            params.append(bindparam(name, value=list(values), expanding=True))
+    return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+
+def _statement(sql: str, params: List) -> TextClause:
+    stmt = text(sql)
+    return stmt.bindparams(*params) if params else stmt
+
+
+def productividad_sql(trabajadores: Selection = None, actividades: Selection = None) -> TextClause:
+    """Total producido por empresa/actividad (fig1) para los trabajadores y actividades elegidos."""
+    where, params = _where([
+        ("trabajador", "trabajadores", trabajadores),
+        ("actividad", "actividades", actividades),
+    ])
+    sql = (
+        "SELECT empresa, actividad,"
+        " SUM(total_producido) AS total_producido,"
+        " SUM(cantidad_registros) AS cantidad_registros,"
+        # Como avg(qtd_prod) de la vista: solo cuentan los registros con producción
+        " SUM(total_producido) / NULLIF(SUM(registros_con_produccion), 0) AS promedio_produccion"
+        f" FROM stage.vista_productividad_trabajador{where}"
+        " GROUP BY empresa, actividad"
+        " ORDER BY total_producido DESC"
+    )
+    return _statement(sql, params)
+
+
+def costo_hectarea_sql(haciendas: Selection = None, actividades: Selection = None) -> TextClause:
+    """Costo por hectárea por actividad y fecha (fig2) para las haciendas y actividades elegidas."""
+    where, params = _where([
+        ("hacienda", "haciendas", haciendas),
+        ("actividad", "actividades", actividades),
+    ])
+    sql = (
+        "SELECT actividad, fecha,"
+        " SUM(costo_total) AS costo_total,"
+        " SUM(area_total) AS area_total,"
+        " CASE WHEN SUM(area_total) > 0 THEN ROUND(SUM(costo_total) / SUM(area_total), 2) ELSE 0 END"
+        " AS costo_por_hectarea"
+        f" FROM stage.vista_costo_insumos_por_hectarea{where}"
+        " GROUP BY actividad, fecha"
+        " ORDER BY fecha"
+    )
+    return _statement(sql, params)
+
+
+def produccion_maquinaria_sql(actividades: Selection = None) -> TextClause:
+    """Producción por hora de las actividades de maquinaria elegidas (fig3)."""
+    where, params = _where([("nombre_actividad", "actividades", actividades)])
+    sql = (
+        "SELECT nombre_actividad, total_produccion, total_horas, produccion_por_hora"
+        f" FROM stage.vista_produccion_maquinaria{where}"
+        " ORDER BY produccion_por_hora DESC"
+    )
+    return _statement(sql, params)
+
+
+def combustible_sql(meses: Selection = None) -> TextClause:
+    """Galones por unidad producida de los meses elegidos (fig4)."""
+    where, params = _where([("mes", "meses", meses)])
+    sql = (
+        "SELECT mes, total_galones, total_produccion, galones_por_unidad"
+        f" FROM stage.vista_combustible_por_unidad_producida{where}"
+        " ORDER BY mes"
+    )
+    return _statement(sql, params)
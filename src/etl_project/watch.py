@@ -0,0 +1,408 @@
+"""
+Ingesta continua: `etl watch` vigila las carpetas data/raw/<dataset>/ y carga
+cada libro nuevo apenas termina de escribirse, sin esperar la corrida por lotes.
+
+- Detección: watchdog (inotify) si está instalado; si no, revisión periódica
+  cada watch.poll_seconds.
+- Debounce: un archivo está listo cuando su tamaño y mtime no cambian durante
+  watch.debounce_seconds y, si es .xlsx/.xlsm, ya es un zip válido (Excel y las
+  copias por red lo escriben por partes). Los temporales '~$*' se ignoran.
+- Solo se ejecuta el *Pipeline del dataset sobre los archivos nuevos. Cada
+  archivo se carga en una sola transacción (bloques de watch.batch_rows filas):
+  si falla no queda nada y se reintenta completo en el ciclo siguiente. Si el
+  dataset alimenta el hecho combustible vs. producción, las sumas y conteos del
+  archivo se agregan a los de sus días.
+- Los archivos ya ingeridos (ruta, tamaño, mtime) quedan en
+  state.dir/watch.json y sus filas transformadas en state.dir/watch/. Un archivo
+  reemplazado se vuelve a ingerir: en la misma transacción se borran las filas
+  de su versión anterior (cada una tantas veces como aparecía en ella, así que
+  las filas idénticas de otros archivos quedan) y se restan del hecho.
+- Los archivos que había al arrancar por primera vez se dan por cargados sin
+  transformarlos; su versión se guarda después, de a watch.snapshot_files por
+  ciclo sin archivos nuevos. Si uno se reemplaza antes, sus filas viejas no se
+  pueden borrar (se avisa).
+
+Una reexportación con otro nombre que repite fechas ya cargadas se agrega igual
+que un libro nuevo; para esos casos está `etl run --delta`.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+import time
+import zipfile
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from etl_project.profiling import RunProfiler, stage
+
+WATCH_DEFAULTS = {
+    "poll_seconds": 30,
+    "debounce_seconds": 10,
+    "batch_rows": 5000,
+    "snapshot_files": 5,
+    "schema": "raw",
+}
+
+Signature = Tuple[int, int]  # (tamaño, mtime_ns)
+
+
+def watch_options(cfg: Dict) -> Dict:
+    """WATCH_DEFAULTS combinado con la sección watch de settings.yaml."""
+    return {**WATCH_DEFAULTS, **((cfg.get("watch", {}) or {}))}
+
+
+def _signature(path: Path) -> Optional[Signature]:
+    try:
+        st = path.stat()
+    except OSError:  # borrado o renombrado entre el listado y el stat
+        return None
+    return st.st_size, st.st_mtime_ns
+
+
+def _complete(path: Path) -> bool:
+    """Un .xlsx/.xlsm a medio escribir todavía no tiene el directorio central del zip."""
+    if path.suffix.lower() in (".xlsx", ".xlsm"):
+        return zipfile.is_zipfile(path)
+    return True
+
+
+class FolderScanner:
+    """
+    Lista los archivos de cada dataset y decide cuáles están listos. Recuerda
+    la firma vista por última vez y desde cuándo no cambia.
+    """
+
+    def __init__(
+        self,
+        folders: Dict[str, Tuple[Path, Sequence[str]]],
+        debounce: float,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.folders = folders
+        self.debounce = float(debounce)
+        self._clock = clock
+        self._pending: Dict[Path, Tuple[Signature, float]] = {}
+
+    def files(self, dataset: str) -> List[Path]:
+        root, patterns = self.folders[dataset]
+        if not root.exists():
+            return []
+        found = {p for pat in patterns for p in root.rglob(pat) if not p.name.startswith("~$")}
+        return sorted(found)
+
+    def ready(self, seen: Dict[str, Signature]) -> Dict[str, List[Path]]:
+        """Archivos nuevos o reemplazados cuya firma está estable desde hace debounce segundos."""
+        now = self._clock()
+        out: Dict[str, List[Path]] = {}
+        for ds in self.folders:
+            for path in self.files(ds):
+                sig = _signature(path)
+                if sig is None or tuple(seen.get(str(path), ())) == sig:
+                    self._pending.pop(path, None)
+                    continue
+                prev = self._pending.get(path)
+                if prev is None or prev[0] != sig:
+                    self._pending[path] = (sig, now)  # nuevo o todavía cambiando
+                    continue
+                if now - prev[1] >= self.debounce and _complete(path):
+                    out.setdefault(ds, []).append(path)
+        return out
+
+    @property
+    def waiting(self) -> int:
+        """Archivos vistos que todavía no se consideran listos."""
+        return len(self._pending)
+
+    def forget(self, path: Path) -> None:
+        self._pending.pop(path, None)
+
+
+class IngestDaemon:
+    """
+    Proceso de larga duración que ingiere archivos nuevos en micro-lotes.
+
+    loader_factory(tabla) crea el loader con replace_frames()/delete_rows()/load_csv();
+    por defecto CSVLoader contra la base de settings.yaml (y en ese caso cada
+    ciclo con cargas registra una generación en raw.etl_load_log).
+    """
+
+    def __init__(
+        self,
+        cfg: Dict,
+        datasets: Optional[Sequence[str]] = None,
+        *,
+        loader_factory: Optional[Callable[[str], object]] = None,
+        clock: Callable[[], float] = time.monotonic,
+        tag: str = "watch",
+    ):
+        from etl_project.runner import PIPELINES
+
+        self.cfg = cfg
+        self.opts = watch_options(cfg)
+        self.tag = tag
+        self.datasets = list(datasets or PIPELINES)
+        self.loader_factory = loader_factory
+        base = Path(cfg["paths"]["base"])
+        folders = {
+            ds: (base / cfg["datasets"][ds]["source"]["folder"],
+                 tuple(cfg["datasets"][ds]["source"].get("patterns", ["*.xlsx", "*.xlsm"])))
+            for ds in self.datasets
+        }
+        self.scanner = FolderScanner(folders, self.opts["debounce_seconds"], clock)
+        self.state_path = base / (cfg.get("state", {}) or {}).get("dir", "data/state/") / "watch.json"
+        self.seen: Dict[str, Signature] = self._load_state()
+        self._loaders: Dict[str, object] = {}
+        # Archivos dados por cargados cuya versión todavía no se guardó
+        self._backlog: List[Tuple[str, Path]] = [
+            (ds, path) for ds in self.datasets for path in self.scanner.files(ds)
+            if str(path) in self.seen and not self._version_path(path).exists()
+        ]
+
+    # ---------------------------------------------------------------- estado
+    def _load_state(self) -> Dict[str, Signature]:
+        if not self.state_path.exists():
+            return {}
+        with open(self.state_path, "r", encoding="utf-8") as f:
+            return {k: tuple(v) for k, v in json.load(f).items()}
+
+    def _save_state(self) -> None:
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.state_path.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({k: list(v) for k, v in sorted(self.seen.items())}, f, indent=2)
+        tmp.replace(self.state_path)
+
+    def _version_path(self, path: Path, fact: bool = False) -> Path:
+        """
+        Filas transformadas de la versión de un archivo que está en la tabla; con
+        fact, la que todavía suma en el hecho (solo mientras se actualiza).
+        """
+        digest = hashlib.sha1(str(path).encode("utf-8")).hexdigest()[:16]
+        return self.state_path.parent / "watch" / f"{digest}{'.fact' if fact else ''}.parquet"
+
+    @staticmethod
+    def _read_version(path: Path):
+        """Versión guardada; None si no hay o no tenía filas."""
+        import pandas as pd
+
+        if not path.exists():
+            return None
+        df = pd.read_parquet(path)
+        return None if df.empty else df
+
+    @staticmethod
+    def _write_version(path: Path, df) -> None:
+        """Escribe una versión (vacía si df es None) de forma atómica."""
+        import pandas as pd
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        (df if df is not None else pd.DataFrame()).to_parquet(tmp, index=False)
+        tmp.replace(path)
+
+    def mark_existing(self) -> int:
+        """
+        Da por ingeridos los archivos actuales (ya cargados por la corrida por
+        lotes). Solo registra su firma; la versión de cada uno (qué filas borrar
+        si después se reemplaza) se guarda más tarde, en los ciclos sin archivos
+        nuevos (snapshot_backlog).
+        """
+        count = 0
+        for ds in self.datasets:
+            for path in self.scanner.files(ds):
+                sig = _signature(path)
+                if sig is None:
+                    continue
+                self.seen[str(path)] = sig
+                if not self._version_path(path).exists():
+                    self._backlog.append((ds, path))
+                count += 1
+        self._save_state()
+        return count
+
+    def snapshot_backlog(self, limit: Optional[int] = None) -> int:
+        """
+        Guarda la versión de hasta 'limit' (watch.snapshot_files) archivos dados
+        por cargados. Un archivo que cambió desde entonces se deja: lo toma la
+        ingesta como reemplazado. Devuelve cuántos guardó.
+        """
+        limit = int(self.opts["snapshot_files"] if limit is None else limit)
+        done = 0
+        while self._backlog and done < limit:
+            ds, path = self._backlog.pop(0)
+            sig = _signature(path)
+            if sig is None or tuple(self.seen.get(str(path), ())) != sig:
+                continue
+            self._write_version(self._version_path(path), self._transform(ds, path))
+            done += 1
+        return done
+
+    # ---------------------------------------------------------------- ingesta
+    def _loader(self, table: str):
+        if table not in self._loaders:
+            if self.loader_factory is not None:
+                self._loaders[table] = self.loader_factory(table)
+            else:
+                from etl_project.CSVLoader import CSVLoader
+
+                self._loaders[table] = CSVLoader(table_name=table, schema=self.opts["schema"])
+        return self._loaders[table]
+
+    def _transform(self, dataset: str, path: Path, parts: Optional[List] = None):
+        """Salida del pipeline para un archivo (None si no deja filas); los bloques quedan en 'parts'."""
+        import pandas as pd
+
+        from etl_project.loaders import ExcelLoader
+        from etl_project.runner import get_pipeline
+
+        pipeline = get_pipeline(dataset)(ExcelLoader(self.cfg["paths"]["base"]), self.cfg)
+        blocks = list(pipeline.iter_transformed(int(self.opts["batch_rows"]), files=[path]))
+        if parts is not None:
+            parts.extend(blocks)
+        return pd.concat(blocks, ignore_index=True) if blocks else None
+
+    def ingest(self, dataset: str, files: Sequence[Path]) -> int:
+        """Pipeline del dataset solo sobre 'files'; cada archivo se carga en su propia transacción."""
+        return sum(self._ingest_file(dataset, path) for path in files)
+
+    def _ingest_file(self, dataset: str, path: Path) -> int:
+        import pandas as pd
+
+        from etl_project.facts import FACT_SOURCES, FACT_TABLE, facts_enabled, load_fact_update
+
+        committed, fact_path = self._version_path(path), self._version_path(path, fact=True)
+        previous = self._read_version(committed)
+        if previous is None and str(path) in self.seen and not committed.exists():
+            print(f"[{self.tag}] {path.name}: sin versión anterior guardada, sus filas viejas no se borran")
+        fact_cols = FACT_SOURCES.get(dataset) if facts_enabled(self.cfg) else None
+        # Un intento anterior cargó la tabla pero no terminó el hecho: el hecho
+        # todavía suma la versión guardada en fact_path
+        interrupted = fact_cols is not None and fact_path.exists()
+        counted = self._read_version(fact_path) if interrupted else previous
+
+        parts: List[pd.DataFrame] = []
+        with stage("extract_transform", dataset=dataset):
+            current = self._transform(dataset, path, parts)
+        if fact_cols and not interrupted:
+            self._write_version(fact_path, counted[fact_cols] if counted is not None else None)
+
+        # Se borran exactamente las filas de la versión anterior de este archivo
+        with stage("load", current, dataset=dataset):
+            rows = self._loader(dataset).replace_frames(parts, previous)
+        self._write_version(committed, current)
+
+        base = current if current is not None else counted
+        if fact_cols and base is not None:
+            with stage("fact", dataset=FACT_TABLE):
+                fresh = current[fact_cols] if current is not None else base[fact_cols].iloc[:0]
+                _, days = load_fact_update(
+                    self.cfg, self._loader(FACT_TABLE),
+                    additive=True,
+                    retract={dataset: counted[fact_cols]} if counted is not None else None,
+                    rebase=interrupted,
+                    **{dataset: fresh},
+                )
+            print(f"[{self.tag}] {FACT_TABLE}: {days} días recalculados")
+        fact_path.unlink(missing_ok=True)
+
+        sig = _signature(path)
+        if sig is not None:
+            self.seen[str(path)] = sig
+        self.scanner.forget(path)
+        self._save_state()  # por archivo: una falla posterior no repite lo ya cargado
+        return rows
+
+    def run_once(self) -> Dict[str, int]:
+        """Un ciclo: archivos listos -> pipeline -> carga. Devuelve filas por dataset."""
+        from etl_project.load_log import record_load
+
+        ready = self.scanner.ready(self.seen)
+        if not ready:
+            self.snapshot_backlog()
+            return {}
+        loaded: Dict[str, int] = {}
+        profiler = RunProfiler(name=self.tag)
+        with profiler:
+            for ds, files in ready.items():
+                print(f"[{self.tag}] {ds}: {len(files)} archivo(s) nuevo(s): {', '.join(p.name for p in files)}")
+                loaded[ds] = self.ingest(ds, files)
+                print(f"[{self.tag}] OK -> {self.opts['schema']}.{ds}: {loaded[ds]} filas")
+        if loaded and self.loader_factory is None:
+            generation = record_load(self._loader(next(iter(loaded))).db.get_engine(), profiler.run_id, list(loaded))
+            print(f"[{self.tag}] Generación de carga {generation} (run {profiler.run_id})")
+        profiler.export(self.cfg)
+        return loaded
+
+    def drain(self, max_rounds: int = 20, sleep: Callable[[float], None] = time.sleep) -> Dict[str, int]:
+        """
+        Ingiere lo que haya en las carpetas y termina (`etl watch --once`):
+        repite el ciclo mientras queden archivos en debounce, hasta max_rounds.
+        """
+        total: Dict[str, int] = {}
+        for _ in range(max_rounds):
+            for ds, rows in self.run_once().items():
+                total[ds] = total.get(ds, 0) + rows
+            if not self.scanner.waiting:
+                break
+            sleep(float(self.opts["debounce_seconds"]))
+        return total
+
+    # ---------------------------------------------------------------- bucle
+    def _observer(self, wake: threading.Event):
+        """Observer de watchdog que despierta el bucle ante cualquier evento; None sin watchdog."""
+        try:
+            from watchdog.events import FileSystemEventHandler
+            from watchdog.observers import Observer
+        except ImportError:
+            return None
+
+        class _Wake(FileSystemEventHandler):
+            def on_any_event(self, event):
+                wake.set()
+
+        observer = Observer()
+        for root, _ in self.scanner.folders.values():
+            if root.exists():
+                observer.schedule(_Wake(), str(root), recursive=True)
+        observer.start()
+        return observer
+
+    def serve_forever(self, stop: Optional[threading.Event] = None) -> None:
+        """
+        Bucle principal hasta que 'stop' se active (o Ctrl+C). Con archivos en
+        espera se vuelve a revisar a los debounce_seconds; sin ellos, al próximo
+        evento de inotify o a los poll_seconds.
+        """
+        stop = stop or threading.Event()
+        wake = threading.Event()
+        observer = self._observer(wake)
+        mode = "inotify (watchdog)" if observer is not None else f"polling cada {self.opts['poll_seconds']}s"
+        print(f"[{self.tag}] Vigilando {', '.join(self.datasets)} ({mode})")
+        try:
+            while not stop.is_set():
+                wake.clear()
+                try:
+                    self.run_once()
+                except Exception as exc:  # el daemon sigue; el archivo se reintenta en el próximo ciclo
+                    print(f"[{self.tag}] Error en la ingesta: {exc}")
+                if self.scanner.waiting:
+                    timeout = float(self.opts["debounce_seconds"])
+                elif observer is not None:
+                    timeout = None
+                else:
+                    timeout = float(self.opts["poll_seconds"])
+                if observer is not None and timeout is None:
+                    # Espera un evento pero revisa 'stop' periódicamente
+                    while not stop.is_set() and not wake.wait(1.0):
+                        pass
+                else:
+                    stop.wait(timeout)
+        except KeyboardInterrupt:
+            print(f"[{self.tag}] Detenido")
+        finally:
+            if observer is not None:
+                observer.stop()
+                observer.join()
@@ -0,0 +1,230 @@
+from __future__ import annotations
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+import shutil
+import uuid
+import pandas as pd
+
+# Opciones por defecto de escritura Parquet; se sobrescriben con output.parquet en settings.yaml
+PARQUET_DEFAULTS: Dict[str, Any] = {
+    "compression": "zstd",
+    "compression_level": 3,
+    "row_group_size": 128 * 1024,
+    "use_dictionary": True,
+    "write_statistics": True,
+}
+
+Filters = Sequence[Tuple[str, str, Any]]
+
+
+def add_partition_columns(
+    df: pd.DataFrame,
+    date_column: str,
+    date_format: str = "%d/%m/%Y",
+) -> pd.DataFrame:
+    """
+    Agrega columnas 'year' y 'month' (enteros) a partir de la columna de fecha.
+    Acepta fechas datetime o texto en 'date_format' (como salen de adjust_date_format).
+    """
+    if date_column not in df.columns:
+        raise KeyError(f"Columna no encontrada: {date_column}")
+    fechas = df[date_column]
+    if not pd.api.types.is_datetime64_any_dtype(fechas):
+        fechas = pd.to_datetime(fechas, format=date_format, errors="coerce")
+    out = df.copy()
+    out["year"] = fechas.dt.year.astype("Int16")
+    out["month"] = fechas.dt.month.astype("Int8")
+    return out
+
+
+def write_partitioned_parquet(
+    df: pd.DataFrame,
+    root: Union[str, Path],
+    *,
+    partition_cols: Sequence[str] = ("year", "month"),
+    sort_by: Optional[Sequence[str]] = None,
+    compression: str = PARQUET_DEFAULTS["compression"],
+    compression_level: Optional[int] = PARQUET_DEFAULTS["compression_level"],
+    row_group_size: int = PARQUET_DEFAULTS["row_group_size"],
+    use_dictionary: bool = PARQUET_DEFAULTS["use_dictionary"],
+    write_statistics: bool = PARQUET_DEFAULTS["write_statistics"],
+    basename_template: Optional[str] = None,
+    existing_data_behavior: str = "overwrite_or_ignore",
+) -> Path:
+    """
+    Escribe un dataset Parquet con particionado Hive (root/year=2025/month=9/...).
+    Por defecto agrega: los archivos nuevos llevan un nombre único y no se toca
+    nada de lo existente. Con existing_data_behavior="delete_matching" cada
+    partición presente en df se reemplaza completa, así que df debe traer todas
+    las filas de esas particiones (una foto completa); un subconjunto borraría
+    el resto de las filas de las particiones que toca.
+    Ordenar por 'sort_by' deja estadísticas min/max útiles para podar row groups.
+    """
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    root = Path(root)
+    if basename_template is None:
+        basename_template = f"part-{uuid.uuid4().hex[:12]}-{{i}}.parquet"
+    if sort_by:
+        df = df.sort_values(list(sort_by), kind="stable")
+    # Sin metadata de pandas: los tipos de las particiones los define la ruta al leer
+    table = pa.Table.from_pandas(df, preserve_index=False).replace_schema_metadata(None)
+
+    fmt = ds.ParquetFileFormat()
+    options = fmt.make_write_options(
+        compression=compression,
+        compression_level=compression_level,
+        use_dictionary=use_dictionary,
+        write_statistics=write_statistics,
+    )
+    ds.write_dataset(
+        table,
+        root,
+        format=fmt,
+        file_options=options,
+        partitioning=ds.partitioning(pa.schema([table.schema.field(c) for c in partition_cols]), flavor="hive"),
+        basename_template=basename_template,
+        max_rows_per_group=row_group_size,
+        min_rows_per_group=min(row_group_size, max(len(df), 1)),
+        existing_data_behavior=existing_data_behavior,
+    )
+    return root
+
+
+def _discover_partition_cols(root: Path) -> List[str]:
+    """Nombres de las columnas de partición siguiendo la primera ruta clave=valor."""
+    cols: List[str] = []
+    current = root
+    while True:
+        subdirs = sorted(p for p in current.iterdir() if p.is_dir() and "=" in p.name)
+        if not subdirs:
+            return cols
+        cols.append(subdirs[0].name.split("=", 1)[0])
+        current = subdirs[0]
+
+
+def read_partitioned_parquet(
+    root: Union[str, Path],
+    *,
+    filters: Optional[Filters] = None,
+    columns: Optional[List[str]] = None,
+    partition_cols: Optional[Sequence[str]] = None,
+) -> pd.DataFrame:
+    """
+    Lee un dataset particionado. Los filtros (p. ej. [("year", "=", 2025), ("month", "=", 9)])
+    podan particiones por ruta y row groups por estadísticas.
+    year/month se leen como enteros y el resto de particiones como texto
+    (para no perder ceros a la izquierda, p. ej. hda=002).
+    """
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+
+    root = Path(root)
+    cols = list(partition_cols) if partition_cols is not None else _discover_partition_cols(root)
+    schema = pa.schema([(c, pa.int32() if c in ("year", "month") else pa.string()) for c in cols])
+    dataset = ds.dataset(root, format="parquet", partitioning=ds.partitioning(schema, flavor="hive"))
+    expr = pq.filters_to_expression(list(filters)) if filters else None
+    return dataset.to_table(filter=expr, columns=columns).to_pandas()
+
+
+def _output_options(cfg: Dict, dataset: str) -> Dict[str, Any]:
+    out_cfg = cfg.get("output", {}) or {}
+    opts = {**PARQUET_DEFAULTS, **(out_cfg.get("parquet", {}) or {})}
+    opts.update((cfg["datasets"][dataset].get("output", {}) or {}).get("parquet", {}) or {})
+    return opts
+
+
+def processed_dataset_path(cfg: Dict, dataset: str) -> Path:
+    """Carpeta del dataset particionado: <data_processed>/<dataset>/"""
+    return Path(cfg["paths"]["base"]) / cfg["paths"]["data_processed"] / dataset
+
+
+def _write_processed_to(df: pd.DataFrame, root: Path, dataset: str, cfg: Dict, **kwargs: Any) -> Path:
+    ds_out = cfg["datasets"][dataset].get("output", {}) or {}
+    partition_by = list(ds_out.get("partition_by", ["year", "month"]))
+    date_column = ds_out.get("date_column")
+    if date_column and {"year", "month"} & set(partition_by):
+        df = add_partition_columns(df, date_column, ds_out.get("date_format", "%d/%m/%Y"))
+
+    opts = _output_options(cfg, dataset)
+    return write_partitioned_parquet(
+        df,
+        root,
+        partition_cols=partition_by,
+        sort_by=[date_column] if date_column else None,
+        compression=opts["compression"],
+        compression_level=opts.get("compression_level"),
+        row_group_size=int(opts["row_group_size"]),
+        use_dictionary=opts["use_dictionary"],
+        write_statistics=opts["write_statistics"],
+        **kwargs,
+    )
+
+
+def _staging_path(root: Path) -> Path:
+    staging = root.with_name(root.name + ".staging")
+    shutil.rmtree(staging, ignore_errors=True)
+    return staging
+
+
+def _swap_in(staging: Path, root: Path) -> Path:
+    """Reemplaza el dataset completo por el de staging (las particiones que no volvieron a escribirse desaparecen)."""
+    if not staging.exists():
+        staging.mkdir(parents=True)  # foto vacía
+    old = root.with_name(root.name + ".old")
+    shutil.rmtree(old, ignore_errors=True)
+    if root.exists():
+        root.rename(old)
+    staging.rename(root)
+    shutil.rmtree(old, ignore_errors=True)
+    return root
+
+
+def write_processed(df: pd.DataFrame, dataset: str, cfg: Dict) -> Path:
+    """
+    Escribe la salida procesada de un dataset según settings.yaml:
+    datasets.<ds>.output (date_column, date_format, partition_by) y output.parquet.
+    df es la foto completa del dataset: se escribe en un directorio de staging
+    que reemplaza al dataset entero, así que no quedan particiones de fotos
+    anteriores que df ya no trae.
+    """
+    root = processed_dataset_path(cfg, dataset)
+    staging = _staging_path(root)
+    _write_processed_to(df, staging, dataset, cfg, basename_template="part-{i}.parquet")
+    return _swap_in(staging, root)
+
+
+def write_processed_chunks(chunks: Iterable[pd.DataFrame], dataset: str, cfg: Dict) -> Path:
+    """
+    Igual que write_processed pero a partir de bloques (p. ej. los de un SpillBuffer),
+    con un solo bloque en memoria a la vez. Los bloques se escriben en un directorio
+    de staging que al final reemplaza al dataset completo.
+    """
+    root = processed_dataset_path(cfg, dataset)
+    staging = _staging_path(root)
+    for i, chunk in enumerate(chunks):
+        _write_processed_to(
+            chunk, staging, dataset, cfg,
+            basename_template=f"part-{i:05d}-{{i}}.parquet",
+            existing_data_behavior="overwrite_or_ignore",
+        )
+    return _swap_in(staging, root)
+
+
+def read_processed(
+    dataset: str,
+    cfg: Dict,
+    *,
+    filters: Optional[Filters] = None,
+    columns: Optional[List[str]] = None,
+) -> pd.DataFrame:
+    """Lee la salida procesada (particionada) de un dataset con poda opcional."""
+    ds_out = cfg["datasets"][dataset].get("output", {}) or {}
+    return read_partitioned_parquet(
+        processed_dataset_path(cfg, dataset),
+        filters=filters,
+        columns=columns,
+        partition_cols=ds_out.get("partition_by", ["year", "month"]),
+    )
@@ -0,0 +1,86 @@
+import datetime as dt
+
+import numpy as np
+import pandas as pd
+
+from etl_project import analytics
+
+
+def test_sql_round_is_half_away_from_zero():
+    assert list(analytics.sql_round([0.125, -0.125, 2.5])) == [0.13, -0.13, 2.5]
+
+
+def test_as_text_matches_values_loaded_through_csv():
+    from etl_project.CSVLoader import _as_loaded
+
+    df = pd.DataFrame({
+        "con_nan": [123.0, np.nan, 7.0],  # entero con NaN: float, como en la tabla raw
+        "entero": [123, 45, 7],
+        "texto": ["A-1", None, "B"],
+    })
+    loaded = _as_loaded(df)
+    for col in df.columns:
+        expected = [None if pd.isna(v) else str(v) for v in loaded[col]]
+        assert list(analytics._as_text(df[col])) == expected
+    assert list(analytics._as_text(df["con_nan"])) == ["123.0", None, "7.0"]
+    assert list(analytics._as_text(df["entero"])) == ["123", "45", "7"]
+
+
+def test_productividad_counts_rows_and_ignores_null_production():
+    actividades = pd.DataFrame({
+        "func": [88194, 88194, 87821, 1],
+        "empresa": [99, 99, 99, 99],
+        "actividad": ["Riego", "Riego", "Riego", "Riego"],
+        "unidade": ["HA", "HA", "HA", "H"],
+        "qtd_prod": [2.0, np.nan, np.nan, 5.0],
+    })
+    out = analytics.vista_productividad_trabajador(actividades).set_index("trabajador")
+    assert list(out.index) == ["88194", "87821"]
+    assert out.loc["88194", "cantidad_registros"] == 2
+    assert out.loc["88194", "total_producido"] == 2.0
+    assert out.loc["88194", "promedio_produccion"] == 2.0
+    assert out.loc["88194", "registros_con_produccion"] == 1
+    assert pd.isna(out.loc["87821", "total_producido"])
+
+    # Agregado del dashboard: promedio sobre los registros con producción, como avg()
+    local = analytics.LocalAnalytics({})
+    local._views = {"vista_productividad_trabajador": analytics.vista_productividad_trabajador(actividades)}
+    row = local.productividad().iloc[0]
+    assert (row["cantidad_registros"], row["promedio_produccion"]) == (3, 2.0)
+
+
+def test_costo_por_hectarea_groups_by_date_and_guards_zero_area():
+    insumos = pd.DataFrame({
+        "zona": ["Z", "Z", "Z"],
+        "nm_faz": ["001 - CABAÑA"] * 3,
+        "nm_actividad": ["A", "A", "B"],
+        "fecha": ["07/08/2025", "07/08/2025", "08/08/2025"],
+        "um_prod": ["HA", "HA", "HA"],
+        "valor": [1.0, 0.25, 3.0],
+        "area_apli": [5.0, 5.0, 0.0],
+    })
+    out = analytics.vista_costo_insumos_por_hectarea(insumos)
+    assert list(out["fecha"]) == [dt.date(2025, 8, 7), dt.date(2025, 8, 8)]
+    assert list(out["costo_por_hectarea"]) == [0.13, 0.0]
+
+
+def test_combustible_join_keeps_sql_multiplicity():
+    abastecimientos = pd.DataFrame({
+        "equipo": ["123", "123", "999"],
+        "fecha": pd.to_datetime(["2025-01-05", "2025-02-01", "2025-01-05"]),
+        "galones": [10.0, 7.0, 3.0],
+    })
+    rep = pd.DataFrame({
+        "equipo": [123, 123, 123],
+        "fecha": ["05/01/2025", "05/01/2025", "01/02/2025"],
+        "unidad": ["H", "H", "HA"],
+        "cantidad_produccion": [2.0, 3.0, 1.0],
+        "nombre_actividad": ["x", "x", "x"],
+        "unidad_produccion": ["HA", "HA", "HA"],
+        "duracion_horas": [1.0, 1.0, 1.0],
+    })
+    out = analytics.vista_combustible_por_unidad_producida(abastecimientos, rep)
+    # La fila de 10 galones empareja con dos registros de rep_maquinaria -> cuenta dos veces
+    assert out.to_dict("records") == [
+        {"mes": "2025-01", "total_galones": 20.0, "total_produccion": 5.0, "galones_por_unidad": 4.0}
+    ]
@@ -0,0 +1,78 @@
+import copy
+import json
+
+from etl_project.benchmarks.suite import save_results
+from etl_project.benchmarks.views import changes, compare_views, default_baseline, pin_baseline, summarize_explain
+
+EXPLAIN = [{
+    "Plan": {
+        "Node Type": "Limit", "Actual Rows": 5, "Actual Loops": 1,
+        "Shared Hit Blocks": 120, "Shared Read Blocks": 4, "Temp Read Blocks": 0, "Temp Written Blocks": 0,
+        "Plans": [{
+            "Node Type": "Sort", "Sort Method": "top-N heapsort",
+            "Plans": [{
+                "Node Type": "Aggregate", "Strategy": "Hashed",
+                "Plans": [{"Node Type": "Seq Scan", "Schema": "raw", "Relation Name": "rep_maquinaria"}],
+            }],
+        }],
+    },
+    "Planning Time": 0.4,
+    "Execution Time": 12.5,
+}]
+
+
+def _run(seconds, shape, rows, ddl="a", sorts=("top-N heapsort",)):
+    return {
+        "meta": {"ddl_sha1": ddl, "table_rows": {"raw.rep_maquinaria": rows}},
+        "results": [{
+            "dataset": "vista_produccion_maquinaria", "best_seconds": seconds,
+            "plan_shape": shape, "sort_methods": list(sorts), "source_rows": rows,
+        }],
+    }
+
+
+def test_summarize_explain_keeps_plan_shape_without_costs():
+    got = summarize_explain(EXPLAIN)
+    assert got["plan_shape"] == "Limit(Sort(Aggregate[Hashed](Seq Scan[raw.rep_maquinaria])))"
+    assert got["sort_methods"] == ["top-N heapsort"]  # resultado de la ejecución, no del plan
+    assert (got["execution_ms"], got["rows"], got["shared_read"], got["temp_blocks"]) == (12.5, 5, 4, 0)
+
+
+def test_regression_scales_with_volume_and_flags_plan_changes():
+    shape = summarize_explain(EXPLAIN)["plan_shape"]
+    old = _run(0.010, shape, 1000)
+
+    # 10x filas y 9x tiempo: dentro de lo esperado
+    assert not compare_views(old, _run(0.090, shape, 10_000))[0]["regression"]
+    # mismo volumen, 50% más lento
+    assert compare_views(old, _run(0.015, shape, 1000), threshold=0.2)[0]["regression"]
+    # mismo tiempo, el planificador eligió otra estrategia de agregación
+    explain = copy.deepcopy(EXPLAIN)
+    explain[0]["Plan"]["Plans"][0]["Plans"][0]["Strategy"] = "Sorted"
+    row = compare_views(old, _run(0.010, summarize_explain(explain)["plan_shape"], 1000))[0]
+    assert row["plan_changed"] and row["regression"]
+    # el Sort pasó a disco por el volumen: se informa, pero no es cambio de plan
+    row = compare_views(old, _run(0.010, shape, 1000, sorts=["external merge"]))[0]
+    assert row["sort_changed"] and not row["plan_changed"] and not row["regression"]
+
+    assert changes(old, _run(0.010, shape, 2000, ddl="b")) == [
+        "DDL: a -> b",
+        "raw.rep_maquinaria: 1000 -> 2000 filas",
+    ]
+
+
+def test_regressed_run_does_not_replace_the_baseline(tmp_path):
+    shape = summarize_explain(EXPLAIN)["plan_shape"]
+    good = _run(0.010, shape, 1000)
+    good["meta"].update(commit="a", timestamp="2025-01-01T00:00:00")
+    assert default_baseline(tmp_path) is None
+    save_results(good, tmp_path)
+    assert default_baseline(tmp_path).name.startswith("bench_")  # sin línea base: el último guardado
+    pin_baseline(good, tmp_path)
+
+    slow = _run(0.020, shape, 1000)
+    slow["meta"].update(commit="b", timestamp="2025-01-02T00:00:00")
+    save_results(slow, tmp_path)  # se guarda igual, pero no se fija: main solo fija sin regresiones
+    assert default_baseline(tmp_path).name == "baseline.json"
+    base = json.loads(default_baseline(tmp_path).read_text(encoding="utf-8"))
+    assert compare_views(base, slow)[0]["regression"]
@@ -0,0 +1,41 @@
+from pathlib import Path
+
+import pytest
+
+from etl_project.benchmarks.suite import FrameLoader, compare_results, run_suite
+from etl_project.benchmarks.synthetic import GENERATORS, make_frame, parse_size
+from etl_project.config import load_settings
+from etl_project.runner import get_pipeline
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+@pytest.fixture
+def cfg(monkeypatch):
+    monkeypatch.chdir(ROOT)
+    return load_settings("config/settings.yaml")
+
+
+def test_parse_size():
+    assert [parse_size(s) for s in ("10k", "1m", "2.5k", "300", 7)] == [10_000, 1_000_000, 2_500, 300, 7]
+
+
+@pytest.mark.parametrize("dataset", sorted(GENERATORS))
+def test_synthetic_frames_run_through_each_pipeline(cfg, dataset):
+    raw = make_frame(dataset, 500, seed=3)
+    assert len(raw) == 500
+    assert raw.equals(make_frame(dataset, 500, seed=3))  # determinista por semilla
+
+    out = get_pipeline(dataset)(FrameLoader(raw), cfg).run()
+    assert 0 < len(out) <= 500
+    assert not any(" " in str(c) for c in out.columns)  # clean_column_names ya aplicado
+
+
+def test_suite_runs_and_compares(cfg):
+    doc = run_suite(cfg, sizes=["300"], datasets=["insumos"], repeats=1, excel_max_rows=300)
+    names = {r["benchmark"] for r in doc["results"]}
+    assert {"pipeline.run", "ExcelLoader.read_many_recursive", "CSVLoader.load_csv"} <= names
+
+    slower = {"results": [{**r, "best_seconds": r["best_seconds"] * 2} for r in doc["results"]]}
+    rows = compare_results(doc, slower, threshold=0.5)
+    assert rows and all(r["regression"] for r in rows)
@@ -0,0 +1,53 @@
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+HEAVY = ("pandas", "sqlalchemy", "pyarrow", "streamlit", "plotly")
+
+# Presupuesto de arranque del CLI por encima de un `python -c pass`
+STARTUP_BUDGET_S = float(os.getenv("ETL_STARTUP_BUDGET", "0.3"))
+
+
+def _run(code: str) -> float:
+    env = {**os.environ, "PYTHONPATH": str(ROOT / "src")}
+    t0 = time.perf_counter()
+    subprocess.run([sys.executable, "-c", code], check=True, cwd=ROOT, env=env, capture_output=True)
+    return time.perf_counter() - t0
+
+
+def test_cli_no_importa_modulos_pesados():
+    code = (
+        "import sys, etl_project, etl_project.cli, etl_project.config, etl_project.runner\n"
+        f"heavy = [m for m in {HEAVY!r} if m in sys.modules]\n"
+        "assert not heavy, heavy\n"
+    )
+    _run(code)
+
+
+def test_cli_help_dentro_del_presupuesto():
+    baseline = min(_run("pass") for _ in range(3))
+    elapsed = min(
+        _run("import sys; from etl_project.cli import main\ntry:\n    main(['--help'])\nexcept SystemExit:\n    pass")
+        for _ in range(3)
+    )
+    assert elapsed - baseline < STARTUP_BUDGET_S, f"arranque {elapsed - baseline:.3f}s > {STARTUP_BUDGET_S}s"
+
+
+def test_explain_no_importa_pandas():
+    code = (
+        "import sys\n"
+        "from etl_project.cli import main\n"
+        "main(['explain', 'insumos'])\n"
+        "assert 'pandas' not in sys.modules\n"
+    )
+    _run(code)
+
+
+def test_stream_rechaza_flags_que_no_aplica(capsys):
+    from etl_project.cli import main
+
+    assert main(["run", "--stream", "--delta", "--format", "parquet"]) == 2
+    assert "--delta, --format" in capsys.readouterr().err
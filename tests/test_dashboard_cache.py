@@ -0,0 +1,28 @@
+from etl_project.views.cache import GenerationWatcher
+
+
+def test_new_generation_is_published_only_after_warming():
+    generations = iter([1, 1, 2])
+    warmed = []
+    watcher = GenerationWatcher(lambda: next(generations), warmed.append, interval=60)
+
+    assert watcher.current() == 1
+    assert not watcher.refresh()
+    assert watcher.refresh()
+    assert watcher.current() == 2
+    assert warmed == [1, 2]
+
+
+def test_failed_warm_keeps_serving_previous_generation():
+    generations = iter([1, 2])
+
+    def warm(generation):
+        if generation == 2:
+            raise ConnectionError("db caída")
+
+    watcher = GenerationWatcher(lambda: next(generations), warm, interval=60)
+    assert watcher.current() == 1
+    assert not watcher.refresh()
+    assert watcher.current() == 1
+    assert isinstance(watcher.last_error, ConnectionError)
+
@@ -0,0 +1,41 @@
+import numpy as np
+import pandas as pd
+
+from etl_project.views.downsample import bucket_ratio, choose_bucket, downsample, lttb
+
+
+def test_choose_bucket_from_visible_range():
+    assert choose_bucket("2025-01-01", "2025-03-01", max_points=500) == "day"
+    assert choose_bucket("2020-01-01", "2025-01-01", max_points=500) == "week"
+    assert choose_bucket("2000-01-01", "2025-01-01", max_points=500) == "month"
+
+
+def test_bucket_ratio_reaggregates_numerator_and_denominator():
+    df = pd.DataFrame({
+        "actividad": ["A", "A", "A"],
+        "fecha": pd.to_datetime(["2025-01-02", "2025-01-20", "2025-02-03"]),
+        "costo_total": [10.0, 30.0, 5.0],
+        "area_total": [1.0, 3.0, 0.0],
+    })
+    out = bucket_ratio(df, "fecha", ["actividad"], "costo_total", "area_total", "costo_por_hectarea", bucket="month")
+    assert list(out["costo_por_hectarea"]) == [10.0, 0.0]
+    assert list(out["fecha"]) == list(pd.to_datetime(["2025-01-01", "2025-02-01"]))
+
+
+def test_lttb_keeps_endpoints_and_extremes():
+    x = np.arange(1000)
+    y = np.zeros(1000)
+    y[500] = 100.0
+    idx = lttb(x, y, 20)
+    assert len(idx) == 20 and idx[0] == 0 and idx[-1] == 999
+    assert 500 in idx
+
+
+def test_downsample_bounds_points_per_series():
+    df = pd.DataFrame({
+        "fecha": np.tile(pd.date_range("2020-01-01", periods=3000, freq="D"), 2),
+        "actividad": np.repeat(["A", "B"], 3000),
+        "valor": np.random.default_rng(0).random(6000),
+    })
+    out = downsample(df, "fecha", "valor", by=["actividad"], max_points=300)
+    assert out.groupby("actividad").size().to_dict() == {"A": 300, "B": 300}
@@ -0,0 +1,126 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from etl_project import analytics, facts
+from etl_project.config import load_settings
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def _cfg(tmp_path):
+    return {"paths": {"base": str(tmp_path), "data_processed": "processed/"}, "state": {"dir": "state/"}}
+
+
+def _abast():
+    return pd.DataFrame({
+        "equipo": ["123", "123", "123", "999", "123"],
+        "fecha": pd.to_datetime(["2025-01-05", "2025-01-05", "2025-02-01", "2025-01-05", "2025-01-06"]),
+        "galones": [10.0, 4.0, 7.0, 3.0, np.nan],
+    })
+
+
+def _rep():
+    return pd.DataFrame({
+        "equipo": [123, 123, 123, 123],
+        "fecha": ["05/01/2025", "05/01/2025", "01/02/2025", "06/01/2025"],
+        "unidad": ["H", "H", "HA", "H"],
+        "cantidad_produccion": [2.0, 3.0, 1.0, 8.0],
+    })
+
+
+def test_monthly_from_fact_matches_the_join_view():
+    fact = facts.build_fact(facts.abastecimientos_daily(_abast()), facts.rep_maquinaria_daily(_rep()))
+    # Una fila por equipo/día presente en ambos lados
+    assert list(zip(fact["equipo"], fact["fecha"].dt.day)) == [("123", 5), ("123", 6)]
+    expected = analytics.vista_combustible_por_unidad_producida(_abast(), _rep())
+    pd.testing.assert_frame_equal(facts.monthly_from_fact(fact), expected)
+
+
+def test_incremental_update_only_recomputes_new_days(tmp_path):
+    fact = facts.FuelProductionFact(_cfg(tmp_path))
+    first = _abast()[_abast()["fecha"].dt.day == 5]
+    fact.update(abastecimientos=first, rep_maquinaria=_rep())
+    assert fact.promote()  # load_processed cargó la primera corrida
+
+    # Llega el 06/01 de abastecimientos: solo ese día se recalcula
+    rows, days = fact.update(abastecimientos=_abast()[_abast()["fecha"].dt.day == 6])
+    assert list(days.dt.day) == [6]
+    assert list(rows["n_reportes"]) == [1]
+
+    full = facts.build_fact(facts.abastecimientos_daily(_abast()), facts.rep_maquinaria_daily(_rep()))
+    pd.testing.assert_frame_equal(fact.full(), full)
+
+    written = fact.write_outputs(rows, days)
+    assert pd.read_csv(written["deletes"])["fecha"].tolist() == ["2025-01-06"]
+
+
+def test_unloaded_runs_accumulate_until_promote(tmp_path):
+    fact = facts.FuelProductionFact(_cfg(tmp_path))
+    # Sin estado de rep_maquinaria no hay filas ni días que borrar en la base
+    rows, days = fact.update(abastecimientos=_abast()[_abast()["fecha"].dt.day == 6])
+    assert rows.empty and days.empty and fact.has_pending()
+
+    rows, days = fact.update(rep_maquinaria=_rep())
+    assert list(days.dt.day) == [6]
+
+    # Tercera corrida sin cargar entre medio: trae también el 06/01 de las anteriores
+    rows, days = fact.update(abastecimientos=_abast()[_abast()["fecha"].dt.day == 5])
+    assert list(days.dt.day) == [5, 6]
+    assert list(zip(rows["equipo"], rows["fecha"].dt.day)) == [("123", 5), ("123", 6)]
+
+    assert fact.promote() and not fact.has_pending()
+    rows, days = fact.update(abastecimientos=_abast()[_abast()["fecha"].dt.day == 5])
+    assert days.empty  # mismo contenido que lo confirmado
+
+
+def test_additive_update_adds_partial_days(tmp_path):
+    fact = facts.FuelProductionFact(_cfg(tmp_path))
+    abast = _abast()
+    fact.update(abastecimientos=abast.iloc[:2], rep_maquinaria=_rep())
+    fact.promote()
+
+    # Otro archivo con más filas del 05/01: se suman a las ya cargadas
+    rows, days = fact.update(abastecimientos=abast.iloc[2:], additive=True)
+    assert list(days.dt.day) == [5, 6]
+    full = facts.build_fact(facts.abastecimientos_daily(abast), facts.rep_maquinaria_daily(_rep()))
+    pd.testing.assert_frame_equal(fact.full(), full)
+
+
+def test_load_processed_loads_the_fact_with_an_explicit_table_list(tmp_path, monkeypatch):
+    from etl_project import CSVLoader, load_log
+    from etl_project.runner import load_processed
+
+    calls = []
+
+    class Loader:
+        def __init__(self, table_name, schema):
+            self.table = table_name
+            self.db = self
+
+        def delete_rows(self, path):
+            calls.append(("delete_rows", self.table, pd.read_csv(path)["fecha"].tolist()))
+
+        def load_csv(self, path, if_exists="append"):
+            calls.append(("load_csv", self.table, len(pd.read_csv(path))))
+
+        def get_engine(self):
+            return None
+
+    monkeypatch.setattr(CSVLoader, "CSVLoader", Loader)
+    monkeypatch.setattr(load_log, "record_load", lambda engine, run_id, tables: 1)
+    cfg = load_settings(str(ROOT / "config/settings.yaml"))
+    cfg["paths"]["base"] = str(tmp_path)
+    cfg["metrics"]["enabled"] = False
+    fact = facts.FuelProductionFact(cfg)
+    written = fact.write_outputs(*fact.update(abastecimientos=_abast(), rep_maquinaria=_rep()))
+    (written["csv"].parent / "insumos.csv").write_text("a\n1\n", encoding="utf-8")
+
+    for _ in range(2):  # recargar el mismo CSV del hecho no duplica: borra sus días primero
+        assert load_processed(cfg, ["insumos"]) == ["insumos", "fact_combustible_produccion"]
+    assert calls[1:3] == [
+        ("delete_rows", "fact_combustible_produccion", ["2025-01-05", "2025-01-06"]),
+        ("load_csv", "fact_combustible_produccion", 2),
+    ]
+    assert calls[3:] == calls[:3] and not fact.has_pending()
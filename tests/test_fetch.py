@@ -0,0 +1,40 @@
+import threading
+
+from etl_project.views.fetch import fetch_all
+
+NAMES = ("a", "b", "c", "d")
+
+
+def test_fetch_all_runs_queries_concurrently():
+    # Cada tarea espera a que las cuatro estén corriendo a la vez; en serie la barrera expira
+    barrier = threading.Barrier(len(NAMES), timeout=5)
+
+    def task(value):
+        def run():
+            barrier.wait()
+            return value
+        return run
+
+    results, timings = fetch_all({name: task(name) for name in NAMES})
+    assert results == {name: name for name in NAMES}
+    assert set(timings) == set(NAMES) and all(t >= 0 for t in timings.values())
+
+
+def test_fetch_all_respects_max_workers():
+    running, peak, lock = 0, 0, threading.Lock()
+    release = threading.Event()
+
+    def task():
+        nonlocal running, peak
+        with lock:
+            running += 1
+            peak = max(peak, running)
+            if running == 2:
+                release.set()
+        release.wait(timeout=5)
+        with lock:
+            running -= 1
+        return True
+
+    results, _ = fetch_all({name: task for name in NAMES}, max_workers=2)
+    assert all(results.values()) and peak == 2
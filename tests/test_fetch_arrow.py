@@ -0,0 +1,80 @@
+import io
+
+import pyarrow as pa
+from pyarrow import csv
+
+from etl_project.conexiondb import DatabaseConnection, _arrow_type
+
+
+def test_copy_csv_keeps_declared_types_and_nulls():
+    # Salida de COPY ... (FORMAT csv, HEADER true): NULL = campo vacío, '' = ""
+    data = b'hda,valor,fecha\n002,1.5,2025-01-01\n,,\n"",2,2025-01-02\n'
+    schema = pa.schema([("hda", _arrow_type(25)), ("valor", _arrow_type(1700)), ("fecha", _arrow_type(1082))])
+    read, parse, convert = DatabaseConnection._copy_options(schema)
+    table = csv.read_csv(io.BytesIO(data), read_options=read, parse_options=parse, convert_options=convert)
+
+    assert table.schema.types == [pa.string(), pa.float64(), pa.date32()]
+    assert table.column("hda").to_pylist() == ["002", None, ""]
+    assert table.column("valor").to_pylist() == [1.5, None, 2.0]
+
+
+def test_parameters_are_bound_not_inlined():
+    from sqlalchemy import create_engine
+
+    from etl_project.conexiondb import _numbered_params
+    from etl_project.views.queries import productividad_sql
+
+    db = DatabaseConnection.__new__(DatabaseConnection)
+    db.engine = create_engine("postgresql+psycopg2://etl@localhost/etl")  # no se conecta
+    sql, values = db._bound(productividad_sql(trabajadores=["O'Neil", "Ana"]))
+    assert "O'Neil" not in sql and "%(trabajadores_1)s" in sql
+    assert values == {"trabajadores_1": "O'Neil", "trabajadores_2": "Ana"}
+
+    numbered, args = _numbered_params("SELECT '%%' || x FROM t WHERE a IN (%(p_1)s, %(p_2)s) AND b = %(p_1)s",
+                                      {"p_1": 1, "p_2": 2})
+    assert numbered == "SELECT '%' || x FROM t WHERE a IN ($1, $2) AND b = $1"
+    assert args == [1, 2]
+
+
+def test_iter_arrow_early_stop_waits_for_copy_thread():
+    import threading
+
+    from sqlalchemy import create_engine
+
+    class Cursor:
+        def __init__(self, owner):
+            self.owner = owner
+
+        def copy_expert(self, sql, sink):
+            sink.write(b"n\n")
+            while not self.owner.cancelled.wait(0.01):
+                sink.write(b"1\n" * 200_000)
+            raise RuntimeError("canceling statement due to user request")
+
+    class Raw:
+        def __init__(self):
+            self.cancelled = threading.Event()
+            self.copy_alive_at_close = None
+
+        def cursor(self):
+            return Cursor(self)
+
+        def cancel(self):
+            self.cancelled.set()
+
+        def close(self):
+            self.copy_alive_at_close = any(t.name == "etl-copy" for t in threading.enumerate())
+
+    raw = Raw()
+    db = DatabaseConnection.__new__(DatabaseConnection)
+    db.engine = create_engine("postgresql+psycopg2://etl@localhost/etl")  # no se conecta
+    db.engine.raw_connection = lambda: raw
+    db._copy_schema = lambda cursor, sql, values: pa.schema([("n", pa.int64())])
+    db._copy_sql = lambda cursor, sql, values: b"COPY (SELECT 1) TO STDOUT"
+
+    chunks = db.iter_arrow("SELECT 1 AS n", chunk_rows=10)
+    assert next(chunks).num_rows >= 10
+    chunks.close()
+
+    assert raw.cancelled.is_set()
+    assert raw.copy_alive_at_close is False
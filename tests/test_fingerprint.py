@@ -0,0 +1,56 @@
+import pandas as pd
+
+from etl_project.fingerprint import FingerprintIndex, hash_rows
+
+
+def _frame(rows):
+    return pd.DataFrame(rows, columns=["equipo", "fecha", "galones"]).assign(
+        fecha=lambda d: pd.to_datetime(d["fecha"])
+    )
+
+
+def test_hash_rows_ignores_int_float_and_str_dtypes():
+    a = pd.DataFrame({"equipo": ["10"], "galones": [5]})
+    b = pd.DataFrame({"equipo": pd.Series(["10"], dtype=object), "galones": [5.0]})
+    assert (hash_rows(a) == hash_rows(b)).all()
+
+
+def test_diff_emits_only_new_changed_and_tombstones_in_scope(tmp_path):
+    index = FingerprintIndex(tmp_path / "abastecimientos.parquet", scope_column="fecha")
+    first = _frame([("1", "2025-01-01", 1.0), ("2", "2025-01-01", 2.0), ("3", "2025-01-02", 3.0)])
+    index.save(index.diff(first))
+
+    # Re-exportación: 2025-01-01 sin el equipo 2, equipo 3 corregido, un día nuevo
+    second = _frame([("1", "2025-01-01", 1.0), ("3", "2025-01-02", 3.5), ("4", "2025-01-03", 4.0)])
+    delta = index.diff(second)
+    assert delta.stats == {"rows": 3, "new": 2, "changed": 0, "unchanged": 1, "removed": 2}
+    assert sorted(delta.upserts["equipo"]) == ["3", "4"]
+    assert sorted(delta.deletes["equipo"]) == ["2", "3"]
+
+    index.save(delta)
+    assert index.diff(second).upserts.empty
+
+
+def test_rows_outside_scope_are_not_tombstoned(tmp_path):
+    index = FingerprintIndex(tmp_path / "abastecimientos.parquet", scope_column="fecha")
+    index.save(index.diff(_frame([("1", "2025-01-01", 1.0)])))
+    delta = index.diff(_frame([("2", "2025-02-01", 2.0)]))
+    assert delta.deletes.empty
+    assert delta.stats["new"] == 1
+
+
+def test_keyed_change_is_upsert_plus_delete(tmp_path):
+    index = FingerprintIndex(tmp_path / "x.parquet", keys=["equipo"])
+    index.save(index.diff(_frame([("1", "2025-01-01", 1.0)])))
+    delta = index.diff(_frame([("1", "2025-01-01", 9.0)]))
+    assert delta.stats["changed"] == 1
+    assert list(delta.upserts["galones"]) == [9.0]
+    assert list(delta.deletes["equipo"]) == ["1"]
+
+
+def test_pending_state_is_promoted_after_load(tmp_path):
+    index = FingerprintIndex(tmp_path / "x.parquet")
+    index.save(index.diff(_frame([("1", "2025-01-01", 1.0)])), pending=True)
+    assert index.load() is None
+    assert index.promote()
+    assert index.load() is not None
@@ -0,0 +1,40 @@
+import pandas as pd
+import pytest
+
+from etl_project.loaders import ExcelLoader, select_sheets
+
+
+@pytest.fixture
+def workbook(tmp_path):
+    path = tmp_path / "sap.xlsx"
+    with pd.ExcelWriter(path, engine="openpyxl") as writer:
+        for month, rows in [("2025-01", 3), ("2025-02", 2), ("Resumen", 1)]:
+            pd.DataFrame({"equipo": range(rows), "galones": [1.5] * rows}).to_excel(
+                writer, sheet_name=month, index=False
+            )
+    return path
+
+
+def test_select_sheets_keeps_workbook_order():
+    names = ["2025-01", "2025-02", "Resumen"]
+    assert select_sheets(names, None) == names
+    assert select_sheets(names, ["Res*", "2025-0?"]) == names
+    assert select_sheets(names, "2025-*") == ["2025-01", "2025-02"]
+
+
+def test_read_sheets_in_parallel_matches_serial_read(workbook):
+    loader = ExcelLoader()
+    parallel = loader.read_sheets(workbook, sheets="2025-*", max_workers=2)
+    assert isinstance(parallel["sheet"].dtype, pd.CategoricalDtype)
+    assert list(parallel["sheet"].cat.categories) == ["2025-01", "2025-02"]
+    assert parallel["sheet"].tolist() == ["2025-01"] * 3 + ["2025-02"] * 2
+
+    serial = loader.read_one(workbook, sheet_name=["2025-01", "2025-02"])
+    pd.testing.assert_frame_equal(parallel, serial)
+
+    chunks = list(loader.iter_many([workbook], sheets="2025-*", chunk_rows=2))
+    assert [len(c) for c in chunks] == [2, 1, 2]
+    assert chunks[1]["sheet"].tolist() == ["2025-01"]
+
+    with pytest.raises(ValueError):
+        loader.read_sheets(workbook, sheets="2024-*")
@@ -0,0 +1,108 @@
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from etl_project.benchmarks.synthetic import make_frame, write_workbooks
+from etl_project.config import load_settings
+from etl_project.loaders import ExcelLoader
+from etl_project.memory import SchemaPin, SpillBuffer, parse_bytes
+from etl_project.runner import get_pipeline, run_pipelines
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def test_parse_bytes():
+    assert parse_bytes(None) is None and parse_bytes("") is None
+    assert parse_bytes(1024) == 1024
+    assert parse_bytes("512MB") == 512 * 1024**2
+    assert parse_bytes(" 1.5g ") == int(1.5 * 1024**3)
+    assert parse_bytes("2K") == 2048 and parse_bytes("100") == 100
+    with pytest.raises(ValueError):
+        parse_bytes("muchos")
+
+
+def test_spill_buffer_round_trip(tmp_path):
+    df = pd.DataFrame({"a": range(7), "b": list("abcdefg")})
+    with SpillBuffer(dir=tmp_path / "spill") as spill:
+        spill.append(df.iloc[:3])
+        spill.append(df.iloc[:0])  # los bloques vacíos se ignoran
+        spill.append(df.iloc[3:])
+        assert spill.rows == 7 and len(spill.parts) == 2
+        pd.testing.assert_frame_equal(spill.to_frame(), df)
+        out = spill.write_csv(tmp_path / "out.csv")
+        pd.testing.assert_frame_equal(pd.read_csv(out), df)
+        folder = spill.path
+    assert not folder.exists()
+
+
+def test_spilled_parts_share_one_schema(tmp_path):
+    from etl_project.writers import read_partitioned_parquet, write_partitioned_parquet
+
+    # Como los bloques de TextParser: una columna vacía en el primero y enteros sin NaN en otro
+    parts = [
+        pd.DataFrame({"k": [1.5, None], "nota": [None, None], "year": [2025, 2025]}),
+        pd.DataFrame({"k": [2, 3], "nota": ["a", "b"], "year": [2025, 2025]}),
+    ]
+    with SpillBuffer(dir=tmp_path / "spill") as spill:
+        for part in parts:
+            spill.append(part)
+        frames = list(spill.iter_frames())
+        assert frames[0]["nota"].dtype == frames[1]["nota"].dtype
+        assert [f["k"].dtype for f in frames] == ["float64", "float64"]
+        for i, frame in enumerate(frames):
+            write_partitioned_parquet(frame, tmp_path / "ds", partition_cols=["year"], basename_template=f"p{i}-{{i}}.parquet")
+    back = read_partitioned_parquet(tmp_path / "ds")  # con esquemas distintos fallaría
+    assert sorted(back["nota"].dropna()) == ["a", "b"] and len(back) == 4
+
+
+def test_iter_chunks_keeps_types_of_earlier_blocks(tmp_path):
+    path = tmp_path / "libro.xlsx"
+    pd.DataFrame({"id": range(5), "nota": ["x", "y", None, None, "z"], "n": [1, 2, None, 4, 5]}).to_excel(path, index=False)
+    blocks = list(ExcelLoader().iter_chunks(path, chunk_rows=2))
+    assert [len(b) for b in blocks] == [2, 2, 1]
+    assert len({str(b["nota"].dtype) for b in blocks}) == 1  # el bloque vacío no pasa a float64
+    assert blocks[2]["n"].dtype == "float64"  # int después de un bloque con NaN: float como en run()
+
+    pin = SchemaPin()
+    pin.observe(blocks[0])
+    assert pin.apply(pd.DataFrame({"nota": [None]}))["nota"].dtype == blocks[0]["nota"].dtype
+
+
+@pytest.fixture
+def cfg(tmp_path):
+    cfg = load_settings(str(ROOT / "config/settings.yaml"))
+    cfg["paths"]["base"] = str(tmp_path)
+    cfg["metrics"]["enabled"] = False
+    cfg["output"]["formats"] = ["csv"]
+    cfg["facts"]["combustible_produccion"] = False
+    folder = tmp_path / cfg["datasets"]["insumos"]["source"]["folder"]
+    write_workbooks(make_frame("insumos", 600, seed=5), folder, stem="insumos", rows_per_file=250)
+    return cfg
+
+
+def _csv(df):
+    return df.to_csv(index=False, date_format="%d/%m/%Y")
+
+
+def test_chunked_and_spilled_runs_match_run(cfg):
+    pipeline = get_pipeline("insumos")(ExcelLoader(cfg["paths"]["base"]), cfg)
+    full = pipeline.run()
+    assert len(full) > 0
+
+    chunks = list(pipeline.iter_transformed(chunk_rows=100))
+    assert len(chunks) > len(pipeline.source_files())  # de verdad leyó por bloques
+    assert _csv(pd.concat(chunks, ignore_index=True)) == _csv(full)
+
+    # Ruta de run_pipelines cuando se supera run.memory_limit
+    expected = _csv(full)
+    cfg["run"] = {"memory_limit": "1KB", "chunk_rows": 150}
+    assert pipeline.exceeds_memory_limit()
+    out = run_pipelines(cfg, ["insumos"], formats=["csv"])
+    assert out["insumos"][0].read_text(encoding="utf-8") == expected
+
+
+def test_delta_is_rejected_when_processing_in_parts(cfg):
+    cfg["run"] = {"memory_limit": "1KB", "delta": True}
+    with pytest.raises(ValueError, match="delta"):
+        run_pipelines(cfg, ["insumos"], formats=["csv"])
@@ -0,0 +1,62 @@
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from etl_project.config import load_settings
+from etl_project.loaders import ExcelLoader
+from etl_project.preview import format_preview, preview_dataset
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def test_read_head_and_stratified_sample(tmp_path):
+    path = tmp_path / "libro.xlsx"
+    pd.DataFrame({
+        "Clase de movimiento": [261] * 95 + [262] * 5,
+        "fila": range(100),
+    }).to_excel(path, index=False)
+    loader = ExcelLoader()
+
+    assert loader.read_head(path, 10)["fila"].tolist() == list(range(10))
+
+    sample = loader.read_sample(path, 10, stratify_by="clase_de_movimiento", seed=1)
+    assert sample["fila"].is_monotonic_increasing  # conserva el orden del archivo
+    counts = sample["Clase de movimiento"].value_counts()
+    assert counts[261] == 9 and counts[262] == 1  # n en total y la clase rara aparece igual
+    assert sample["fila"].max() > 10  # repartida en todo el archivo, no solo el inicio
+
+    assert len(loader.read_sample(path, 10, stratify_by="fila")) == 10  # un valor por fila: no pasa de n
+
+    with pytest.raises(KeyError):
+        loader.read_sample(path, 10, stratify_by="no_existe")
+
+
+def test_preview_reports_rows_per_step(monkeypatch):
+    monkeypatch.chdir(ROOT)
+    cfg = load_settings("config/settings.yaml")
+    result = preview_dataset(cfg, "insumos", rows=20)
+
+    assert len(result.output) == 20
+    assert "hda" in result.output.columns
+    stages = [rec.stage for rec in result.steps]
+    assert stages[0] == "extract_preview" and stages[-1] == "transform"
+    assert "clean_column_names" in stages and "concat_columns" in stages
+
+    report = format_preview(result, show=3)
+    assert "Esquema (" in report and "Muestra (3 de 20 filas)" in report
+
+
+def test_preview_and_extract_without_files_raise_file_not_found(monkeypatch):
+    from etl_project.runner import get_pipeline
+
+    monkeypatch.chdir(ROOT)
+    cfg = load_settings("config/settings.yaml")
+    cfg["datasets"]["insumos"]["source"]["sheets"] = "*"
+    pipeline = get_pipeline("insumos")(ExcelLoader(cfg["paths"]["base"]), cfg)
+
+    with pytest.raises(FileNotFoundError, match="No se encontraron archivos"):
+        pipeline.preview(rows=5, files=[])
+    monkeypatch.setattr(pipeline, "source_files", lambda: [])
+    with pytest.raises(FileNotFoundError, match="No se encontraron archivos"):
+        pipeline.extract()
@@ -0,0 +1,65 @@
+import json
+import time
+
+import pandas as pd
+import pytest
+
+from etl_project.profiling import RunProfiler, active_profiler, profiled, stage
+
+
+@profiled()
+def _drop_first(df):
+    time.sleep(0.01)
+    return df.iloc[1:]
+
+
+def test_nested_stages_build_paths_and_self_time():
+    df = pd.DataFrame({"a": range(10)})
+    with RunProfiler(name="test") as profiler:
+        assert active_profiler() is profiler
+        with stage("transform", df, dataset="insumos") as outer:
+            time.sleep(0.02)
+            out = _drop_first(df)
+            outer.observe(out)
+    assert active_profiler() is None
+
+    recs = {r.stage: r for r in profiler.records}
+    inner, outer = recs["_drop_first"], recs["transform"]
+    assert inner.path == "insumos/transform/_drop_first"
+    assert inner.parent == "insumos/transform" and inner.dataset == "insumos"
+    assert (inner.rows_in, inner.rows_out, inner.columns_out) == (10, 9, 1)
+    # self = wall de la etapa menos el de sus hijas directas
+    assert outer.wall_seconds >= inner.wall_seconds
+    assert outer.self_seconds == pytest.approx(outer.wall_seconds - inner.wall_seconds, abs=1e-6)
+    assert inner.self_seconds == pytest.approx(inner.wall_seconds)
+
+
+def test_without_profiler_stage_and_profiled_are_noops():
+    with stage("extract") as rec:
+        assert rec is None
+    assert len(_drop_first(pd.DataFrame({"a": [1, 2]}))) == 1
+
+
+def test_error_status_and_exports(tmp_path):
+    with RunProfiler(run_id="r1", name="test") as profiler:
+        with pytest.raises(ValueError):
+            with stage("extract", dataset="insumos"):
+                raise ValueError("boom")
+        for _ in range(2):  # misma ruta dos veces: Prometheus las suma
+            with stage("load", dataset="insumos") as rec:
+                rec.rows_out = 5
+
+    assert profiler.records[0].status == "error"
+    report = json.loads(profiler.write_json(tmp_path / "run.json").read_text(encoding="utf-8"))
+    assert report["run_id"] == "r1" and len(report["stages"]) == 3
+    assert "rss_delta_bytes" in report["stages"][0] and "process_peak_rss_bytes" in report
+    assert report["hot_stages"]["insumos"]["path"].startswith("insumos/")
+
+    prom = profiler.write_prometheus(tmp_path / "etl.prom").read_text(encoding="utf-8")
+    assert 'etl_stage_rows_out{pipeline="test",dataset="insumos",stage="insumos/load"} 10.000000' in prom
+    assert "# TYPE etl_stage_rss_delta_bytes gauge" in prom
+    assert not (tmp_path / "etl.prom.tmp").exists()
+
+    cfg = {"paths": {"base": str(tmp_path)}, "metrics": {"dir": "m/", "prometheus_textfile": "m/etl.prom"}}
+    assert set(profiler.export(cfg)) == {"json", "prometheus"}
+    assert profiler.export({"metrics": {"enabled": False}}) == {}
@@ -0,0 +1,26 @@
+from sqlalchemy.dialects import postgresql
+
+from etl_project.views import queries
+
+
+def _compile(stmt):
+    return stmt.compile(dialect=postgresql.dialect(), compile_kwargs={"render_postcompile": True})
+
+
+def test_empty_selection_has_no_where_clause():
+    sql = str(_compile(queries.productividad_sql()))
+    assert "WHERE" not in sql
+    assert "GROUP BY empresa, actividad" in sql
+
+
+def test_selection_is_sent_as_bound_parameters():
+    compiled = _compile(queries.costo_hectarea_sql(haciendas=("002 LA ESPERANZA",), actividades=("RIEGO", "ABONO")))
+    sql = str(compiled)
+    assert "hacienda IN (%(haciendas_1)s" in sql
+    assert "%(actividades_2)s" in sql
+    assert "LA ESPERANZA" not in sql
+    assert compiled.params["actividades_2"] == "ABONO"
+
+
+def test_option_queries_are_distinct():
+    assert all("SELECT DISTINCT" in str(stmt) for stmt in queries.option_queries().values())
@@ -0,0 +1,93 @@
+from sqlalchemy import create_engine, text
+
+from etl_project.conexiondb import DatabaseConnection
+from etl_project.query_cache import QueryCache, clear_caches, tables_in
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_lru_size_limit_and_ttl():
+    clock = FakeClock()
+    cache = QueryCache(max_entries=2, max_bytes=1 << 20, ttl=10, clock=clock)
+    cache.put("a", [(1,)])
+    cache.put("b", [(2,)])
+    assert cache.get("a") == [(1,)]  # "a" pasa a ser el más reciente
+    cache.put("c", [(3,)])
+    assert cache.get("b") is None and cache.stats.evictions == 1
+
+    assert not cache.put("big", b"x" * (2 << 20))  # más grande que el cache: no se guarda
+    clock.now = 11
+    assert cache.get("a") is None and cache.stats.expirations == 1
+
+
+def test_tables_in_resolves_views_to_raw_tables():
+    sql = "SELECT * FROM stage.vista_combustible_por_unidad_producida v JOIN raw.insumos i ON true"
+    assert tables_in(sql) == {"raw.fact_combustible_produccion", "raw.insumos"}
+    assert tables_in('select 1 from "stage"."otra_vista"') == {"*"}
+    comma = "SELECT * FROM raw.insumos i, raw.actividades AS a, rep_maquinaria WHERE f(i.x, a.y) ORDER BY 1, 2"
+    assert tables_in(comma) == {"raw.insumos", "raw.actividades", "rep_maquinaria"}
+
+
+def test_query_cache_is_invalidated_per_table(tmp_path):
+    clear_caches()
+    db = DatabaseConnection()
+    db.engine = create_engine(f"sqlite:///{tmp_path / 'cache.db'}")
+    with db.engine.begin() as conn:
+        conn.execute(text("CREATE TABLE insumos (valor INTEGER)"))
+        conn.execute(text("CREATE TABLE actividades (valor INTEGER)"))
+        conn.execute(text("INSERT INTO insumos VALUES (1)"))
+
+    q_insumos = "SELECT count(*) FROM insumos WHERE valor >= :minimo"
+    rows = db.query(q_insumos, {"minimo": 0}, cache=True)
+    assert isinstance(rows, list) and rows[0][0] == 1
+    rows.clear()  # cada llamada recibe su propia lista: no toca lo cacheado
+    assert db.query(q_insumos, {"minimo": 0}, cache=True)[0][0] == 1
+    db.query("SELECT count(*) FROM actividades", cache=True)
+    with db.engine.begin() as conn:
+        conn.execute(text("INSERT INTO insumos VALUES (2)"))
+    assert db.query(q_insumos, {"minimo": 0}, cache=True)[0][0] == 1  # servido desde el cache
+    assert db.query(q_insumos, {"minimo": 0}, cache=False)[0][0] == 2
+
+    assert db.invalidate("raw.insumos") == 1  # lo que hace CSVLoader al escribir
+    assert db.query(q_insumos, {"minimo": 0}, cache=True)[0][0] == 2
+    assert len(db.result_cache()) == 2
+    clear_caches()
+
+
+class FakeConnection:
+    dialect = create_engine("postgresql+psycopg2://etl@localhost/etl").dialect  # no se conecta
+
+    def __init__(self):
+        self.info, self.sent = {}, []
+
+    def execute(self, stmt, params=None):
+        self.sent.append((str(stmt), params))
+
+
+def test_prepared_statement_is_prepared_once_per_connection():
+    conn = FakeConnection()
+    sql = "SELECT * FROM raw.insumos WHERE nm_faz = :hacienda AND fecha::date >= :desde AND zona = :hacienda"
+    for _ in range(2):
+        DatabaseConnection._execute_prepared(conn, "insumos_hacienda", sql, {"hacienda": "X", "desde": "2025-01-01"})
+    prepares = [s for s, _ in conn.sent if s.startswith("PREPARE")]
+    assert prepares == [
+        "PREPARE insumos_hacienda AS SELECT * FROM raw.insumos WHERE nm_faz = $1 AND fecha::date >= $2 AND zona = $1"
+    ]
+    assert conn.sent[-1] == ("EXECUTE insumos_hacienda(:hacienda, :desde)", {"hacienda": "X", "desde": "2025-01-01"})
+
+
+def test_prepared_statement_expands_in_filters():
+    from etl_project.views.queries import productividad_sql
+
+    conn = FakeConnection()
+    DatabaseConnection._execute_prepared(conn, "productividad", productividad_sql(trabajadores=["Ana", "Luis"]), None)
+    (prepare, _), (execute, values) = conn.sent
+    assert "POSTCOMPILE" not in prepare and "trabajador IN ($1, $2)" in prepare
+    assert execute == "EXECUTE productividad(:trabajadores_1, :trabajadores_2)"
+    assert values == {"trabajadores_1": "Ana", "trabajadores_2": "Luis"}
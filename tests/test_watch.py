@@ -0,0 +1,224 @@
+import os
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from etl_project.config import load_settings
+from etl_project.watch import IngestDaemon
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class RecordingLoader:
+    """
+    Tabla en memoria: replace_frames confirma solo si cargan todos los bloques
+    y borra cada fila de 'deletes' tantas veces como aparece (como CSVLoader).
+    """
+
+    def __init__(self, table):
+        self.table = table
+        self.frames = []
+        self.deleted = []
+        self.rows = pd.DataFrame()
+        self.fail_after = None
+
+    def replace_frames(self, frames, deletes=None):
+        loaded = []
+        for df in frames:
+            if self.fail_after is not None and len(loaded) >= self.fail_after:
+                raise RuntimeError("db caída")
+            loaded.append(df)
+        rows = self.rows
+        if deletes is not None:
+            self.deleted.append(deletes)
+            if len(rows):
+                cols = list(deletes.columns)
+                occurrence = rows.groupby(cols, dropna=False).cumcount()
+                gone = deletes.assign(_n=deletes.groupby(cols, dropna=False).cumcount())
+                m = rows.assign(_n=occurrence).merge(gone, how="left", indicator=True)
+                rows = m[m["_merge"] == "left_only"].drop(columns=["_merge", "_n"])
+        self.rows = pd.concat([rows, *loaded], ignore_index=True)
+        self.frames.extend(loaded)
+        return sum(len(df) for df in loaded)
+
+    def delete_rows(self, csv_path):
+        self.deleted.append(pd.read_csv(csv_path))
+
+    def load_csv(self, csv_path):
+        self.frames.append(pd.read_csv(csv_path))
+
+
+def _abastecimientos(rows, start=7000):
+    return pd.DataFrame({
+        "Material": [209.0] * rows,
+        "Texto breve de material": ["BIOACEM AL 10% (B10)"] * rows,
+        "Almacén": [1225] * rows,
+        "Clase de movimiento": [261] * rows,
+        "Posición doc.mat.": [1] * rows,
+        "Orden": [f"001TRC1-{start + i}" for i in range(rows)],
+        "Nº reserva": [0] * rows,
+        "Centro de coste": [1010007] * rows,
+        "Fe.contabilización": pd.to_datetime(["2025-09-09"] * rows),
+        "Un.medida de entrada": ["GLN"] * rows,
+        "Ctd.en UM entrada": [-10.5] * rows,
+    })
+
+
+@pytest.fixture
+def cfg(tmp_path):
+    cfg = load_settings(str(ROOT / "config/settings.yaml"))
+    cfg["paths"]["base"] = str(tmp_path)
+    cfg["metrics"]["enabled"] = False
+    cfg["watch"]["batch_rows"] = 2
+    (tmp_path / "data/raw/abastecimientos").mkdir(parents=True)
+    return cfg
+
+
+def test_new_workbook_is_ingested_once_after_debounce(cfg, tmp_path):
+    folder = tmp_path / "data/raw/abastecimientos"
+    _abastecimientos(2).to_excel(folder / "viejo.xlsx", index=False)
+    clock, loaders = FakeClock(), {}
+
+    def factory(table):
+        return loaders.setdefault(table, RecordingLoader(table))
+
+    daemon = IngestDaemon(cfg, ["abastecimientos"], loader_factory=factory, clock=clock)
+    assert daemon.mark_existing() == 1  # ya cargado por la corrida por lotes
+
+    (folder / "~$nuevo.xlsx").write_bytes(b"lock de Excel")
+    partial = folder / "nuevo.xlsx"
+    partial.write_bytes(b"PK\x03\x04 a medio copiar")
+    assert daemon.run_once() == {}  # primera vez que se ve: entra en debounce
+    clock.now = 20
+    assert daemon.run_once() == {}  # estable pero no es un zip válido todavía
+
+    _abastecimientos(3).to_excel(partial, index=False)
+    os.utime(partial, ns=(1, 1))
+    assert daemon.run_once() == {}  # cambió: vuelve a empezar el debounce
+    clock.now = 40
+    assert daemon.run_once() == {"abastecimientos": 3}
+
+    frames = loaders["abastecimientos"].frames
+    assert [len(f) for f in frames] == [2, 1]  # micro-lotes de batch_rows filas
+    assert frames[0]["equipo"].tolist() == ["TRC1-7000", "TRC1-7001"]
+    # Sin rep_maquinaria para ese día el hecho no tiene filas: no se borra nada
+    assert loaders["fact_combustible_produccion"].deleted[0].empty
+    assert not list((tmp_path / "data/state/facts").glob("*.pending.parquet"))  # cargado = confirmado
+
+    # Ya ingerido (también tras reiniciar el daemon): no se vuelve a cargar
+    clock.now = 100
+    assert daemon.run_once() == {}
+    restarted = IngestDaemon(cfg, ["abastecimientos"], loader_factory=factory, clock=clock)
+    restarted.run_once()
+    clock.now = 200
+    assert restarted.run_once() == {}
+
+
+def test_replaced_or_failed_file_never_duplicates_rows(cfg, tmp_path):
+    from etl_project.facts import FuelProductionFact
+
+    folder = tmp_path / "data/raw/abastecimientos"
+    book = folder / "libro.xlsx"
+    clock, loaders = FakeClock(), {}
+    daemon = IngestDaemon(
+        cfg, ["abastecimientos"], loader_factory=lambda t: loaders.setdefault(t, RecordingLoader(t)), clock=clock,
+    )
+
+    def write(rows, start, mtime):
+        _abastecimientos(rows, start).to_excel(book, index=False)
+        os.utime(book, ns=(mtime, mtime))
+        daemon.run_once()  # entra en debounce
+        clock.now += 20
+
+    write(3, 7000, 1)
+    assert daemon.run_once() == {"abastecimientos": 3}
+    table = loaders["abastecimientos"]
+
+    # Mismo archivo, otra versión: reemplaza sus filas (y su aporte al hecho)
+    write(2, 8000, 2)
+    assert daemon.run_once() == {"abastecimientos": 2}
+    assert sorted(table.rows["equipo"]) == ["TRC1-8000", "TRC1-8001"]
+    abast = FuelProductionFact(cfg)._load_side("abastecimientos", pending=False)
+    assert abast["n_abastecimientos"].sum() == 2 and abast["galones"].sum() == pytest.approx(-21.0)
+
+    # Falla a mitad del archivo: no queda nada a medias y el reintento no duplica
+    write(4, 9000, 3)
+    table.fail_after = 1
+    with pytest.raises(RuntimeError, match="db caída"):
+        daemon.run_once()
+    assert len(table.rows) == 2
+    table.fail_after = None
+    assert daemon.run_once() == {"abastecimientos": 4}
+    assert sorted(table.rows["equipo"]) == [f"TRC1-{9000 + i}" for i in range(4)]
+    abast = FuelProductionFact(cfg)._load_side("abastecimientos", pending=False)
+    assert abast["n_abastecimientos"].sum() == 4
+
+
+def test_second_workbook_for_a_loaded_day_adds_to_the_fact(cfg, tmp_path):
+    from etl_project.facts import FuelProductionFact
+
+    folder = tmp_path / "data/raw/abastecimientos"
+    clock = FakeClock()
+    daemon = IngestDaemon(cfg, ["abastecimientos"], loader_factory=RecordingLoader, clock=clock)
+    for name, start in (("a.xlsx", 7000), ("b.xlsx", 7000)):  # mismos equipos y día (09/09)
+        _abastecimientos(2, start).to_excel(folder / name, index=False)
+        daemon.run_once()
+        clock.now += 20
+        assert daemon.run_once() == {"abastecimientos": 2}
+
+    abast = FuelProductionFact(cfg)._load_side("abastecimientos", pending=False)
+    assert abast["n_abastecimientos"].tolist() == [2, 2]
+    assert abast["galones"].sum() == pytest.approx(-42.0)
+
+
+def test_replacing_a_workbook_keeps_identical_rows_of_other_files(cfg, tmp_path):
+    folder = tmp_path / "data/raw/abastecimientos"
+    clock, loaders = FakeClock(), {}
+    daemon = IngestDaemon(
+        cfg, ["abastecimientos"], loader_factory=lambda t: loaders.setdefault(t, RecordingLoader(t)), clock=clock,
+    )
+
+    def write(name, rows, start, mtime):
+        _abastecimientos(rows, start).to_excel(folder / name, index=False)
+        os.utime(folder / name, ns=(mtime, mtime))
+        daemon.run_once()
+        clock.now += 20
+        return daemon.run_once()
+
+    write("a.xlsx", 2, 7000, 1)
+    write("b.xlsx", 2, 7000, 1)  # mismas filas que a.xlsx
+    assert write("b.xlsx", 1, 8000, 2) == {"abastecimientos": 1}
+
+    table = loaders["abastecimientos"].rows
+    assert sorted(table["equipo"]) == ["TRC1-7000", "TRC1-7001", "TRC1-8000"]
+
+
+def test_mark_existing_defers_snapshots_to_idle_cycles(cfg, tmp_path, monkeypatch):
+    folder = tmp_path / "data/raw/abastecimientos"
+    for name in ("a.xlsx", "b.xlsx"):
+        _abastecimientos(2).to_excel(folder / name, index=False)
+    daemon = IngestDaemon(cfg, ["abastecimientos"], loader_factory=RecordingLoader, clock=FakeClock())
+    transformed, original = [], daemon._transform
+
+    def counting(ds, path, parts=None):
+        transformed.append(path)
+        return original(ds, path, parts)
+
+    monkeypatch.setattr(daemon, "_transform", counting)
+
+    assert daemon.mark_existing() == 2
+    assert transformed == []  # arrancar no transforma nada
+    daemon.opts["snapshot_files"] = 1
+    assert daemon.run_once() == {}  # ciclo sin archivos nuevos: guarda una versión
+    assert [p.name for p in transformed] == ["a.xlsx"]
+    assert daemon.snapshot_backlog() == 1 and daemon.snapshot_backlog() == 0
+    assert len(list((tmp_path / "data/state/watch").glob("*.parquet"))) == 2
@@ -0,0 +1,79 @@
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from etl_project.config import load_settings
+from etl_project.writers import (
+    read_partitioned_parquet,
+    read_processed,
+    write_partitioned_parquet,
+    write_processed,
+    write_processed_chunks,
+)
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def _frame(months, per_month=10):
+    rows = [(2025, m, f"{m}-{i}", float(i)) for m in months for i in range(per_month)]
+    return pd.DataFrame(rows, columns=["year", "month", "id", "valor"])
+
+
+def _sorted(df):
+    return df.sort_values("id").reset_index(drop=True)
+
+
+def test_round_trip_and_partition_pruning(tmp_path):
+    df = _frame([8, 9])
+    write_partitioned_parquet(df, tmp_path / "ds", sort_by=["id"])
+    assert (tmp_path / "ds/year=2025/month=9").is_dir()
+
+    back = read_partitioned_parquet(tmp_path / "ds")
+    pd.testing.assert_frame_equal(_sorted(back)[df.columns], _sorted(df), check_dtype=False)
+    only_sep = read_partitioned_parquet(tmp_path / "ds", filters=[("month", "=", 9)])
+    assert len(only_sep) == 10 and set(only_sep["month"]) == {9}
+
+
+def test_partial_write_never_deletes_by_default(tmp_path):
+    root = tmp_path / "ds"
+    write_partitioned_parquet(_frame([8, 9]), root)
+    write_partitioned_parquet(_frame([9], per_month=3).assign(id=lambda d: "nuevo-" + d["id"]), root)
+    assert len(read_partitioned_parquet(root)) == 23  # agrega: las 10 filas de septiembre siguen
+
+    # Reemplazo explícito: solo la partición tocada, con lo que trae df
+    write_partitioned_parquet(_frame([9], per_month=4), root, existing_data_behavior="delete_matching")
+    back = read_partitioned_parquet(root)
+    assert back.groupby("month").size().to_dict() == {8: 10, 9: 4}
+
+
+@pytest.fixture
+def cfg(tmp_path):
+    cfg = load_settings(str(ROOT / "config/settings.yaml"))
+    cfg["paths"]["base"] = str(tmp_path)
+    cfg["datasets"]["insumos"]["output"] = {"date_column": "fecha", "partition_by": ["year", "month"]}
+    return cfg
+
+
+def test_write_processed_snapshot_is_idempotent_and_matches_chunks(cfg):
+    df = pd.DataFrame({
+        "fecha": ["01/08/2025", "15/08/2025", "02/09/2025", "30/09/2025"],
+        "valor": [1.0, 2.0, 3.0, 4.0],
+    })
+    write_processed(df, "insumos", cfg)
+    write_processed(df, "insumos", cfg)  # misma foto otra vez: no duplica
+    full = read_processed("insumos", cfg)
+    assert len(full) == 4
+
+    # Nueva foto sin septiembre: esa partición ya no se sirve
+    write_processed(df.iloc[:2], "insumos", cfg)
+    assert sorted(read_processed("insumos", cfg)["month"]) == [8, 8]
+    write_processed_chunks([df.iloc[:1], df.iloc[1:2]], "insumos", cfg)
+    assert len(read_processed("insumos", cfg)) == 2
+
+    write_processed_chunks([df.iloc[:3], df.iloc[3:]], "insumos", cfg)
+    chunked = read_processed("insumos", cfg)
+    pd.testing.assert_frame_equal(
+        chunked.sort_values("valor").reset_index(drop=True),
+        full.sort_values("valor").reset_index(drop=True),
+    )